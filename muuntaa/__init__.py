@@ -22,7 +22,7 @@ DEBUG = bool(os.getenv(f'{APP_ENV}_DEBUG', ''))
 ENCODING = 'utf-8'
 ENCODING_ERRORS_POLICY = 'ignore'
 DEFAULT_CONFIG_NAME = f'.{APP_ALIAS}.yml'
-log = logging.getLogger()  # Module level logger is sufficient
+log = logging.getLogger(APP_ENV)  # Module level logger is sufficient (configured per init_logger by the app)
 LOG_FOLDER = pathlib.Path('logs')
 LOG_FILE = f'{APP_ALIAS}.log'
 LOG_PATH = pathlib.Path(LOG_FOLDER, LOG_FILE) if LOG_FOLDER.is_dir() else pathlib.Path(LOG_FILE)
@@ -33,6 +33,7 @@ TS_FORMAT_LOG = '%Y-%m-%dT%H:%M:%S'
 BOOLEAN_KEYS = ('force', 'fix_insert_current_version_into_revision_history')
 INPUT_FILE_KEY = 'input_file'
 NOW_CODE = 'now'
+SOURCE_DATE_EPOCH_ENV = 'SOURCE_DATE_EPOCH'  # Cf. https://reproducible-builds.org/specs/source-date-epoch/
 OVERWRITABLE_KEYS = [
     'fix_insert_current_version_into_revision_history',
     'force_insert_default_reference_category',
@@ -40,6 +41,10 @@ OVERWRITABLE_KEYS = [
     'force',
 ]
 CSAF_FILE_SUFFIX = '.json'
+GZIP_FILE_SUFFIX = '.gz'
+JSON_PATCH_FILE_SUFFIX = '.json-patch'
+MSGPACK_FILE_SUFFIX = '.msgpack'
+VULN_DIGESTS_FILE_SUFFIX = '.vuln-digests'
 
 # Semantic version is defined in version_t definition.
 # Cf. https://docs.oasis-open.org/csaf/csaf/v2.0/csaf-v2.0.html#3111-version-type
@@ -56,7 +61,7 @@ LogLevel = int
 Pathlike = Union[pathlib.Path, str]
 ScopedMessage = tuple[LogLevel, str]
 ScopedMessages = list[ScopedMessage]
-WriterOptions = Union[None, dict[str, Union[bool, int]]]
+WriterOptions = Union[None, dict[str, Union[bool, int, tuple[str, str]]]]
 
 
 def cleanse_id(id_string: str) -> str:
@@ -85,16 +90,21 @@ __all__: list[str] = [
     'ConfigType',
     'ENCODING',
     'ENCODING_ERRORS_POLICY',
+    'GZIP_FILE_SUFFIX',
     'INPUT_FILE_KEY',
+    'JSON_PATCH_FILE_SUFFIX',
     'LogLevel',
+    'MSGPACK_FILE_SUFFIX',
     'NOW_CODE',
     'OVERWRITABLE_KEYS',
     'Pathlike',
     'ScopedMessage',
+    'SOURCE_DATE_EPOCH_ENV',
     'ScopedMessages',
     'VERSION',
     'VERSION_DOTTED_TRIPLE',
     'VERSION_PATTERN',
+    'VULN_DIGESTS_FILE_SUFFIX',
     'WriterOptions',
     'cleanse_id',
     'integer_tuple',
@@ -123,6 +133,3 @@ def init_logger(name=None, level=None):
     logging.basicConfig(**log_format)
     log = logging.getLogger(APP_ENV if name is None else name)
     log.propagate = True
-
-
-init_logger(name=APP_ENV, level=logging.DEBUG if DEBUG else None)
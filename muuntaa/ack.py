@@ -1,11 +1,11 @@
 """Acknowledgements type."""
 
 import logging
-from typing import Union
+from typing import Any, Union
 
 import lxml.objectify  # nosec B410
 
-from muuntaa.subtree import Subtree
+from muuntaa.subtree import DocumentBuilder, Subtree
 
 RootType = lxml.objectify.ObjectifiedElement
 RevHistType = list[dict[str, Union[str, None, tuple[int, ...]]]]
@@ -20,22 +20,23 @@ class Acknowledgments(Subtree):
     )
     """
 
-    def __init__(self, lc_parent_code: str):  # TODO: unlitter me and push data upstream
-        super().__init__()
+    __slots__ = ()
+
+    path = ('document', 'acknowledgments')
+
+    def __init__(
+        self,
+        lc_parent_code: str,
+        builder: Union[DocumentBuilder, None] = None,
+        target: Union[list[dict[str, Any]], None] = None,
+    ) -> None:
+        super().__init__(builder)
         if lc_parent_code not in ('cvrf', 'vuln'):
             raise KeyError('Acknowledgments can only be hosted by cvrf or vuln')
-        if lc_parent_code == 'cvrf':
-            if self.tree.get('document') is None:
-                self.tree['document'] = {}
-            if self.tree['document'].get('acknowledgments') is None:
-                self.tree['document']['acknowledgments'] = []
-            self.hook = self.tree['document']['acknowledgments']
-        else:
-            if self.tree.get('vulnerabilities') is None:
-                self.tree['vulnerabilities'] = {}
-            if self.tree['vulnerabilities'].get('acknowledgments') is None:
-                self.tree['vulnerabilities']['acknowledgments'] = []
-            self.hook = self.tree['vulnerabilities']['acknowledgments']
+        if lc_parent_code == 'vuln' and target is None:
+            raise KeyError('Acknowledgments hosted by vuln require a target list')
+        self.hook = self.builder.items(self.path) if target is None else target
+        self.hosted = target is not None
 
     def always(self, root: RootType) -> None:
         if root.Acknowledgment is not None:  # Acknowledgments if present shall not be empty in CSAF
@@ -43,14 +44,13 @@ class Acknowledgments(Subtree):
 
     def sometimes(self, root: RootType) -> None:
         for ack in root.Acknowledgment:
-            print(ack)
-            if not any((ack.Name, ack.Organization, ack.Description, ack.URL)):  # type: ignore
+            if not any(hasattr(ack, tag) for tag in ('Name', 'Organization', 'Description', 'URL')):
                 logging.warning('Skipping empty Acknowledgment entry, input line: %s', ack.sourceline)
                 continue
 
             record = {}
 
-            if orga := ack.Organization:  # type: ignore
+            if orga := getattr(ack, 'Organization', None):
                 record['organization'] = orga[0].text
                 if len(orga) > 1:
                     logging.warning(
@@ -59,13 +59,13 @@ class Acknowledgments(Subtree):
                         orga[1:],
                     )
 
-            if desc := ack.Description:  # type: ignore
+            if desc := getattr(ack, 'Description', None):
                 record['summary'] = desc[0].text  # Single Description elem is asserted on the input
 
-            if names := ack.Name:  # type: ignore
+            if names := getattr(ack, 'Name', None):
                 record['names'] = [name.text for name in names]  # Names can have more entries
 
-            if urls := ack.URL:  # type: ignore
+            if urls := getattr(ack, 'URL', None):
                 record['urls'] = [url.text for url in urls]  # URLs can have more entries
 
             self.hook.append(record)
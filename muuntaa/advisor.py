@@ -5,15 +5,37 @@ UNDERSCORE = '_'
 ID_UNKNOWN = 'out'
 INVALID = '_invalid'
 CSAF_FILENAME_PATTERN = re.compile(r'([^+\-a-z0-9]+)')
+YEAR_PATTERN = re.compile(r'^(\d{4})-')
 CSAF_FILE_SUFFIX = '.json'
+GZIP_FILE_SUFFIX = '.gz'
+MSGPACK_FILE_SUFFIX = '.msgpack'
 
 
-def derive_csaf_filename(identifier: Union[str, None] = None, is_valid: bool = False) -> str:
+def derive_csaf_filename(
+    identifier: Union[str, None] = None, is_valid: bool = False, compress: bool = False, binary: bool = False
+) -> str:
     """Returns CSAF filename derived from the identifier (according to CSAF v2.0 OASIS standard) and the validity.
 
     Cf. https://docs.oasis-open.org/csaf/csaf/v2.0/csaf-v2.0.html#51-filename
 
     If the advisory is not valid, then the stem of the derived filename ends in `_invalid`.
+    If binary (MessagePack) output is requested, then the suffix is `.msgpack` instead of `.json`.
+    If compression is requested, then the filename receives the additional `.gz` suffix.
     """
     derived = CSAF_FILENAME_PATTERN.sub(UNDERSCORE, identifier.lower()) if identifier is not None else ID_UNKNOWN
-    return f'{derived}{INVALID}{CSAF_FILE_SUFFIX}' if not is_valid else f'{derived}{CSAF_FILE_SUFFIX}'
+    suffix = MSGPACK_FILE_SUFFIX if binary else CSAF_FILE_SUFFIX
+    if compress:
+        suffix = f'{suffix}{GZIP_FILE_SUFFIX}'
+    return f'{derived}{INVALID}{suffix}' if not is_valid else f'{derived}{suffix}'
+
+
+def derive_year_folder(initial_release_date: Union[str, None] = None) -> str:
+    """Returns the year folder name (yyyy) derived from /document/tracking/initial_release_date.
+
+    Cf. https://docs.oasis-open.org/csaf/csaf/v2.0/csaf-v2.0.html#7111-requirement-11-one-folder-per-year
+
+    If no year can be derived, then the empty string is returned (so the output stays in the base folder).
+    """
+    if initial_release_date is None or (match := YEAR_PATTERN.match(initial_release_date)) is None:
+        return ''
+    return match.group(1)
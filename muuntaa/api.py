@@ -0,0 +1,181 @@
+"""Application programming interface for library users of muuntaa."""
+
+import collections
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import pathlib
+from typing import Any, Union
+
+import lxml.etree  # nosec B410
+import lxml.objectify  # nosec B410
+import msgspec
+
+import muuntaa.config as cfg
+import muuntaa.validator as validator
+import muuntaa.vuln as vuln
+from muuntaa.ack import Acknowledgments
+from muuntaa.document import Leafs, Publisher, Tracking
+from muuntaa.memo import SubtreeMemo, load_memoized
+from muuntaa.notes import Notes
+from muuntaa.product import ProductIndex, Products
+from muuntaa.refs import References
+from muuntaa.subtree import DocumentBuilder, RootType, Subtree
+from muuntaa.vuln import Vulnerabilities
+
+from muuntaa import ConfigType, GZIP_FILE_SUFFIX, MSGPACK_FILE_SUFFIX, Pathlike
+
+msgpack_decoder = msgspec.msgpack.Decoder()
+
+
+def load_msgpack(file_path: Pathlike) -> dict[str, object]:
+    """Load a CSAF document from a MessagePack file (optionally gzip compressed per .gz suffix)."""
+    path = pathlib.Path(file_path)
+    data = path.read_bytes()
+    if path.suffix == GZIP_FILE_SUFFIX:
+        data = gzip.decompress(data)
+    return msgpack_decoder.decode(data)  # type: ignore
+
+
+def load_csaf(file_path: Pathlike) -> dict[str, object]:
+    """Load a CSAF document from a JSON or MessagePack file (optionally gzip compressed per .gz suffix)."""
+    path = pathlib.Path(file_path)
+    data = path.read_bytes()
+    if path.suffix == GZIP_FILE_SUFFIX:
+        data = gzip.decompress(data)
+        path = path.with_suffix('')
+    if path.suffix == MSGPACK_FILE_SUFFIX:
+        return msgpack_decoder.decode(data)  # type: ignore
+    return json.loads(data)  # type: ignore
+
+
+class Conversion(msgspec.Struct):
+    """Result of converting one CVRF document (with the product index and the digests for incremental reconversion)."""
+
+    csaf: dict[str, Any]
+    some_error: bool = False
+    digests: bytes = b''
+    scoped_messages: list[tuple[int, str]] = []
+    products: ProductIndex = msgspec.field(default_factory=ProductIndex)
+
+
+conversion_encoder = msgspec.msgpack.Encoder()
+conversion_decoder = msgspec.msgpack.Decoder(Conversion)
+
+
+def load_previous(csaf_path: Pathlike) -> dict[bytes, dict[str, Any]]:
+    """Load the mapped vulnerabilities of a previous conversion keyed by the digests of its sidecar (if any)."""
+    sidecar = vuln.digests_path(csaf_path)
+    if not sidecar.is_file():
+        return {}
+    vulnerabilities = load_csaf(csaf_path).get('vulnerabilities', [])
+    return vuln.previous_mapping(vuln.read_digests(sidecar), vulnerabilities)  # type: ignore
+
+
+class Converter:
+    """Conversion session validating the configuration into settings once and reusing the parser across documents.
+
+    The optional result cache holds up to cache_size conversions keyed by the hash of the input bytes
+    as MessagePack (so every hit is a fresh copy).
+    Note: Cached results keep the generator date of their first conversion (pin it for reproducible results).
+    """
+
+    def __init__(
+        self,
+        config: Union[ConfigType, None] = None,
+        cache_size: int = 0,
+        memo: Union[SubtreeMemo, None] = None,
+    ) -> None:
+        configuration = cfg.load()
+        configuration.update(config or {})
+        settings, scoped_messages = cfg.to_settings(configuration)
+        if settings is None:
+            raise ValueError(' '.join(message for _, message in scoped_messages))
+        self.settings = settings
+        self.parser = lxml.objectify.makeparser(resolve_entities=False, no_network=True, huge_tree=False)
+        self.memo = memo
+        self.cache_size = cache_size
+        self.results: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def convert_tree(self, root: RootType, previous: Union[dict[bytes, dict[str, Any]], None] = None) -> Conversion:
+        """Map the parsed CVRF document root (reusing unchanged vulnerabilities of a previous conversion)."""
+        builder = DocumentBuilder()
+        csaf = builder.document
+        parts: list[Subtree] = []
+        for make, element in (  # Parts are created on demand as creating a part adds its target to the document
+            (Leafs, root),
+            (Publisher, root.find('{*}DocumentPublisher')),
+            (Tracking, root.find('{*}DocumentTracking')),
+        ):
+            if element is not None:
+                leaf_part = make(self.settings, builder)
+                leaf_part.load(element)
+                parts.append(leaf_part)
+        product_index = ProductIndex()
+        references_variant = str(self.settings.force_insert_default_reference_category)
+        for make_memoized, tag, variant in (
+            (functools.partial(Notes, lc_parent_code='cvrf'), 'DocumentNotes', ''),
+            (
+                functools.partial(References, self.settings, lc_parent_code='cvrf'),
+                'DocumentReferences',
+                references_variant,
+            ),
+            (functools.partial(Acknowledgments, lc_parent_code='cvrf'), 'Acknowledgments', ''),
+            (Products, 'ProductTree', ''),
+        ):
+            if (element := root.find(f'{{*}}{tag}')) is not None:
+                memoized_part = make_memoized(builder=builder)
+                load_memoized(memoized_part, element, self.memo, variant)
+                parts.append(memoized_part)
+                if isinstance(memoized_part, Products):
+                    product_index = memoized_part.product_index()
+        vulnerabilities = Vulnerabilities(settings=self.settings, builder=builder)
+        if self.settings.incremental:  # Only then hash the vulnerabilities for the sidecar
+            vulnerabilities.load_incremental(root.findall('{*}Vulnerability'), previous or {})
+        else:
+            vulnerabilities.load_all(root.iterfind('{*}Vulnerability'))
+        parts.append(vulnerabilities)
+        if not csaf['vulnerabilities']:
+            del csaf['vulnerabilities']
+        scoped_messages = []
+        if vulnerabilities.reused:
+            scoped_messages.append((logging.INFO, f'Reused {vulnerabilities.reused} unchanged vulnerabilities.'))
+        problems = validator.validate(csaf)
+        scoped_messages.extend(problems)
+        return Conversion(
+            csaf=csaf,
+            some_error=any(part.has_errors() for part in parts) or not validator.is_valid(problems),
+            digests=vulnerabilities.dump_digests(),
+            scoped_messages=scoped_messages,
+            products=product_index,
+        )
+
+    def convert_bytes(self, data: bytes, previous: Union[dict[bytes, dict[str, Any]], None] = None) -> Conversion:
+        """Parse and map the CVRF document (answering repeated inputs from the result cache if enabled)."""
+        use_cache = self.cache_size > 0 and not previous
+        key = hashlib.sha256(data).hexdigest() if use_cache else ''
+        if use_cache and (encoded := self.results.get(key)) is not None:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return conversion_decoder.decode(encoded)
+        try:
+            root = lxml.objectify.fromstring(data, parser=self.parser)
+        except lxml.etree.XMLSyntaxError as err:
+            return Conversion(csaf={}, some_error=True, scoped_messages=[(logging.CRITICAL, f'Parsing failed. {err}')])
+        conversion = self.convert_tree(root, previous)
+        if use_cache:
+            self.misses += 1
+            self.results[key] = conversion_encoder.encode(conversion)
+            while len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+        return conversion
+
+    def convert_path(
+        self, file_path: Pathlike, previous: Union[dict[bytes, dict[str, Any]], None] = None
+    ) -> Conversion:
+        """Read, parse, and map the CVRF document at file path."""
+        return self.convert_bytes(pathlib.Path(file_path).read_bytes(), previous)
@@ -0,0 +1,104 @@
+"""Select the newest revision per tracking ID from a batch of CVRF documents before converting any of them."""
+
+import logging
+import pathlib
+from typing import Any, Iterable, Union
+
+import lxml.etree  # nosec B410
+
+import muuntaa.advisor as advisor
+from muuntaa import VERSION_PATTERN, Pathlike, ScopedMessages, cleanse_id
+
+TRACKING_TAGS = ('{*}ID', '{*}Version', '{*}DocumentTracking')
+
+TrackingType = tuple[Union[str, None], Union[str, None]]  # (tracking ID, version)
+VersionKey = tuple[Any, ...]
+MISSING_RANK, UNPARSEABLE_RANK, VERSION_RANK = 0, 1, 2
+RELEASE_KEY = (1,)  # Ranks above any pre-release key (0, ...)
+
+
+def peek_tracking(path: Pathlike) -> TrackingType:
+    """Read only DocumentTracking/Identification/ID and DocumentTracking/Version stopping at the end of the tracking."""
+    identifier, version = None, None
+    with open(path, 'rb') as handle:  # Stopping early shall not leak the file handle
+        events = lxml.etree.iterparse(
+            handle, events=('end',), tag=TRACKING_TAGS, resolve_entities=False, no_network=True
+        )
+        for _, element in events:
+            name = lxml.etree.QName(element).localname
+            parent = element.getparent()
+            if name == 'DocumentTracking':
+                break
+            if parent is None:
+                continue
+            parent_name = lxml.etree.QName(parent).localname
+            if name == 'ID' and parent_name == 'Identification':
+                identifier = cleanse_id(element.text or '')
+            elif name == 'Version' and parent_name == 'DocumentTracking':
+                version = (element.text or '').strip()
+    return identifier, version
+
+
+def prerelease_key(prerelease: Union[str, None]) -> VersionKey:
+    """Order key of the pre-release identifiers (numeric identifiers rank below alphanumeric ones per semver)."""
+    if not prerelease:
+        return RELEASE_KEY
+    return (0, *((0, int(part), '') if part.isdigit() else (1, 0, part) for part in prerelease.split('.')))
+
+
+def version_key(version: Union[str, None]) -> VersionKey:
+    """Order key of a tracking version (missing and unparseable versions rank below all others).
+
+    Semantic versions rank pre-releases below the release and order the pre-releases per identifiers,
+    dotted integers rank as releases.
+    """
+    if not version:
+        return (MISSING_RANK,)
+    if (match := VERSION_PATTERN.match(version)) is not None:
+        numbers = int(match.group(2)), int(match.group(3)), int(match.group(4))
+        return VERSION_RANK, numbers, prerelease_key(match.group(5))
+    try:
+        return VERSION_RANK, tuple(int(part) for part in version.split('.')), RELEASE_KEY
+    except ValueError:
+        return (UNPARSEABLE_RANK,)
+
+
+def newest_revisions(paths: Iterable[Pathlike]) -> tuple[list[pathlib.Path], ScopedMessages]:
+    """Select the newest revision per tracking ID (keeping the input order) and report filename collisions."""
+    scoped_messages: ScopedMessages = []
+    candidates: list[tuple[pathlib.Path, Union[str, None], Union[str, None]]] = []
+    newest: dict[str, tuple[VersionKey, pathlib.Path]] = {}
+    for path in (pathlib.Path(entry) for entry in paths):
+        try:
+            identifier, version = peek_tracking(path)
+        except (OSError, lxml.etree.XMLSyntaxError) as err:
+            scoped_messages.append((logging.WARNING, f'Reading the tracking of {path} failed. {err}'))
+            identifier, version = None, None
+        candidates.append((path, identifier, version))
+        if identifier is None:
+            continue
+        key = version_key(version)
+        if identifier not in newest or key > newest[identifier][0]:
+            newest[identifier] = (key, path)
+
+    selected: list[pathlib.Path] = []
+    for path, identifier, version in candidates:
+        if identifier is not None and newest[identifier][1] != path:
+            scoped_messages.append(
+                (
+                    logging.INFO,
+                    f'Skipping {path} (version {version} of {identifier}) superseded by {newest[identifier][1]}.',
+                )
+            )
+            continue
+        selected.append(path)
+
+    owners: dict[str, set[str]] = {}
+    for identifier in newest:
+        owners.setdefault(advisor.derive_csaf_filename(identifier, is_valid=True), set()).add(identifier)
+    for filename, identifiers in sorted(owners.items()):
+        if len(identifiers) > 1:
+            scoped_messages.append(
+                (logging.WARNING, f'Tracking IDs {", ".join(sorted(identifiers))} collide in filename {filename}.')
+            )
+    return selected, scoped_messages
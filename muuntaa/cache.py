@@ -0,0 +1,155 @@
+"""Content addressed on-disk cache of conversion results.
+
+The key derives from the input bytes, the effective configuration, and the version of muuntaa.
+Entries are folders holding the encoded payload per output format and a meta file, written atomically
+(the meta file is written last and marks the entry as complete), so concurrent workers can share a cache.
+Eviction is least recently used (per meta file modification time) and bounded by the total size.
+The running total is kept in a size file below the root so the tree is only rescanned if the budget is exceeded
+(or the size file is missing).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+from typing import Union
+
+import muuntaa.canonical as canonical
+from muuntaa import ENCODING, INPUT_FILE_KEY, VERSION, ConfigType, Pathlike, ScopedMessages
+from muuntaa.writer import OutputSink
+
+DEFAULT_MAX_BYTES = 1 << 30
+META_NAME = 'meta.json'
+SIZE_NAME = 'size'
+CACHE_NEUTRAL_KEYS = (  # Configuration keys that do not influence the encoded payloads
+    INPUT_FILE_KEY,
+    'cache_dir',
+    'cache_max_bytes',
+    'catalog',
+    'checksums',
+    'fsync_group_size',
+    'if_changed',
+    'input_dir',
+    'no_cache',
+    'output_dir',
+    'output_format',
+    'previous_file',
+    'print',
+    'provider_index',
+    'rebuild_provider_index',
+    'year_folders',
+)
+
+MetaType = dict[str, Union[str, bool, None]]
+
+
+class ConversionCache:
+    """Size bounded least recently used cache of encoded conversion results below a root folder."""
+
+    def __init__(
+        self, root: Pathlike, max_bytes: int = DEFAULT_MAX_BYTES, sink: Union[OutputSink, None] = None
+    ) -> None:
+        self.root = pathlib.Path(root).expanduser()
+        self.max_bytes = max_bytes
+        self.sink = OutputSink(check_existing=False) if sink is None else sink  # Same atomic writes as the outputs
+        self.total: Union[int, None] = None  # Estimated size, only rescanned when the budget seems exceeded
+        self.size_path = self.root / SIZE_NAME
+
+    @staticmethod
+    def key(data: bytes, configuration: ConfigType) -> str:
+        """Derive the cache key from the input bytes, the effective configuration, and the version."""
+        effective = {k: v for k, v in configuration.items() if k not in CACHE_NEUTRAL_KEYS}
+        hasher = hashlib.sha256(f'{VERSION}\0{canonical.dumps(effective)}\0'.encode(ENCODING))
+        hasher.update(data)
+        return hasher.hexdigest()
+
+    def entry(self, key: str) -> pathlib.Path:
+        """Provide the folder of the entry (sharded by the leading two hex digits)."""
+        return self.root / key[:2] / key
+
+    def lookup(self, key: str, output_formats: list[str]) -> Union[tuple[dict[str, pathlib.Path], MetaType], None]:
+        """Provide the payload paths per output format and the meta data if all are cached (marking the entry used)."""
+        folder = self.entry(key)
+        meta_path = folder / META_NAME
+        try:
+            meta = json.loads(meta_path.read_bytes())
+            payloads = {output_format: folder / output_format for output_format in output_formats}
+            if not all(path.is_file() for path in payloads.values()):
+                return None
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        return payloads, meta
+
+    def _write(self, path: pathlib.Path, data: bytes) -> None:
+        with self.sink.atomic(path) as handle:
+            handle.write(data)
+
+    def store(self, key: str, encoded: dict[str, bytes], meta: MetaType) -> ScopedMessages:
+        """Store the encoded payloads per output format and the meta data (last) and evict if oversized."""
+        folder = self.entry(key)
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            for output_format, payload in encoded.items():
+                self._write(folder / output_format, payload)
+            meta_data = json.dumps(meta).encode(ENCODING)
+            self._write(folder / META_NAME, meta_data)
+        except OSError as err:
+            return [(logging.WARNING, f'Storing conversion cache entry {folder} failed. {err}')]
+        total = self.total if self.total is not None else self.read_total()
+        if total is None:
+            return self.evict()
+        self.total = total + len(meta_data) + sum(len(payload) for payload in encoded.values())
+        if self.total > self.max_bytes:
+            return self.evict()
+        return self.write_total()
+
+    def read_total(self) -> Union[int, None]:
+        """Read the running total of the cache (shared with concurrent workers) if known."""
+        try:
+            return int(self.size_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def write_total(self) -> ScopedMessages:
+        """Persist the running total of the cache (an estimate, overwrites and concurrent stores are not merged)."""
+        try:
+            self._write(self.size_path, str(self.total).encode(ENCODING))
+        except OSError as err:
+            return [(logging.WARNING, f'Storing the conversion cache size {self.size_path} failed. {err}')]
+        return []
+
+    @staticmethod
+    def restore(source: pathlib.Path, target: Pathlike, sink: Union[OutputSink, None] = None) -> None:
+        """Hard link (or copy if linking fails) the cached payload atomically to the target (per the output sink)."""
+        (OutputSink() if sink is None else sink).link(source, target)
+
+    def evict(self) -> ScopedMessages:
+        """Remove the least recently used entries until the cache fits into the size budget."""
+        entries = []
+        total = 0
+        for meta_path in self.root.glob(f'*/*/{META_NAME}'):
+            try:
+                size = sum(path.stat().st_size for path in meta_path.parent.iterdir())
+                entries.append((meta_path.stat().st_mtime_ns, size, meta_path.parent))
+            except OSError:  # Concurrently evicted
+                continue
+            total += size
+        evicted = 0
+        for _, size, folder in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                (folder / META_NAME).unlink()  # Invalidate first so concurrent lookups miss
+            except OSError:
+                continue
+            shutil.rmtree(folder, ignore_errors=True)
+            total -= size
+            evicted += 1
+        self.total = total
+        scoped_messages = self.write_total()
+        if evicted:
+            scoped_messages.append((logging.INFO, f'Evicted {evicted} conversion cache entries.'))
+        return scoped_messages
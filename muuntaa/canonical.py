@@ -0,0 +1,83 @@
+"""JSON Canonicalization Scheme (JCS) per RFC 8785 for signing and content addressing.
+
+Cf. https://www.rfc-editor.org/rfc/rfc8785
+"""
+
+import json
+import math
+from typing import Any, Callable
+
+MAX_SAFE_INTEGER = 2**53
+
+encode_string: Callable[[str], str] = json.encoder.encode_basestring  # Escapes as ECMAScript does
+
+
+def number(value: float) -> str:
+    """Format the number as ECMAScript Number.prototype.toString does (RFC 8785 section 3.2.2.3)."""
+    if math.isnan(value) or math.isinf(value):
+        raise ValueError(f'number {value} is not representable in JSON')
+    if value == 0:
+        return '0'
+    sign = '-' if value < 0 else ''
+    mantissa, _, exponent = repr(abs(value)).partition('e')
+    integral, _, fraction = mantissa.partition('.')
+    all_digits = integral + fraction
+    digits = all_digits.lstrip('0')
+    point = len(integral) - (len(all_digits) - len(digits)) + int(exponent or 0)
+    digits = digits.rstrip('0')
+    k = len(digits)
+    if k <= point <= 21:
+        return f'{sign}{digits}{"0" * (point - k)}'
+    if 0 < point <= 21:
+        return f'{sign}{digits[:point]}.{digits[point:]}'
+    if -6 < point <= 0:
+        return f'{sign}0.{"0" * -point}{digits}'
+    e = point - 1
+    tail = f'.{digits[1:]}' if k > 1 else ''
+    return f'{sign}{digits[0]}{tail}e{"+" if e > 0 else "-"}{abs(e)}'
+
+
+def _utf16_key(key: str) -> bytes:
+    """Sort keys by their UTF-16 code units as RFC 8785 section 3.2.3 requires."""
+    return key.encode('utf-16-be', 'surrogatepass')
+
+
+def _encode(value: Any, chunks: list[str]) -> None:
+    """Append the canonical encoding of value to the chunks sorting each object exactly once."""
+    if isinstance(value, str):
+        chunks.append(encode_string(value))
+    elif isinstance(value, dict):
+        chunks.append('{')
+        for index, key in enumerate(sorted(value, key=_utf16_key)):
+            if index:
+                chunks.append(',')
+            chunks.append(encode_string(key))
+            chunks.append(':')
+            _encode(value[key], chunks)
+        chunks.append('}')
+    elif isinstance(value, (list, tuple)):
+        chunks.append('[')
+        for index, item in enumerate(value):
+            if index:
+                chunks.append(',')
+            _encode(item, chunks)
+        chunks.append(']')
+    elif value is None:
+        chunks.append('null')
+    elif value is True:
+        chunks.append('true')
+    elif value is False:
+        chunks.append('false')
+    elif isinstance(value, int):
+        chunks.append(str(value) if abs(value) <= MAX_SAFE_INTEGER else number(float(value)))
+    elif isinstance(value, float):
+        chunks.append(number(value))
+    else:
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(value: Any) -> str:
+    """Serialize value into the canonical JSON text (sorted keys, canonical numbers, no whitespace)."""
+    chunks: list[str] = []
+    _encode(value, chunks)
+    return ''.join(chunks)
@@ -0,0 +1,162 @@
+"""SQLite catalog of converted advisories for fast lookup by CVE, product, and tracking ID.
+
+Every advisory is identified by its tracking ID and upserted (replacing the earlier rows of that advisory even if
+its output path changed, e.g. between valid and invalid outputs or year folders),
+so the catalog follows incremental (re)conversions. Upserts are committed in batched transactions.
+"""
+
+import logging
+import pathlib
+import sqlite3
+from typing import Any, Union
+
+from muuntaa.product import ProductIndex
+
+from muuntaa import Pathlike, ScopedMessages
+
+BATCH_SIZE = 500
+SCHEMA = """\
+CREATE TABLE IF NOT EXISTS advisories (
+  path TEXT PRIMARY KEY,
+  tracking_id TEXT,
+  version TEXT,
+  initial_release_date TEXT,
+  current_release_date TEXT
+);
+CREATE TABLE IF NOT EXISTS cves (
+  path TEXT NOT NULL REFERENCES advisories(path) ON DELETE CASCADE,
+  cve TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+  path TEXT NOT NULL REFERENCES advisories(path) ON DELETE CASCADE,
+  product_id TEXT NOT NULL,
+  name TEXT
+);
+CREATE INDEX IF NOT EXISTS advisories_tracking_id ON advisories(tracking_id);
+CREATE INDEX IF NOT EXISTS cves_cve ON cves(cve);
+CREATE INDEX IF NOT EXISTS cves_path ON cves(path);
+CREATE INDEX IF NOT EXISTS products_product_id ON products(product_id);
+CREATE INDEX IF NOT EXISTS products_name_nocase ON products(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS products_path ON products(path);
+"""
+UPSERT_ADVISORY = """\
+INSERT INTO advisories(path, tracking_id, version, initial_release_date, current_release_date)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+  tracking_id = excluded.tracking_id,
+  version = excluded.version,
+  initial_release_date = excluded.initial_release_date,
+  current_release_date = excluded.current_release_date
+"""
+DELETE_MOVED = 'DELETE FROM advisories WHERE tracking_id = ? AND path != ?'  # Cascades to the CVEs and products
+QUERY = """\
+SELECT DISTINCT a.path, a.tracking_id, a.version, a.current_release_date
+FROM advisories AS a
+"""
+
+PREFIX_END = '\U0010ffff'  # Sorts after every continuation of a prefix (bounds the name range scan)
+
+RowType = tuple[str, Union[str, None], Union[str, None], Union[str, None]]  # (path, tracking ID, version, date)
+
+
+def products_of(csaf_dict: dict[str, Any], index: Union[ProductIndex, None] = None) -> dict[str, Union[str, None]]:
+    """Collect the names per product ID from full product names, branches, and relationships.
+
+    The index built during the conversion is reused if given (else it is built from the product tree).
+    """
+    if index is None:
+        index = ProductIndex.of(csaf_dict.get('product_tree') or {})
+    return {product_id: full_product_name.get('name') for product_id, full_product_name in index.names.items()}
+
+
+def cves_of(csaf_dict: dict[str, Any]) -> list[str]:
+    """Collect the distinct CVE IDs of the vulnerabilities in document order."""
+    return list(dict.fromkeys(vuln['cve'] for vuln in csaf_dict.get('vulnerabilities') or [] if vuln.get('cve')))
+
+
+class Catalog:
+    """Catalog of converted advisories in a SQLite database upserting per tracking ID in batched transactions."""
+
+    def __init__(self, db_path: Pathlike, batch_size: int = BATCH_SIZE) -> None:
+        self.db_path = pathlib.Path(db_path)
+        self.batch_size = batch_size
+        self.pending = 0
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+
+    def upsert(
+        self, csaf_dict: dict[str, Any], out_path: Pathlike, products: Union[ProductIndex, None] = None
+    ) -> ScopedMessages:
+        """Replace the catalog entry of the advisory now written to out_path (committing per batch size)."""
+        path = str(pathlib.Path(out_path).resolve())
+        tracking = (csaf_dict.get('document') or {}).get('tracking') or {}
+        if not (tracking_id := tracking.get('id')):
+            return [(logging.WARNING, f'Advisory {out_path} has no tracking ID. Not cataloged.')]
+        scoped_messages: ScopedMessages = []
+        cursor = self.connection.cursor()
+        if cursor.execute(DELETE_MOVED, (tracking_id, path)).rowcount:
+            scoped_messages.append((logging.INFO, f'Advisory {tracking_id} moved to {path}. Replaced its old entry.'))
+        cursor.execute(
+            UPSERT_ADVISORY,
+            (
+                path,
+                tracking_id,
+                tracking.get('version'),
+                tracking.get('initial_release_date'),
+                tracking.get('current_release_date'),
+            ),
+        )
+        cursor.execute('DELETE FROM cves WHERE path = ?', (path,))
+        cursor.execute('DELETE FROM products WHERE path = ?', (path,))
+        cursor.executemany('INSERT INTO cves(path, cve) VALUES (?, ?)', ((path, cve) for cve in cves_of(csaf_dict)))
+        cursor.executemany(
+            'INSERT INTO products(path, product_id, name) VALUES (?, ?, ?)',
+            ((path, product_id, name) for product_id, name in products_of(csaf_dict, products).items()),
+        )
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+        return scoped_messages
+
+    def commit(self) -> None:
+        """Commit the pending upserts as one transaction."""
+        self.connection.commit()
+        self.pending = 0
+
+    def query(
+        self, cve: Union[str, None] = None, product: Union[str, None] = None, tracking_id: Union[str, None] = None
+    ) -> list[RowType]:
+        """Find the advisories matching all given criteria.
+
+        The product matches the product ID exactly or the start of the name ignoring ASCII case
+        (a range scan on the name index instead of a substring search through all products).
+        """
+        joins, conditions, parameters = [], [], []
+        if cve:
+            joins.append('JOIN cves AS c ON c.path = a.path')
+            conditions.append('c.cve = ?')
+            parameters.append(cve)
+        if product:
+            joins.append('JOIN products AS p ON p.path = a.path')
+            conditions.append('(p.product_id = ? OR (p.name >= ? COLLATE NOCASE AND p.name < ? COLLATE NOCASE))')
+            parameters.extend((product, product, f'{product}{PREFIX_END}'))
+        if tracking_id:
+            conditions.append('a.tracking_id = ?')
+            parameters.append(tracking_id)
+        statement = QUERY + '\n'.join(joins)
+        if conditions:
+            statement += '\nWHERE ' + ' AND '.join(conditions)
+        statement += '\nORDER BY a.current_release_date DESC, a.path'
+        return self.connection.execute(statement, parameters).fetchall()
+
+    def close(self) -> None:
+        """Commit the pending upserts and close the database."""
+        self.commit()
+        self.connection.close()
+
+    def __enter__(self) -> 'Catalog':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
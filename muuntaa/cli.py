@@ -1,32 +1,54 @@
-import argparse
+"""Command line interface (the heavy modules are imported on demand to keep --version and --help fast)."""
+
+import contextlib
 import logging
 import pathlib
 import sys
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-import muuntaa.advisor as advisor
-import muuntaa.config as cfg
-import muuntaa.writer as writer
 from muuntaa import (
     APP_ALIAS,
+    APP_ENV,
     APP_NAME,
+    CSAF_FILE_SUFFIX,
     ConfigType,
-    ENCODING,
+    DEBUG,
     INPUT_FILE_KEY,
+    JSON_PATCH_FILE_SUFFIX,
+    MSGPACK_FILE_SUFFIX,
     OVERWRITABLE_KEYS,
     ScopedMessages,
     VERSION,
+    init_logger,
     log,
 )
 
+if TYPE_CHECKING:
+    from muuntaa.api import Converter
+    from muuntaa.cache import ConversionCache
+    from muuntaa.catalog import Catalog
+    from muuntaa.product import ProductIndex
+    from muuntaa.provider import ProviderIndex
+    from muuntaa.writer import OutputSink
+
 FALLBACK_CVSS3_VERSION = '3.0'
+OUTPUT_FORMAT_JSON = 'json'
+OUTPUT_FORMAT_MSGPACK = 'msgpack'
+OUTPUT_FORMATS = (OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_MSGPACK)
 MAGIC_CMD_ARG_ENTERED = 'cmd-arg-entered'
+INPUT_DIR_KEY = 'input_dir'
+CATALOG_KEY = 'catalog'
+QUERY_COMMAND = 'query'
+CVRF_FILE_PATTERN = '*.xml'
+VERSION_ARGS = (['-v'], ['--version'])
 
 scoped_log = log.log  # noqa
 
 
 def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, ConfigType], ScopedMessages]:
     """Parse the request as load configuration and mix in (overwrite) command line parameter values."""
+    import argparse
+
     if argv is None:
         argv = sys.argv[1:]  # pragma: no cover
     parser = argparse.ArgumentParser(
@@ -34,8 +56,19 @@ def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, Confi
     )
     # General args
     parser.add_argument('-v', '--version', action='version', version=VERSION)
-    parser.add_argument(
-        '--input-file', dest='input_file', type=str, required=True, help='CVRF XML input file to parse', metavar='PATH'
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
+        '--input-file', dest='input_file', type=str, help='CVRF XML input file to parse', metavar='PATH'
+    )
+    inputs.add_argument(
+        '--input-dir',
+        dest='input_dir',
+        type=str,
+        metavar='PATH',
+        help=(
+            'Folder of CVRF XML input files to convert as one batch (*.xml).\n'
+            'Only the newest revision (per tracking version) of each tracking ID is converted.'
+        ),
     )
     parser.add_argument(
         '--output-dir',
@@ -52,6 +85,143 @@ def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, Confi
         default=False,
         help='Additionally prints CSAF JSON output on stdout.',
     )
+    parser.add_argument(
+        '--output-format',
+        dest='output_format',
+        action='append',
+        choices=OUTPUT_FORMATS,
+        help=(
+            f'Output format (repeat the option to write several formats from one mapping).\n'
+            f"Default value is '{OUTPUT_FORMAT_JSON}'."
+        ),
+    )
+    parser.add_argument(
+        '--compact',
+        dest='compact',
+        action='store_true',
+        default=False,
+        help='Write the CSAF JSON output without indentation and whitespace between tokens.',
+    )
+    parser.add_argument(
+        '--canonical',
+        dest='canonical',
+        action='store_true',
+        default=False,
+        help='Write the CSAF JSON output in canonical form (RFC 8785 JCS) for signing and content addressing.',
+    )
+    parser.add_argument(
+        '--compress',
+        dest='compress',
+        action='store_true',
+        default=False,
+        help='Write the CSAF JSON output gzip compressed (filename suffix .json.gz).',
+    )
+    parser.add_argument(
+        '--checksums',
+        dest='checksums',
+        action='store_true',
+        default=False,
+        help='Additionally write the .sha256 and .sha512 files (computed while writing) next to the output.',
+    )
+    parser.add_argument(
+        '--if-changed',
+        dest='if_changed',
+        action='store_true',
+        default=False,
+        help='Only write the output if the content differs from an existing output file (keeps the mtime).',
+    )
+    parser.add_argument(
+        '--fsync-group-size',
+        dest='fsync_group_size',
+        type=int,
+        metavar='COUNT',
+        help=(
+            'Sync every output before renaming it into place and the output folders once every COUNT files.\n'
+            "Default value is 0 (no syncing) unless configured per 'fsync_group_size'."
+        ),
+    )
+    parser.add_argument(
+        '--generator-date',
+        dest='generator_date',
+        type=str,
+        metavar='TIMESTAMP',
+        help=(
+            'Pin /document/tracking/generator/date to this timestamp (instead of now) for reproducible output.\n'
+            'Default value is derived from the SOURCE_DATE_EPOCH environment variable if set.'
+        ),
+    )
+    parser.add_argument(
+        '--deterministic',
+        dest='deterministic',
+        action='store_true',
+        default=False,
+        help=(
+            'Produce byte identical output for identical input: sorted keys and a pinned generator date\n'
+            '(the current release date of the document unless given per --generator-date or SOURCE_DATE_EPOCH).'
+        ),
+    )
+    parser.add_argument(
+        '--previous-file',
+        dest='previous_file',
+        type=str,
+        metavar='PATH',
+        help=(
+            'Previous CSAF revision to additionally derive a JSON Patch (RFC 6902) delta file against'
+            ' (with --incremental unchanged vulnerabilities are reused if its .vuln-digests sidecar is present).'
+        ),
+    )
+    parser.add_argument(
+        '--incremental',
+        dest='incremental',
+        action='store_true',
+        default=False,
+        help='Additionally write the digests of the vulnerabilities to a .vuln-digests sidecar of the output.',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        dest='cache_dir',
+        type=str,
+        metavar='PATH',
+        help='Folder of the content addressed conversion cache (keyed by input, configuration, and version).',
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        action='store_true',
+        default=False,
+        help='Do not use the conversion cache (even if a cache dir is configured).',
+    )
+    parser.add_argument(
+        '--provider-index',
+        dest='provider_index',
+        action='store_true',
+        default=False,
+        help='Incrementally update the provider files index.txt and changes.csv in the output dir.',
+    )
+    parser.add_argument(
+        '--rebuild-provider-index',
+        dest='rebuild_provider_index',
+        action='store_true',
+        default=False,
+        help='Rebuild the provider files index.txt and changes.csv from all valid advisories in the output dir.',
+    )
+    parser.add_argument(
+        '--catalog',
+        dest='catalog',
+        type=str,
+        metavar='PATH',
+        help=(
+            'Upsert tracking ID, version, release dates, CVEs, and products of the output into this SQLite catalog.\n'
+            f'Query the catalog per: {APP_ALIAS} {QUERY_COMMAND} --catalog PATH [--cve CVE] [--product TEXT] [--id ID]'
+        ),
+    )
+    parser.add_argument(
+        '--year-folders',
+        dest='year_folders',
+        action='store_true',
+        default=False,
+        help='Place the output in a year folder of the output dir per /document/tracking/initial_release_date.',
+    )
     parser.add_argument(
         '--force',
         action='store_const',
@@ -115,6 +285,9 @@ def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, Confi
     except SystemExit as err:
         return int(str(err)), []
 
+    import muuntaa.config as cfg
+    import muuntaa.strftime as strftime
+
     config = cfg.load()
     scoped_messages = cfg.boolify(config)
     for scope, message in scoped_messages:
@@ -127,6 +300,27 @@ def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, Confi
         if config.get(key) == MAGIC_CMD_ARG_ENTERED:
             config[key] = True
 
+    if generator_date := config.get('generator_date'):
+        _, scoped_messages = strftime.get_utc_timestamp(str(generator_date))  # Refuse instead of mapping a null date
+        for scope, message in scoped_messages:
+            scoped_log(scope, message)
+            if scope >= logging.CRITICAL:
+                return 1, []
+    else:
+        epoch_date, scoped_messages = strftime.source_date_epoch()
+        for scope, message in scoped_messages:
+            scoped_log(scope, message)
+            if scope >= logging.CRITICAL:
+                return 1, []
+        if epoch_date is not None:
+            config['generator_date'] = epoch_date
+
+    if input_dir := config.get(INPUT_DIR_KEY):
+        if not pathlib.Path(input_dir).is_dir():  # type: ignore
+            scoped_log(logging.CRITICAL, f'Input folder not found, check the path: {input_dir}')
+            return 1, []
+        return config, []
+
     if not pathlib.Path(config.get(INPUT_FILE_KEY, '')).is_file():  # type: ignore
         # Avoided type error using empty string as default, which fakes missing file per current dir
         scoped_log(logging.CRITICAL, f'Input file not found, check the path: {config.get(INPUT_FILE_KEY)}')
@@ -135,28 +329,322 @@ def parse_request(argv: Union[list[str], None] = None) -> tuple[Union[int, Confi
     return config, []
 
 
-def process(configuration: ConfigType) -> int:
-    """Visit the source and yield the requested transformed target."""
-    in_path = pathlib.Path(configuration[INPUT_FILE_KEY])  # type: ignore
-    with open(in_path, 'r', encoding=ENCODING) as source:
-        loaded = source.read()
+def _tracking_meta(csaf_dict: dict[str, object], is_valid: bool) -> dict[str, Union[str, bool, None]]:
+    """Extract the tracking values and the validity that the output layout and the provider index depend on."""
+    tracking = csaf_dict.get('document', {}).get('tracking', {})  # type: ignore
+    meta = {key: tracking.get(key) for key in ('id', 'initial_release_date', 'current_release_date')}
+    return {**meta, 'valid': is_valid}
+
+
+def _output_paths(
+    configuration: ConfigType, meta: dict[str, Union[str, bool, None]], output_formats: list[str]
+) -> tuple[pathlib.Path, dict[str, pathlib.Path]]:
+    """Derive the effective output folder and the output path per format from the tracking meta data."""
+    import muuntaa.advisor as advisor
+
+    out_dir = pathlib.Path(configuration.get('output_dir', './'))  # type: ignore
+    if configuration.get('year_folders', False):
+        out_dir = out_dir / advisor.derive_year_folder(meta.get('initial_release_date'))  # type: ignore
+    compress = bool(configuration.get('compress', False))
+    out_paths = {
+        output_format: out_dir
+        / advisor.derive_csaf_filename(
+            meta.get('id'),  # type: ignore
+            is_valid=bool(meta.get('valid', False)),
+            compress=compress,
+            binary=output_format == OUTPUT_FORMAT_MSGPACK,
+        )
+        for output_format in output_formats
+    }
+    return out_dir, out_paths
 
-    csaf_dict: dict[str, object] = {'csaf_version': '2.0', 'incoming_blob': loaded}
 
-    out_path = advisor.derive_csaf_filename()
-    scoped_messages = writer.write_csaf(csaf_dict, out_path)
+def _refused(configuration: ConfigType, meta: dict[str, Union[str, bool, None]]) -> ScopedMessages:
+    """Refuse writing an invalid conversion result unless forced."""
+    if meta.get('valid') or configuration.get('force'):
+        return []
+    return [(logging.CRITICAL, 'Conversion result is invalid. Nothing written (use --force to write it anyway).')]
+
+
+def _report(scoped_messages: ScopedMessages) -> int:
+    """Log the scoped messages and derive the return code."""
     for scope, message in scoped_messages:
         scoped_log(scope, message)
         if scope >= logging.CRITICAL:
             return 1
+    return 0
+
+
+def _conversion_cache(configuration: ConfigType) -> Union['ConversionCache', None]:
+    """Provide the conversion cache if requested and not disabled (by option or by a previous file to diff)."""
+    if configuration.get('no_cache', False) or configuration.get('previous_file'):
+        return None
+    if not (cache_dir := configuration.get('cache_dir')):
+        return None
+    import muuntaa.cache as cache
+
+    max_bytes = int(configuration.get('cache_max_bytes') or cache.DEFAULT_MAX_BYTES)
+    return cache.ConversionCache(cache_dir, max_bytes)  # type: ignore
+
+
+def _output_sink(configuration: ConfigType) -> 'OutputSink':
+    """Provide the output sink syncing in groups of the configured size (if any)."""
+    import muuntaa.writer as writer
 
+    return writer.OutputSink(fsync_group_size=int(configuration.get('fsync_group_size') or 0))
+
+
+def process(
+    configuration: ConfigType,
+    catalog: Union['Catalog', None] = None,
+    converter: Union['Converter', None] = None,
+    sink: Union['OutputSink', None] = None,
+    index: Union['ProviderIndex', None] = None,
+    conversion_cache: Union['ConversionCache', None] = None,
+) -> int:
+    """Visit the source and yield the requested transformed target.
+
+    A batch shares the catalog, the converter, the output sink, the provider index, and the conversion cache
+    (the batch closes the sink and saves the index once at the end), else process provides its own.
+    """
+    import muuntaa.advisor as advisor
+    import muuntaa.api as api
+    import muuntaa.cache as cache
+    import muuntaa.delta as delta
+    import muuntaa.provider as provider
+    import muuntaa.vuln as vuln
+    import muuntaa.writer as writer
+
+    in_path = pathlib.Path(configuration[INPUT_FILE_KEY])  # type: ignore
+    with open(in_path, 'rb') as source:
+        data = source.read()
+
+    scoped_messages: ScopedMessages = []
+    output_formats = list(dict.fromkeys(configuration.get('output_format') or [OUTPUT_FORMAT_JSON]))  # type: ignore
+    wanted = list(output_formats)
+    if configuration.get('print', False) and OUTPUT_FORMAT_JSON not in wanted:
+        wanted.append(OUTPUT_FORMAT_JSON)
+    canonical_form = bool(configuration.get('canonical', False))
+    options = writer.COMPACT_OPTIONS if configuration.get('compact', False) else None
+    if configuration.get('deterministic', False):
+        options = {**(options or writer.DEFAULT_OPTIONS), 'sort_keys': True}
+
+    cache_key, hit = '', None
+    if sink is None:  # Not part of a batch (that shares the cache if any)
+        conversion_cache = _conversion_cache(configuration)
+    if conversion_cache is not None:
+        cache_key = conversion_cache.key(data, configuration)
+        hit = conversion_cache.lookup(cache_key, wanted)
+
+    out_dir = pathlib.Path(configuration.get('output_dir', './'))  # type: ignore
+    compress = bool(configuration.get('compress', False))
+    checksums = bool(configuration.get('checksums', False))
+    if_changed = bool(configuration.get('if_changed', False))
+    own_sink = sink is None
+    sink = _output_sink(configuration) if sink is None else sink
+
+    csaf_dict: dict[str, object] = {}
+    products: Union['ProductIndex', None] = None  # Index of the product tree built while mapping (if mapped)
+    digests = b''  # Sidecar of the vulnerability digests for incremental reconversion
+    restored: set[str] = set()
+    encoded: dict[str, bytes] = {}  # Each document is encoded once per format and the bytes are shared by all sinks
+    if hit is not None:  # No parsing, mapping, or encoding required
+        cached, meta = hit
+        digests = bytes.fromhex(str(meta.get('digests') or ''))
+        if refused := _refused(configuration, meta):
+            return _report(scoped_messages + refused)
+        out_dir_effective, out_paths = _output_paths(configuration, meta, output_formats)
+        try:  # Restore or read the entry now as concurrent workers may evict it any time
+            for output_format in wanted:
+                if output_format in out_paths and not (compress or checksums or if_changed):
+                    sink.ensure_dir(out_dir_effective)
+                    cache.ConversionCache.restore(cached[output_format], out_paths[output_format], sink)
+                    restored.add(output_format)
+                if output_format not in restored or configuration.get('print', False):
+                    encoded[output_format] = cached[output_format].read_bytes()
+            scoped_messages.append((logging.INFO, f'Conversion cache hit for {in_path}.'))
+        except OSError:
+            scoped_messages.append((logging.INFO, f'Conversion cache entry for {in_path} vanished. Converting.'))
+            hit, restored, encoded = None, set(), {}
+    if hit is None:
+        previous = None
+        if (previous_file := configuration.get('previous_file')) and configuration.get('incremental', False):
+            try:
+                previous = api.load_previous(previous_file)  # type: ignore
+            except (OSError, ValueError) as err:
+                scoped_messages.append((logging.WARNING, f'Reusing vulnerabilities of {previous_file} failed. {err}'))
+        try:
+            conversion = (converter or api.Converter(configuration)).convert_bytes(data, previous)
+        except ValueError as err:
+            scoped_messages.append((logging.CRITICAL, f'Invalid configuration. {err}'))
+            return _report(scoped_messages)
+        scoped_messages.extend(conversion.scoped_messages)
+        if any(scope >= logging.CRITICAL for scope, _ in conversion.scoped_messages):
+            return _report(scoped_messages)
+        csaf_dict, products = conversion.csaf, conversion.products
+        meta = _tracking_meta(csaf_dict, not conversion.some_error)
+        if refused := _refused(configuration, meta):
+            return _report(scoped_messages + refused)
+        digests = conversion.digests
+        try:
+            for output_format in wanted:
+                suffix = MSGPACK_FILE_SUFFIX if output_format == OUTPUT_FORMAT_MSGPACK else CSAF_FILE_SUFFIX
+                encoded[output_format] = writer.encode(csaf_dict, options, suffix, canonical_form)
+        except Exception as err:  # noqa
+            scoped_messages.append((logging.CRITICAL, f'Encoding the output failed. {err}'))
+            return _report(scoped_messages)
+        if conversion_cache is not None:
+            scoped_messages.extend(conversion_cache.store(cache_key, encoded, {**meta, 'digests': digests.hex()}))
+
+        out_dir_effective, out_paths = _output_paths(configuration, meta, output_formats)
+
+    rebuild_index = bool(configuration.get('rebuild_provider_index', False))
+    own_index = index is None and bool(configuration.get('provider_index', False)) and not rebuild_index
+    if own_index:
+        index = provider.ProviderIndex(out_dir)
+        scoped_messages.extend(index.load())
+    try:
+        for output_format, out_path in out_paths.items():
+            if output_format in restored:
+                written: ScopedMessages = [(logging.INFO, f'Successfully restored {out_path} from cache.')]
+            else:
+                written = writer.write_payload(encoded[output_format], out_path, sink, checksums, if_changed)
+            if digests and not any(scope >= logging.CRITICAL for scope, _ in written):
+                written.extend(writer.write_sidecar(sink, vuln.digests_path(out_path), digests, if_changed))
+            scoped_messages.extend(written)
+            if any(scope >= logging.CRITICAL for scope, _ in written):
+                return _report(scoped_messages)
+            if output_format == OUTPUT_FORMAT_JSON and index is not None:
+                scoped_messages.extend(index.add(out_path, meta.get('current_release_date')))  # type: ignore
+
+        if previous_file := configuration.get('previous_file'):
+            patch = delta.diff(api.load_csaf(previous_file), csaf_dict)  # type: ignore
+            patch_name = advisor.derive_csaf_filename(meta.get('id'), bool(meta.get('valid'))).replace(  # type: ignore
+                CSAF_FILE_SUFFIX, JSON_PATCH_FILE_SUFFIX
+            )
+            patch_path = out_dir_effective / patch_name
+            scoped_messages.extend(
+                writer.write_payload(
+                    writer.encode(patch, options, canonical_form=canonical_form),
+                    patch_path,
+                    sink,
+                    if_changed=if_changed,
+                )
+            )
+        if catalog is not None or configuration.get(CATALOG_KEY):
+            cataloged_path = out_paths.get(OUTPUT_FORMAT_JSON) or next(iter(out_paths.values()))
+            document = csaf_dict or api.load_csaf(cataloged_path)  # Cache hits skipped the mapping
+            if catalog is None:
+                import muuntaa.catalog as catalog_module
+
+                with catalog_module.Catalog(configuration[CATALOG_KEY]) as own_catalog:  # type: ignore
+                    scoped_messages.extend(own_catalog.upsert(document, cataloged_path, products))
+            else:
+                scoped_messages.extend(catalog.upsert(document, cataloged_path, products))
+        if configuration.get('print', False):
+            sys.stdout.buffer.write(encoded[OUTPUT_FORMAT_JSON])
+            sys.stdout.buffer.write(b'\n')
+            sys.stdout.buffer.flush()
+        if own_index:
+            scoped_messages.extend(index.save(sink))  # type: ignore
+        if own_sink and rebuild_index:  # A batch rebuilds the index once at the end
+            scoped_messages.extend(provider.rebuild_index(out_dir, sink))
+        if own_sink:
+            scoped_messages.extend(sink.close())
+    except Exception as err:  # noqa
+        scoped_messages.append((logging.CRITICAL, f'Writing the output failed. {err}'))
+
+    return _report(scoped_messages)
+
+
+def process_batch(configuration: ConfigType) -> int:
+    """Convert the newest revision per tracking ID of all CVRF documents in the input folder."""
+    import muuntaa.batch as batch
+
+    import muuntaa.api as api
+    import muuntaa.memo as memo
+    import muuntaa.provider as provider
+
+    in_dir = pathlib.Path(configuration[INPUT_DIR_KEY])  # type: ignore
+    selected, scoped_messages = batch.newest_revisions(sorted(in_dir.glob(CVRF_FILE_PATTERN)))
+    subtree_memo = memo.SubtreeMemo()  # Documents of one batch often share product trees, notes, and references
+    try:
+        converter = api.Converter(configuration, memo=subtree_memo)
+    except ValueError as err:
+        scoped_messages.append((logging.CRITICAL, f'Invalid configuration. {err}'))
+        return _report(scoped_messages)
+    code = _report(scoped_messages)
+    scoped_messages = []
+    sink = _output_sink(configuration)
+    out_dir = pathlib.Path(configuration.get('output_dir', './'))  # type: ignore
+    rebuild_index = bool(configuration.get('rebuild_provider_index', False))
+    index = None
+    if configuration.get('provider_index', False) and not rebuild_index:
+        index = provider.ProviderIndex(out_dir)
+        scoped_messages.extend(index.load())
+    shared = {
+        'converter': converter,
+        'sink': sink,
+        'index': index,
+        'conversion_cache': _conversion_cache(configuration),
+    }
+    with contextlib.ExitStack() as stack:
+        if catalog_path := configuration.get(CATALOG_KEY):
+            import muuntaa.catalog as catalog_module
+
+            shared['catalog'] = stack.enter_context(catalog_module.Catalog(catalog_path))  # type: ignore # One database
+        for path in selected:
+            code = max(code, process({**configuration, INPUT_FILE_KEY: str(path)}, **shared))  # type: ignore
+
+    if subtree_memo.hits:
+        scoped_messages.append((logging.INFO, f'Reused {subtree_memo.hits} memoized subtrees.'))
+    if rebuild_index:
+        scoped_messages.extend(provider.rebuild_index(out_dir, sink))
+    elif index is not None:  # Save the index and sync the outputs once for the whole batch
+        scoped_messages.extend(index.save(sink))
+    scoped_messages.extend(sink.close())
+    return max(code, _report(scoped_messages))
+
+
+def query(argv: list[str]) -> int:
+    """Answer which converted advisories mention a CVE, a product, or a tracking ID per the catalog."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=f'{APP_ALIAS} {QUERY_COMMAND}', description='Query the catalog of converted advisories.'
+    )
+    parser.add_argument('--catalog', dest='catalog', type=str, required=True, metavar='PATH', help='Catalog database')
+    parser.add_argument('--cve', dest='cve', type=str, help='CVE ID (e.g. CVE-2017-3826)')
+    parser.add_argument('--product', dest='product', type=str, help='Product ID or start of the product name')
+    parser.add_argument('--id', dest='tracking_id', type=str, help='Tracking ID of the advisory')
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as err:
+        return int(str(err))
+    if not pathlib.Path(args.catalog).is_file():
+        scoped_log(logging.CRITICAL, f'Catalog not found, check the path: {args.catalog}')
+        return 1
+
+    import muuntaa.catalog as catalog_module
+
+    with catalog_module.Catalog(args.catalog) as catalog:
+        for path, tracking_id, version, current_release_date in catalog.query(args.cve, args.product, args.tracking_id):
+            print(f'{path}\t{tracking_id}\t{version}\t{current_release_date}')
     return 0
 
 
 def app(argv: Union[list[str], None] = None) -> int:
     """Delegate processing to functional module."""
     argv = sys.argv[1:] if argv is None else argv
+    if argv in VERSION_ARGS:  # Fast path without building the parser
+        print(VERSION)
+        return 0
+    init_logger(name=APP_ENV, level=logging.DEBUG if DEBUG else None)
+    if argv[:1] == [QUERY_COMMAND]:
+        return query(argv[1:])
     configuration, scoped_messages = parse_request(argv)
     if isinstance(configuration, int):
-        return 0
+        return configuration
+    if configuration.get(INPUT_DIR_KEY):
+        return process_batch(configuration)
     return process(configuration)
@@ -4,11 +4,55 @@ import logging
 import pkgutil
 from typing import Iterable, Union
 
-import yaml
+import msgspec
 
 from muuntaa import BOOLEAN_KEYS, ConfigType, ENCODING, Pathlike, ScopedMessages
 
 CONFIG_RESOURCE = 'resource/config.yml'
+SETTINGS_BOOLEAN_KEYS = (
+    'deterministic',
+    'fix_insert_current_version_into_revision_history',
+    'force',
+    'force_insert_default_reference_category',
+    'incremental',
+    'remove_CVSS_values_without_vector',
+)
+
+
+class Settings(msgspec.Struct, frozen=True, kw_only=True):
+    """Immutable typed settings the mapping depends on (validated once and safe to share across threads).
+
+    The field defaults are the single source of the defaults of the respective configuration keys.
+    """
+
+    csaf_version: str = '2.0'
+    default_CVSS3_version: str = '3.0'
+    deterministic: bool = False
+    fix_insert_current_version_into_revision_history: bool = False
+    force: bool = False
+    force_insert_default_reference_category: bool = True
+    generator_date: Union[str, None] = None
+    incremental: bool = False
+    publisher_name: Union[str, None] = 'Publisher Name'
+    publisher_namespace: Union[str, None] = 'https://example.com'
+    remove_CVSS_values_without_vector: bool = False
+
+
+_DEFAULT = Settings()
+DEFAULTS: ConfigType = {  # Precompiled resource/config.yml (kept in sync per test) to avoid parsing YAML per run
+    'cvrf2csaf_name': 'CVRF-CSAF-Converter',
+    'force': _DEFAULT.force,
+    'cache_dir': '',
+    'cache_max_bytes': 1073741824,
+    'fsync_group_size': 0,
+    'csaf_version': _DEFAULT.csaf_version,
+    'publisher_name': _DEFAULT.publisher_name,
+    'publisher_namespace': _DEFAULT.publisher_namespace,
+    'fix_insert_current_version_into_revision_history': _DEFAULT.fix_insert_current_version_into_revision_history,
+    'force_insert_default_reference_category': _DEFAULT.force_insert_default_reference_category,
+    'remove_CVSS_values_without_vector': _DEFAULT.remove_CVSS_values_without_vector,
+    'default_CVSS3_version': _DEFAULT.default_CVSS3_version,
+}
 
 
 def boolify(configuration: ConfigType, boolean_keys: Union[Iterable[str], None] = None) -> ScopedMessages:
@@ -49,13 +93,27 @@ def boolify(configuration: ConfigType, boolean_keys: Union[Iterable[str], None]
     return scoped_messages
 
 
+def to_settings(configuration: ConfigType) -> tuple[Union[Settings, None], ScopedMessages]:
+    """Validate the configuration (without modifying it) into settings (None if not valid)."""
+    present = [key for key in SETTINGS_BOOLEAN_KEYS if key in configuration]
+    candidate = dict(configuration)
+    scoped_messages = boolify(candidate, present)
+    if any(level >= logging.CRITICAL for level, _ in scoped_messages):
+        return None, scoped_messages
+    try:
+        return msgspec.convert(candidate, Settings, strict=False), scoped_messages
+    except msgspec.ValidationError as err:
+        return None, scoped_messages + [(logging.CRITICAL, f'Parsing configuration failed. {err}.')]
+
+
 def load(external_path: Union[None, Pathlike] = None) -> ConfigType:
-    """Load the configuration either from the package resources (default) or an external path."""
+    """Load the configuration either from the package defaults or an external path (only then parsing YAML)."""
     if external_path:
+        import yaml  # Deferred as only external configurations require parsing YAML
+
         with open(external_path, 'rt', encoding=ENCODING) as handle:
             return yaml.safe_load(handle)  # type: ignore
-    else:
-        return yaml.safe_load(pkgutil.get_data(__package__, CONFIG_RESOURCE).decode(encoding=ENCODING))  # type: ignore
+    return dict(DEFAULTS)
 
 
 def eject() -> str:
@@ -0,0 +1,126 @@
+"""Derive JSON Patch (RFC 6902) deltas between two revisions of a CSAF document.
+
+Cf. https://www.rfc-editor.org/rfc/rfc6902
+
+Lists of identifiable entries (vulnerabilities by CVE or IDs, products by product_id, groups by group_id)
+are matched per key instead of per position, so the delta is computed in linear time.
+"""
+
+from typing import Any, Callable, Union
+
+PatchType = list[dict[str, Any]]
+KeyType = Union[str, tuple[Any, ...], None]
+
+
+def _vulnerability_key(vulnerability: dict[str, Any]) -> KeyType:
+    if cve := vulnerability.get('cve'):
+        return cve  # type: ignore
+    if ids := vulnerability.get('ids'):
+        return tuple((entry.get('system_name'), entry.get('text')) for entry in ids)
+    return None
+
+
+def _relationship_key(relationship: dict[str, Any]) -> KeyType:
+    return relationship.get('full_product_name', {}).get('product_id')  # type: ignore
+
+
+KEYED_LISTS: dict[str, Callable[[dict[str, Any]], KeyType]] = {
+    'vulnerabilities': _vulnerability_key,
+    'full_product_names': lambda product: product.get('product_id'),
+    'product_groups': lambda group: group.get('group_id'),
+    'relationships': _relationship_key,
+}
+
+
+def pointer(parent: str, token: Union[str, int]) -> str:
+    """Append the reference token to the parent JSON pointer (escaping per RFC 6901)."""
+    return f'{parent}/{str(token).replace("~", "~0").replace("/", "~1")}'
+
+
+def _keys(entries: list[Any], key_of: Callable[[dict[str, Any]], KeyType]) -> Union[list[KeyType], None]:
+    """Provide the unique keys of all entries or None if not all entries are identifiable."""
+    keys = [key_of(entry) if isinstance(entry, dict) else None for entry in entries]
+    if None in keys or len(set(keys)) != len(keys):
+        return None
+    return keys
+
+
+def _diff_keyed(
+    old: list[Any], new: list[Any], keys_old: list[KeyType], keys_new: list[KeyType], path: str
+) -> PatchType:
+    """Match entries per key: remove vanished ones (from the end), then walk the new list diffing or adding."""
+    wanted = set(keys_new)
+    patch: PatchType = [
+        {'op': 'remove', 'path': pointer(path, index)}
+        for index in reversed(range(len(keys_old)))
+        if keys_old[index] not in wanted
+    ]
+    survivors = {key: entry for key, entry in zip(keys_old, old) if key in wanted}
+    if list(survivors) != [key for key in keys_new if key in survivors]:
+        return [{'op': 'replace', 'path': path, 'value': new}]  # Reordered entries - no positional delta
+    for index, (key, entry) in enumerate(zip(keys_new, new)):
+        if key in survivors:
+            patch.extend(_diff(survivors[key], entry, pointer(path, index)))
+        else:
+            patch.append({'op': 'add', 'path': pointer(path, index), 'value': entry})
+    return patch
+
+
+def _diff_list(old: list[Any], new: list[Any], path: str, name: str) -> PatchType:
+    if (key_of := KEYED_LISTS.get(name)) is not None:
+        keys_old, keys_new = _keys(old, key_of), _keys(new, key_of)
+        if keys_old is not None and keys_new is not None:
+            return _diff_keyed(old, new, keys_old, keys_new, path)
+    common = min(len(old), len(new))
+    patch: PatchType = []
+    for index in range(common):
+        patch.extend(_diff(old[index], new[index], pointer(path, index)))
+    patch.extend({'op': 'add', 'path': pointer(path, '-'), 'value': entry} for entry in new[common:])
+    patch.extend({'op': 'remove', 'path': pointer(path, index)} for index in reversed(range(common, len(old))))
+    return patch
+
+
+def _diff(old: Any, new: Any, path: str, name: str = '') -> PatchType:
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch: PatchType = [{'op': 'remove', 'path': pointer(path, key)} for key in old if key not in new]
+        for key, value in new.items():
+            if key not in old:
+                patch.append({'op': 'add', 'path': pointer(path, key), 'value': value})
+            else:
+                patch.extend(_diff(old[key], value, pointer(path, key), key))
+        return patch
+    if isinstance(old, list) and isinstance(new, list):
+        return _diff_list(old, new, path, name)
+    if type(old) is not type(new) or old != new:
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return []
+
+
+def diff(old: dict[str, Any], new: dict[str, Any]) -> PatchType:
+    """Derive the JSON Patch operations transforming the old into the new document."""
+    return _diff(old, new, '')
+
+
+def apply(document: Any, patch: PatchType) -> Any:
+    """Apply the add, remove, and replace operations of a patch (as derived by diff) to the document in place."""
+    for operation in patch:
+        tokens = [token.replace('~1', '/').replace('~0', '~') for token in operation['path'].split('/')[1:]]
+        if not tokens:
+            document = operation['value']
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if operation['op'] == 'add':
+                parent.insert(len(parent) if last == '-' else int(last), operation['value'])
+            elif operation['op'] == 'remove':
+                del parent[int(last)]
+            else:
+                parent[int(last)] = operation['value']
+        elif operation['op'] == 'remove':
+            del parent[last]
+        else:
+            parent[last] = operation['value']
+    return document
@@ -2,19 +2,41 @@
 
 import logging
 import operator
+from itertools import chain
 from typing import Any, Union
 
 import lxml.objectify  # nosec B410
+import msgspec
 
-from muuntaa.config import boolify
+from muuntaa.config import Settings
 from muuntaa.dialect import PUBLISHER_TYPE_CATEGORY, TRACKING_STATUS
-from muuntaa.strftime import get_utc_timestamp
-from muuntaa.subtree import Subtree
+from muuntaa.strftime import TimestampType, get_utc_timestamp, get_utc_timestamps, timestamp_of
+from muuntaa.subtree import DocumentBuilder, Subtree
 
-from muuntaa import APP_ALIAS, ConfigType, NOW_CODE, VERSION, VERSION_PATTERN, cleanse_id, integer_tuple
+from muuntaa import APP_ALIAS, NOW_CODE, VERSION, VERSION_PATTERN, cleanse_id, integer_tuple
 
 RootType = lxml.objectify.ObjectifiedElement
-RevHistType = list[dict[str, Union[str, None, tuple[int, ...]]]]
+
+
+class Revision(msgspec.Struct, gc=False):
+    """Revision history entry with the helper fields needed while mapping (cf. as_dict for the output form)."""
+
+    date: Any
+    number: Union[str, None]  # May be patched later (in case of mismatches)
+    summary: Union[str, None]
+    number_cvrf: Union[str, None]  # Keep track of original value (later matching)
+    version_as_int_tuple: tuple[int, ...]
+    legacy_version: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+
+    def as_dict(self) -> dict[str, Any]:
+        """Provide the output form without the helper fields."""
+        record = {'date': self.date, 'number': self.number, 'summary': self.summary}
+        if self.legacy_version is not msgspec.UNSET:
+            record['legacy_version'] = self.legacy_version
+        return record
+
+
+RevHistType = list[Revision]
 
 
 class Leafs(Subtree):
@@ -25,24 +47,26 @@ class Leafs(Subtree):
     )
     """
 
-    def __init__(self, config: ConfigType) -> None:
-        super().__init__()
-        if self.tree.get('document') is None:
-            self.tree['document'] = {}
-        self.hook = self.tree['document']
-        self.hook['csaf_version'] = config.get('csaf_version')
+    __slots__ = ()
+
+    path = ('document',)
+
+    def __init__(self, settings: Settings, builder: Union[DocumentBuilder, None] = None) -> None:
+        super().__init__(builder)
+        self.hook = self.builder.node(self.path)
+        self.hook['csaf_version'] = settings.csaf_version
 
     def always(self, root: RootType) -> None:
         self.hook['category'] = root.DocumentType.text
         self.hook['title'] = root.DocumentTitle.text
 
     def sometimes(self, root: RootType) -> None:
-        if doc_dist := root.DocumentDistribution is not None:
-            self.hook['distribution'] = {'text': doc_dist.text}  # type: ignore
+        if (doc_dist := getattr(root, 'DocumentDistribution', None)) is not None:
+            self.hook['distribution'] = {'text': doc_dist.text}
 
-        if agg_sev := root.AggregateSeverity is not None:
-            self.hook['aggregate_severity'] = {'text': agg_sev.text}  # type: ignore
-            if agg_sev_ns := root.AggregateSeverity.attrib.get('Namespace') is not None:
+        if (agg_sev := getattr(root, 'AggregateSeverity', None)) is not None:
+            self.hook['aggregate_severity'] = {'text': agg_sev.text}
+            if (agg_sev_ns := agg_sev.attrib.get('Namespace')) is not None:
                 self.hook['aggregate_severity']['namespace'] = agg_sev_ns
 
 
@@ -54,25 +78,24 @@ class Publisher(Subtree):
     )
     """
 
-    def __init__(self, config: ConfigType):
-        super().__init__()
-        if self.tree.get('document') is None:
-            self.tree['document'] = {}
-        if self.tree['document'].get('publisher') is None:
-            self.tree['document']['publisher'] = {
-                'name': config.get('publisher_name'),
-                'namespace': config.get('publisher_namespace'),
-            }
-        self.hook = self.tree['document']['publisher']
+    __slots__ = ()
+
+    path = ('document', 'publisher')
+
+    def __init__(self, settings: Settings, builder: Union[DocumentBuilder, None] = None):
+        super().__init__(builder)
+        self.hook = self.builder.node(self.path)
+        if not self.hook:
+            self.hook.update(name=settings.publisher_name, namespace=settings.publisher_namespace)
 
     def always(self, root: RootType) -> None:
         category = PUBLISHER_TYPE_CATEGORY.get(root.attrib.get('Type', ''))  # TODO consistent key error handling?
         self.hook['category'] = category
 
     def sometimes(self, root: RootType) -> None:
-        if contact_details := root.ContactDetails:
+        if contact_details := getattr(root, 'ContactDetails', None):
             self.hook['contact_details'] = contact_details.text
-        if issuing_authority := root.IssuingAuthority:
+        if issuing_authority := getattr(root, 'IssuingAuthority', None):
             self.hook['issuing_authority'] = issuing_authority.text
 
 
@@ -83,42 +106,45 @@ class Tracking(Subtree):
     )
     """
 
-    fix_insert_current_version_into_revision_history: bool = False
+    __slots__ = ('fix_insert_current_version_into_revision_history', 'pin_generator_date_to_release')
 
-    def __init__(self, config: ConfigType):
-        super().__init__()
-        boolify(config)
-        self.fix_insert_current_version_into_revision_history = config.get(  # type: ignore
-            'fix_insert_current_version_into_revision_history', False
+    path = ('document', 'tracking')
+
+    def __init__(self, settings: Settings, builder: Union[DocumentBuilder, None] = None):
+        super().__init__(builder)
+        self.fix_insert_current_version_into_revision_history = (
+            settings.fix_insert_current_version_into_revision_history
         )
-        print(f'{self.fix_insert_current_version_into_revision_history=}')
-        processing_ts, problems = get_utc_timestamp(ts_text=NOW_CODE)
+        generator_date = settings.generator_date
+        # Deterministic output without a pinned generator date uses the current release date of the document
+        self.pin_generator_date_to_release = settings.deterministic and not generator_date
+        processing_ts, problems = get_utc_timestamp(ts_text=generator_date or NOW_CODE)
         for level, problem in problems:
             logging.log(level, problem)
-        if self.tree.get('document') is None:
-            self.tree['document'] = {}
-        if self.tree['document'].get('tracking') is None:
-            self.tree['document']['tracking'] = {
-                'generator': {
-                    'date': processing_ts,
-                    'engine': {
-                        'name': APP_ALIAS,
-                        'version': VERSION,
-                    },
+        self.hook = self.builder.node(self.path)
+        if not self.hook:
+            self.hook['generator'] = {
+                'date': processing_ts,
+                'engine': {
+                    'name': APP_ALIAS,
+                    'version': VERSION,
                 },
             }
-        self.hook = self.tree['document']['tracking']
 
     def always(self, root: RootType) -> None:
-        current_release_date, problems = get_utc_timestamp(root.CurrentReleaseDate.text or '')
-        for level, problem in problems:
-            logging.log(level, problem)
-        initial_release_date, problems = get_utc_timestamp(root.InitialReleaseDate.text or '')
-        for level, problem in problems:
-            logging.log(level, problem)
-        revision_history, version = self._handle_revision_history_and_version(root)
+        timestamps = get_utc_timestamps(
+            chain(
+                (root.CurrentReleaseDate.text or '', root.InitialReleaseDate.text or ''),
+                (revision.Date.text or '' for revision in root.RevisionHistory.Revision),
+            )
+        )
+        current_release_date = timestamp_of(timestamps, root.CurrentReleaseDate.text or '')
+        initial_release_date = timestamp_of(timestamps, root.InitialReleaseDate.text or '')
+        revision_history, version = self._handle_revision_history_and_version(root, timestamps)
         status = TRACKING_STATUS.get(root.Status.text, '')  # type: ignore
         self.hook['current_release_date'] = current_release_date
+        if self.pin_generator_date_to_release:
+            self.hook['generator']['date'] = current_release_date
         self.hook['id'] = cleanse_id(root.Identification.ID.text or '')
         self.hook['initial_release_date'] = initial_release_date
         self.hook['revision_history'] = revision_history
@@ -126,32 +152,31 @@ class Tracking(Subtree):
         self.hook['version'] = version
 
     def sometimes(self, root: RootType) -> None:
-        if aliases := root.Identification.Alias:
+        if aliases := getattr(root.Identification, 'Alias', None):
             self.hook['aliases'] = [alias.text for alias in aliases]
 
     @staticmethod
     def only_version_t(revision_history: RevHistType) -> bool:
         """Verifies whether all version numbers in /document/tracking/revision_history comply."""
-        return all(VERSION_PATTERN.match(revision['number']) for revision in revision_history)  # type: ignore
+        return all(VERSION_PATTERN.match(revision.number or '') for revision in revision_history)
 
-    def _add_current_revision_to_history(self, root: RootType, revision_history: RevHistType) -> None:
+    def _add_current_revision_to_history(
+        self, root: RootType, revision_history: RevHistType, timestamps: dict[str, TimestampType]
+    ) -> None:
         """Adds the current version to history, if former is missing in latter and fix is requested.
 
         The user can request the fix per --fix-insert-current-version-into-revision-history option
         or per setting the respective configuration key to true.
         """
 
-        entry_date, problems = get_utc_timestamp(root.CurrentReleaseDate.text or '')
-        for level, problem in problems:
-            logging.log(level, problem)
         revision_history.append(
-            {
-                'date': entry_date,
-                'number': root.Version.text,
-                'summary': f'Added by {APP_ALIAS} as the value was missing in the original CVRF.',
-                'number_cvrf': root.Version.text,  # Helper field
-                'version_as_int_tuple': integer_tuple(root.Version.text or ''),  # Helper field
-            }
+            Revision(
+                date=timestamp_of(timestamps, root.CurrentReleaseDate.text or ''),
+                number=root.Version.text,
+                summary=f'Added by {APP_ALIAS} as the value was missing in the original CVRF.',
+                number_cvrf=root.Version.text,
+                version_as_int_tuple=integer_tuple(root.Version.text or ''),
+            )
         )
 
     @staticmethod
@@ -160,36 +185,38 @@ class Tracking(Subtree):
             'Some version numbers in revision_history do not match semantic versioning. Reindexing to integers.'
         )
 
-        revision_history_sorted = sorted(revision_history, key=operator.itemgetter('version_as_int_tuple'))
+        revision_history_sorted = sorted(revision_history, key=operator.attrgetter('version_as_int_tuple'))
 
         for rev_number, revision in enumerate(revision_history_sorted, start=1):
-            revision['number'] = str(rev_number)
+            revision.number = str(rev_number)
             # add property legacy_version with the original version number
             # for each reindexed version
-            revision['legacy_version'] = revision['number_cvrf']
+            revision.legacy_version = revision.number_cvrf
 
         # after reindexing, match document version to corresponding one in revision history
-        version = next(rev for rev in revision_history_sorted if rev['number_cvrf'] == root.Version.text)['number']
+        version = next(rev for rev in revision_history_sorted if rev.number_cvrf == root.Version.text).number
 
         return revision_history_sorted, version  # type: ignore
 
-    def _handle_revision_history_and_version(self, root: RootType) -> tuple[list[dict[str, Any]], str | None]:
+    def _handle_revision_history_and_version(
+        self, root: RootType, timestamps: dict[str, TimestampType]
+    ) -> tuple[list[dict[str, Any]], str | None]:
         revision_history = [
-            {
-                'date': get_utc_timestamp(revision.Date.text or ''),  # type: ignore
-                'number': revision.Number.text,  # type: ignore # may be patched later (in case of mismatches)
-                'summary': revision.Description.text,  # type: ignore
-                'number_cvrf': revision.Number.text,  # type: ignore # keep track of original value (later matching)
-                'version_as_int_tuple': integer_tuple(revision.Number.text or ''),  # type: ignore # temporary
-            }
+            Revision(
+                date=timestamp_of(timestamps, revision.Date.text or ''),
+                number=revision.Number.text,
+                summary=revision.Description.text,
+                number_cvrf=revision.Number.text,
+                version_as_int_tuple=integer_tuple(revision.Number.text or ''),
+            )
             for revision in root.RevisionHistory.Revision
         ]
         version = root.Version.text
 
         missing_latest_version_in_history = False
-        if not [rev for rev in revision_history if rev['number'] == version]:  # Current version not in rev. history?
+        if not [rev for rev in revision_history if rev.number == version]:  # Current version not in rev. history?
             if self.fix_insert_current_version_into_revision_history:
-                self._add_current_revision_to_history(root, revision_history)
+                self._add_current_revision_to_history(root, revision_history, timestamps)
                 level = logging.WARNING
                 message = (
                     'Trying to fix the revision history by adding the current version.'
@@ -198,7 +225,7 @@ class Tracking(Subtree):
                 )
             else:
                 missing_latest_version_in_history = True
-                self.error_occurred = True
+                self.some_error = True
                 level = logging.ERROR
                 message = (
                     'Current version is missing in revision history.'
@@ -208,7 +235,7 @@ class Tracking(Subtree):
 
         if not self.only_version_t(revision_history):  # one or more versions do not comply
             if missing_latest_version_in_history:
-                self.error_occurred = True
+                self.some_error = True
                 logging.error(
                     'Can not reindex revision history to integers because of missing the current version.'
                     ' This can be fixed with --fix-insert-current-version-into-revision-history'
@@ -216,8 +243,4 @@ class Tracking(Subtree):
             else:  # sort and replace version values with rank as per conformance rule
                 revision_history, version = self._reindex_versions_to_integers(root, revision_history)
 
-        for revision in revision_history:  # remove temporary fields
-            revision.pop('number_cvrf')
-            revision.pop('version_as_int_tuple')
-
-        return revision_history, version
+        return [revision.as_dict() for revision in revision_history], version
@@ -0,0 +1,79 @@
+"""Memoize mapped subtrees (e.g. product trees, legal disclaimer notes, references) across documents.
+
+The key is the hash of the canonical XML (C14N) of the subtree root together with the subtree kind
+and any configuration the mapping depends on. The mapped contents are kept as MessagePack bytes, so every
+hit returns a fresh (unshared) structure and the memory bound is exact.
+"""
+
+import collections
+import hashlib
+from typing import Any, Union
+
+import lxml.etree  # nosec B410
+import msgspec
+
+from muuntaa.subtree import RootType, Subtree
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+encoder = msgspec.msgpack.Encoder()
+decoder = msgspec.msgpack.Decoder()
+
+
+class SubtreeMemo:
+    """Least recently used memo of mapped subtrees bounded by the total size of the stored encodings."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+
+    @staticmethod
+    def key(kind: str, root: RootType) -> str:
+        """Derive the key from the subtree kind and the canonical XML of the root (ignoring comments)."""
+        hasher = hashlib.sha256(f'{kind}\0'.encode())
+        hasher.update(lxml.etree.tostring(root, method='c14n', with_comments=False))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Union[tuple[Any, bool], None]:
+        """Provide a fresh copy of the mapped content and the error flag if memoized."""
+        if (encoded := self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        content, some_error = decoder.decode(encoded)
+        return content, some_error
+
+    def put(self, key: str, content: Any, some_error: bool) -> None:
+        """Memoize the mapped content evicting the least recently used entries beyond the size bound."""
+        encoded = encoder.encode((content, some_error))
+        if len(encoded) > self.max_bytes:
+            return
+        if (previous := self.entries.pop(key, None)) is not None:
+            self.size -= len(previous)
+        self.entries[key] = encoded
+        self.size += len(encoded)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def load_memoized(part: Subtree, root: RootType, memo: Union[SubtreeMemo, None], variant: str = '') -> None:
+    """Load the subtree part from root unless an identical subtree has already been mapped.
+
+    The variant shall capture everything (besides the XML) the mapping of the part depends on (e.g. configuration).
+    Note: Log messages of the original mapping are not repeated on hits.
+    """
+    if memo is None:
+        part.load(root)
+        return
+    key = memo.key(f'{type(part).__name__}\0{variant}', root)
+    if (memoized := memo.get(key)) is not None:
+        content, part.some_error = memoized
+        part.attach(content)
+        return
+    part.load(root)
+    memo.put(key, part.content(), part.some_error)
@@ -1,11 +1,11 @@
 """Notes type."""
 
 import logging
-from typing import Union
+from typing import Any, Union
 
 import lxml.objectify  # nosec B410
 
-from muuntaa.subtree import Subtree
+from muuntaa.subtree import DocumentBuilder, Subtree
 
 RootType = lxml.objectify.ObjectifiedElement
 RevHistType = list[dict[str, Union[str, None, tuple[int, ...]]]]
@@ -23,22 +23,23 @@ class Notes(Subtree):
     ENUM_CATEGORIES = {'description', 'details', 'faq', 'general', 'legal_disclaimer', 'other', 'summary'}
     ENUM_MSG = ','.join(ENUM_CATEGORIES)
 
-    def __init__(self, lc_parent_code: str):  # TODO: unlitter me and push data upstream
-        super().__init__()
+    __slots__ = ()
+
+    path = ('document', 'notes')
+
+    def __init__(
+        self,
+        lc_parent_code: str,
+        builder: Union[DocumentBuilder, None] = None,
+        target: Union[list[dict[str, Any]], None] = None,
+    ) -> None:
+        super().__init__(builder)
         if lc_parent_code not in ('cvrf', 'vuln'):
             raise KeyError('Notes can only be hosted by cvrf or vuln')
-        if lc_parent_code == 'cvrf':
-            if self.tree.get('document') is None:
-                self.tree['document'] = {}
-            if self.tree['document'].get('notes') is None:
-                self.tree['document']['notes'] = []
-            self.hook = self.tree['document']['notes']
-        else:
-            if self.tree.get('vulnerabilities') is None:
-                self.tree['vulnerabilities'] = {}
-            if self.tree['vulnerabilities'].get('notes') is None:
-                self.tree['vulnerabilities']['notes'] = []
-            self.hook = self.tree['vulnerabilities']['notes']
+        if lc_parent_code == 'vuln' and target is None:
+            raise KeyError('Notes hosted by vuln require a target list')
+        self.hook = self.builder.items(self.path) if target is None else target
+        self.hosted = target is not None
 
     def always(self, root: RootType) -> None:
         for data in root.Note:
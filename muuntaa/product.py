@@ -1,14 +1,78 @@
 """Products type."""
 
 import logging
+from typing import Any, Iterable, Union
 
+import lxml.etree  # nosec B410
 import lxml.objectify  # nosec B410
+import msgspec
 
 from muuntaa.dialect import BRANCH_TYPE, RELATION_TYPE
-from muuntaa.subtree import Subtree
+from muuntaa.subtree import DocumentBuilder, Subtree
 
 RootType = lxml.objectify.ObjectifiedElement
 
+RelationshipEdge = tuple[str, str, str]  # (category, product_reference, relates_to_product_reference)
+
+
+class ProductIndex(msgspec.Struct):
+    """Lookup tables over a mapped product tree resolving product and group IDs in constant time."""
+
+    names: dict[str, dict[str, Any]] = {}  # product_id -> full_product_name
+    paths: dict[str, list[str]] = {}  # product_id -> branch names from the top of the tree (empty if not in branches)
+    cpes: dict[str, str] = {}  # product_id -> CPE
+    groups: dict[str, list[str]] = {}  # group_id -> product_ids
+    relationships: dict[str, list[RelationshipEdge]] = {}  # product_id of the combination -> edges
+
+    @classmethod
+    def of(cls, product_tree: dict[str, Any]) -> 'ProductIndex':
+        """Build the index in one pass over the mapped product tree (the first definition of a product ID wins)."""
+        index = cls()
+        for full_product_name in product_tree.get('full_product_names', []):
+            index.add(full_product_name, [])
+        stack = [(branch, [branch.get('name', '')]) for branch in reversed(product_tree.get('branches') or [])]
+        while stack:
+            branch, path = stack.pop()
+            if (product := branch.get('product')) is not None:
+                index.add(product, path)
+            stack.extend((child, path + [child.get('name', '')]) for child in reversed(branch.get('branches') or []))
+        for relationship in product_tree.get('relationships', []):
+            index.add_relationship(relationship)
+        for group in product_tree.get('product_groups', []):
+            index.add_group(group)
+        return index
+
+    def add(self, full_product_name: dict[str, Any], path: list[str]) -> None:
+        """Register the full product name found at the branch path (the first definition of a product ID wins)."""
+        if (product_id := full_product_name.get('product_id')) is None or product_id in self.names:
+            return
+        self.names[product_id] = full_product_name
+        self.paths[product_id] = path
+        if cpe := full_product_name.get('product_identification_helper', {}).get('cpe'):
+            self.cpes[product_id] = cpe
+
+    def add_relationship(self, relationship: dict[str, Any]) -> None:
+        """Register the relationship and the full product name of the combination it defines."""
+        full_product_name = relationship.get('full_product_name', {})
+        self.add(full_product_name, [])
+        edge = (
+            relationship.get('category', ''),
+            relationship.get('product_reference', ''),
+            relationship.get('relates_to_product_reference', ''),
+        )
+        self.relationships.setdefault(full_product_name.get('product_id', ''), []).append(edge)
+
+    def add_group(self, group: dict[str, Any]) -> None:
+        """Register the product IDs of the group."""
+        self.groups[group['group_id']] = list(group.get('product_ids', []))
+
+    def expand(self, product_ids: Iterable[str] = (), group_ids: Iterable[str] = ()) -> list[str]:
+        """Resolve product and group IDs into the distinct product IDs (in order of appearance)."""
+        expanded = dict.fromkeys(product_ids)
+        for group_id in group_ids:
+            expanded.update(dict.fromkeys(self.groups.get(group_id, [])))
+        return list(expanded)
+
 
 class Products(Subtree):
     """Represents the Products type.
@@ -18,21 +82,33 @@ class Products(Subtree):
     )
     """
 
-    def __init__(self) -> None:
-        super().__init__()
-        if self.tree.get('product_tree') is None:
-            self.tree['product_tree'] = {}
-        self.hook = self.tree['product_tree']
+    __slots__ = ('branch_depth', 'index')
+
+    path = ('product_tree',)
+
+    def __init__(self, builder: Union[DocumentBuilder, None] = None) -> None:
+        super().__init__(builder)
+        self.hook = self.builder.node(self.path)
+        self.branch_depth = 0
+        self.index = ProductIndex()  # Built while mapping (and rebuilt if the content is attached from a memo)
 
     def always(self, root: RootType) -> None:
         pass
 
+    def attach(self, content: Any) -> None:
+        super().attach(content)
+        self.index = ProductIndex.of(content)
+
+    def product_index(self) -> ProductIndex:
+        """Provide the index of the mapped product tree."""
+        return self.index
+
     def sometimes(self, root: RootType) -> None:
         self._handle_full_product_names(root)
         self._handle_relationships(root)
         self._handle_product_groups(root)
 
-        branches = self._handle_branches_recursive(root)
+        branches = self._handle_branches(root)
         if branches is not None:
             self.hook['branches'] = branches
 
@@ -55,13 +131,15 @@ class Products(Subtree):
         return BRANCH_TYPE[branch_type]  # TODO implement consistent key error reaction strategy
 
     def _handle_full_product_names(self, root: RootType) -> None:
-        if full_product_name := root.FullProductName:
+        if full_product_name := getattr(root, 'FullProductName', None):
             self.hook['full_product_names'] = [
                 self._get_full_product_name(fpn_elem) for fpn_elem in full_product_name  # type: ignore
             ]
+            for fpn in self.hook['full_product_names']:
+                self.index.add(fpn, [])
 
     def _handle_relationships(self, root: RootType) -> None:
-        if relationship := root.Relationship:
+        if (relationship := getattr(root, 'Relationship', None)) is not None:
             relationships = []
             for entry in relationship:
                 # Take the first entry only as the full_product_name.
@@ -80,11 +158,12 @@ class Products(Subtree):
                     'full_product_name': self._get_full_product_name(first_prod_name),
                 }
                 relationships.append(rel_to_add)
+                self.index.add_relationship(rel_to_add)
 
             self.hook['relationships'] = relationships
 
     def _handle_product_groups(self, root: RootType) -> None:
-        if product_groups := root.ProductGroups:
+        if (product_groups := getattr(root, 'ProductGroups', None)) is not None:
             records = []
             for product_group in product_groups.Group:
                 product_ids = [x.text for x in product_group.ProductID]  # type: ignore
@@ -92,37 +171,42 @@ class Products(Subtree):
                     'group_id': product_group.attrib['GroupID'],
                     'product_ids': product_ids,
                 }
-                if summary := product_group.Description:  # type: ignore
+                if summary := getattr(product_group, 'Description', None):
                     record['summary'] = summary.text
                 records.append(record)
+                self.index.add_group(record)
 
             self.hook['product_groups'] = records
 
-    def _handle_branches_recursive(self, root: RootType):  # type: ignore
-        """Process the branches (any branch can contain either list of other branches or a single FullProductName)."""
-        if not root.Branch and not root.FullProductName:
+    def _handle_branches(self, root: RootType) -> Union[list[dict[str, Any]], None]:
+        """Process the branches per explicit stack visiting each Branch element once (any branch contains
+        either a list of other branches or a single FullProductName) and record the maximum depth.
+        """
+        namespace = lxml.etree.QName(root).namespace
+        branch_tag, product_tag = (f'{{{namespace}}}{name}' for name in ('Branch', 'FullProductName'))
+        if not (children := list(root.iterchildren(branch_tag))):
             return None  # No branches to process
 
-        if 'Branch' in root.tag and (full_product_name := root.FullProductName):
-            # Inside Branch (not in the top ProductTree element, where FullProductName can also occur)
-            leaf_branch = {
-                'name': root.attrib['Name'],
-                'category': self._get_branch_type(root.attrib['Type']),  # type: ignore
-                'product': self._get_full_product_name(full_product_name),
+        branches: list[dict[str, Any]] = []
+        stack: list[tuple[Any, list[dict[str, Any]], list[str]]] = [
+            (entry, branches, []) for entry in reversed(children)
+        ]
+        while stack:
+            entry, siblings, parent_path = stack.pop()
+            path = parent_path + [entry.attrib['Name']]
+            self.branch_depth = max(self.branch_depth, len(path))
+            branch = {
+                'name': entry.attrib['Name'],
+                'category': self._get_branch_type(entry.attrib['Type']),
             }
-            return leaf_branch  # Current root is the leaf branch
-
-        if branch := root.Branch:
-            branches = []
-            for entry in branch:
-                if entry.FullProductName:  # type: ignore
-                    branches.append(self._handle_branches_recursive(entry))  # type: ignore
-                else:
-                    branches.append(
-                        {
-                            'name': entry.attrib['Name'],
-                            'category': self._get_branch_type(entry.attrib['Type']),  # type: ignore
-                            'branches': self._handle_branches_recursive(entry),  # type: ignore
-                        }
-                    )
-            return branches
+            if (full_product_name := entry.find(product_tag)) is not None:
+                branch['product'] = self._get_full_product_name(full_product_name)
+                self.index.add(branch['product'], path)
+            elif nested := list(entry.iterchildren(branch_tag)):
+                branch['branches'] = []
+                stack.extend((child, branch['branches'], path) for child in reversed(nested))
+            else:
+                branch['branches'] = None
+            siblings.append(branch)
+        logging.info('Product tree branches reach a maximum depth of %d.', self.branch_depth)
+        return branches
@@ -0,0 +1,126 @@
+"""Maintain the CSAF provider distribution files index.txt and changes.csv of an output folder.
+
+Cf. https://docs.oasis-open.org/csaf/csaf/v2.0/csaf-v2.0.html#7114-requirement-14-changescsv
+"""
+
+import csv
+import heapq
+import io
+import logging
+import operator
+import os
+import pathlib
+from typing import Union
+
+import msgspec
+
+from muuntaa import CSAF_FILE_SUFFIX, ENCODING, Pathlike, ScopedMessages
+from muuntaa.advisor import INVALID
+from muuntaa.writer import OutputSink
+
+INDEX_TXT = 'index.txt'
+CHANGES_CSV = 'changes.csv'
+
+ChangeEntry = tuple[str, str]  # (relative path, current release date)
+
+
+class _Tracking(msgspec.Struct):
+    current_release_date: str
+
+
+class _Document(msgspec.Struct):
+    tracking: _Tracking
+
+
+class _Advisory(msgspec.Struct):
+    document: _Document
+
+
+tracking_decoder = msgspec.json.Decoder(_Advisory)  # Skips all but the tracking release date
+
+
+def indexable(path: Pathlike) -> bool:
+    """Decide whether the output belongs into the provider index (only valid and uncompressed CSAF JSON files)."""
+    name = pathlib.PurePath(path).name
+    return name.endswith(CSAF_FILE_SUFFIX) and not name.endswith(f'{INVALID}{CSAF_FILE_SUFFIX}')
+
+
+def read_current_release_date(path: pathlib.Path) -> Union[str, None]:
+    """Read only the tracking release date from a CSAF JSON file."""
+    return tracking_decoder.decode(path.read_bytes()).document.tracking.current_release_date
+
+
+class ProviderIndex:
+    """Sorted index of the advisories below a provider folder merging new entries incrementally.
+
+    The changes are kept in descending order of the current release date (as in changes.csv),
+    updates are collected separately and merged on save in linear time.
+    """
+
+    def __init__(self, base_dir: Pathlike) -> None:
+        self.base_dir = pathlib.Path(base_dir)
+        self.changes: list[ChangeEntry] = []
+        self.updates: dict[str, str] = {}
+
+    def load(self) -> ScopedMessages:
+        """Load the existing changes.csv (already sorted) if present."""
+        path = self.base_dir / CHANGES_CSV
+        if not path.is_file():
+            return [(logging.INFO, f'No provider changes file at {path} yet.')]
+        with open(path, 'rt', encoding=ENCODING, newline='') as handle:
+            self.changes = [(row[0], row[1]) for row in csv.reader(handle) if len(row) == 2]
+        return []
+
+    def relative(self, path: Pathlike) -> str:
+        """Provide the path relative to the provider folder in posix notation."""
+        return pathlib.Path(os.path.relpath(path, self.base_dir)).as_posix()
+
+    def add(self, path: Pathlike, release_date: Union[str, None]) -> ScopedMessages:
+        """Register the advisory at path (replacing any earlier entry for the same path)."""
+        if not indexable(path):
+            return [(logging.INFO, f'Output {path} is no valid uncompressed CSAF JSON file. Not indexed.')]
+        if not release_date:
+            return [(logging.WARNING, f'Advisory {path} has no current release date. Not indexed.')]
+        self.updates[self.relative(path)] = release_date
+        return []
+
+    def merged(self) -> list[ChangeEntry]:
+        """Merge the updates into the sorted changes (most recent first)."""
+        kept = (entry for entry in self.changes if entry[0] not in self.updates)
+        fresh = sorted(self.updates.items(), key=operator.itemgetter(1), reverse=True)
+        return list(heapq.merge(kept, fresh, key=operator.itemgetter(1), reverse=True))
+
+    def save(self, sink: Union[OutputSink, None] = None) -> ScopedMessages:
+        """Write index.txt and changes.csv atomically."""
+        self.changes, self.updates = self.merged(), {}
+        one_shot = sink is None
+        if sink is None:
+            sink = OutputSink()
+        sink.ensure_dir(self.base_dir)
+        changes = io.StringIO()
+        csv.writer(changes, quoting=csv.QUOTE_ALL, lineterminator='\n').writerows(self.changes)
+        index = ''.join(f'{name}\n' for name in sorted(entry[0] for entry in self.changes))
+        for name, text in ((INDEX_TXT, index), (CHANGES_CSV, changes.getvalue())):
+            with sink.atomic(self.base_dir / name) as handle:
+                handle.write(text.encode(ENCODING))
+        scoped_messages: ScopedMessages = [
+            (logging.INFO, f'Updated provider index of {len(self.changes)} advisories in {self.base_dir}.')
+        ]
+        if one_shot:
+            scoped_messages.extend(sink.close())
+        return scoped_messages
+
+
+def rebuild_index(base_dir: Pathlike, sink: Union[OutputSink, None] = None) -> ScopedMessages:
+    """Rebuild index.txt and changes.csv from scratch reading only the tracking fields of all valid advisories."""
+    index = ProviderIndex(base_dir)
+    scoped_messages: ScopedMessages = []
+    for path in sorted(index.base_dir.rglob(f'*{CSAF_FILE_SUFFIX}')):
+        if not indexable(path):
+            continue
+        try:
+            scoped_messages.extend(index.add(path, read_current_release_date(path)))
+        except (OSError, msgspec.DecodeError) as err:
+            scoped_messages.append((logging.WARNING, f'Skipping {path} from provider index. {err}'))
+    scoped_messages.extend(index.save(sink))
+    return scoped_messages
@@ -1,13 +1,12 @@
 """References type."""
 
 import logging
-from typing import Union
+from typing import Any, Union
 
 import lxml.objectify  # nosec B410
 
-from muuntaa.config import boolify
-from muuntaa.subtree import Subtree
-from muuntaa import ConfigType
+from muuntaa.config import Settings
+from muuntaa.subtree import DocumentBuilder, Subtree
 
 RootType = lxml.objectify.ObjectifiedElement
 RevHistType = list[dict[str, Union[str, None, tuple[int, ...]]]]
@@ -22,26 +21,25 @@ class References(Subtree):
     )
     """
 
-    force_default_category: bool = False
+    __slots__ = ('force_default_category',)
 
-    def __init__(self, config: ConfigType, lc_parent_code: str):  # TODO: unlitter me and push data upstream
-        super().__init__()
-        boolify(config)
-        self.force_default_category = config.get('force_insert_default_reference_category', False)  # type: ignore
+    path = ('document', 'references')
+
+    def __init__(
+        self,
+        settings: Settings,
+        lc_parent_code: str,
+        builder: Union[DocumentBuilder, None] = None,
+        target: Union[list[dict[str, Any]], None] = None,
+    ) -> None:
+        super().__init__(builder)
+        self.force_default_category = settings.force_insert_default_reference_category
         if lc_parent_code not in ('cvrf', 'vuln'):
             raise KeyError('References can only be hosted by cvrf or vuln')
-        if lc_parent_code == 'cvrf':
-            if self.tree.get('document') is None:
-                self.tree['document'] = {}
-            if self.tree['document'].get('references') is None:
-                self.tree['document']['references'] = []
-            self.hook = self.tree['document']['references']
-        else:
-            if self.tree.get('vulnerabilities') is None:
-                self.tree['vulnerabilities'] = {}
-            if self.tree['vulnerabilities'].get('references') is None:
-                self.tree['vulnerabilities']['references'] = []
-            self.hook = self.tree['vulnerabilities']['references']
+        if lc_parent_code == 'vuln' and target is None:
+            raise KeyError('References hosted by vuln require a target list')
+        self.hook = self.builder.items(self.path) if target is None else target
+        self.hosted = target is not None
 
     def always(self, root: RootType) -> None:
         for reference in root.Reference:
@@ -1,8 +1,14 @@
 import datetime as dti
+import functools
 import logging
-from typing import Union
+import os
+from typing import Iterable, Union
 
-from muuntaa import NOW_CODE, ScopedMessages
+from muuntaa import NOW_CODE, SOURCE_DATE_EPOCH_ENV, ScopedMessages
+
+TIMESTAMP_CACHE_SIZE = 4096
+
+TimestampType = tuple[Union[str, None], ScopedMessages]
 
 
 def _line_slug(text: str) -> str:
@@ -10,17 +16,54 @@ def _line_slug(text: str) -> str:
     return text.replace('\n', ' ').replace('\r', ' ')
 
 
-def get_utc_timestamp(ts_text: str = NOW_CODE) -> tuple[Union[str, None], ScopedMessages]:
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _normalize(ts_text: str) -> tuple[Union[str, None], tuple[tuple[int, str], ...]]:
+    """Memoized normalization of a fixed (not now) timestamp text (problems as tuple to keep the entries immutable)."""
+    try:
+        stamp = dti.datetime.fromisoformat(ts_text.replace('Z', '+00:00'))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=dti.timezone.utc)
+        return stamp.isoformat(timespec='milliseconds'), ()
+    except (TypeError, ValueError) as err:
+        return None, ((logging.CRITICAL, f'invalid time stamp provided {ts_text}: {_line_slug(str(err))}.'),)
+
+
+cache_info = _normalize.cache_info  # Hit and miss counters of the timestamp memo
+cache_clear = _normalize.cache_clear
+
+
+def get_utc_timestamp(ts_text: str = NOW_CODE) -> TimestampType:
     """Returns an ordered pair of timestamp in UTC format and error (empty scoped messages no error).
 
-    If the magic timestamp text `now` is provided, then the current timestamp is returned.
+    If the magic timestamp text `now` is provided, then the current timestamp is returned (never memoized).
     """
     if ts_text == NOW_CODE:
         return dti.datetime.now(dti.timezone.utc).isoformat(timespec='milliseconds'), []
+    timestamp, problems = _normalize(ts_text)
+    return timestamp, list(problems)
+
+
+def timestamp_of(timestamps: dict[str, TimestampType], ts_text: str) -> Union[str, None]:
+    """Returns the timestamp of the text from a batch of normalized timestamps logging the problems if any."""
+    timestamp, problems = timestamps[ts_text]
+    for level, problem in problems:
+        logging.log(level, problem)
+    return timestamp
+
+
+def get_utc_timestamps(ts_texts: Iterable[str]) -> dict[str, TimestampType]:
+    """Returns the ordered pairs per distinct timestamp text collected from one document in one call.
+
+    The magic timestamp text `now` is evaluated once per call (so shared by all its occurrences in the document).
+    """
+    return {ts_text: get_utc_timestamp(ts_text) for ts_text in set(ts_texts)}
+
+
+def source_date_epoch() -> tuple[Union[str, None], ScopedMessages]:
+    """Returns an ordered pair of the timestamp in UTC format per SOURCE_DATE_EPOCH (if set) and error."""
+    if not (epoch := os.getenv(SOURCE_DATE_EPOCH_ENV, '').strip()):
+        return None, []
     try:
-        now = dti.datetime.fromisoformat(ts_text.replace('Z', '+00:00'))
-        if now.tzinfo is None:
-            now = now.replace(tzinfo=dti.timezone.utc)
-        return now.isoformat(timespec='milliseconds'), []
-    except (TypeError, ValueError) as err:
-        return None, [(logging.CRITICAL, f'invalid time stamp provided {ts_text}: {_line_slug(str(err))}.')]
+        return dti.datetime.fromtimestamp(int(epoch), dti.timezone.utc).isoformat(timespec='milliseconds'), []
+    except (OverflowError, OSError, ValueError) as err:
+        return None, [(logging.CRITICAL, f'invalid {SOURCE_DATE_EPOCH_ENV} provided {epoch}: {_line_slug(str(err))}.')]
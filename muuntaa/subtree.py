@@ -1,19 +1,55 @@
 """Named protocol to ensure common interfaces for the subtrees."""
 
 import logging
-from typing import Any, Protocol
+from typing import Any, Protocol, Union
 
 import lxml.objectify  # nosec B410
 
 RootType = lxml.objectify.ObjectifiedElement
+PathType = tuple[str, ...]
 
 
-class Subtree(Protocol):
-    tree: dict[str, Any] = None  # type: ignore
-    some_error: bool = False
+class DocumentBuilder:
+    """Mapped document that the subtrees write into directly at their target paths."""
+
+    __slots__ = ('document',)
 
     def __init__(self) -> None:
-        self.tree = {}
+        self.document: dict[str, Any] = {}
+
+    def node(self, path: PathType) -> dict[str, Any]:
+        """Provide the object at path (creating missing objects along the way)."""
+        node = self.document
+        for key in path:
+            node = node.setdefault(key, {})
+        return node
+
+    def items(self, path: PathType) -> list[Any]:
+        """Provide the array at path (creating missing objects along the way)."""
+        *parents, key = path
+        return self.node(tuple(parents)).setdefault(key, [])  # type: ignore
+
+    def attach(self, path: PathType, content: Any) -> None:
+        """Replace the content at path (keeping the position of an existing member)."""
+        *parents, key = path
+        self.node(tuple(parents))[key] = content
+
+
+class Subtree(Protocol):
+    __slots__ = ('builder', 'tree', 'hook', 'hosted', 'some_error')
+
+    builder: DocumentBuilder
+    tree: dict[str, Any]
+    hook: Any
+    hosted: bool  # Content goes into a target outside of the document (e.g. notes of a vulnerability)
+    path: PathType = ()  # Target of the mapped content within the document
+    some_error: bool
+
+    def __init__(self, builder: Union[DocumentBuilder, None] = None) -> None:
+        self.builder = DocumentBuilder() if builder is None else builder
+        self.tree = self.builder.document
+        self.hook = None
+        self.hosted = False
         self.some_error = False
 
     def always(self, root: RootType) -> None:
@@ -27,13 +63,25 @@ class Subtree(Protocol):
             self.always(root)
         except Exception as e:
             logging.error('ingesting always present element %s failed with %s', root.tag, e)
+            self.some_error = True
         try:
             self.sometimes(root)
         except Exception as e:
             logging.error('ingesting sometimes present element %s failed with %s', root.tag, e)
+            self.some_error = True
+
+    def content(self) -> Any:
+        """Provide the mapped content of this subtree only (e.g. for memoizing)."""
+        return self.hook
+
+    def attach(self, content: Any) -> None:
+        """Replace the mapped content of this subtree (e.g. from a memo)."""
+        self.builder.attach(self.path, content)
+        self.hook = content
 
-    def dump(self) -> dict[str, Any]:
-        return self.tree
+    def dump(self) -> Any:
+        """Provide the document (or only the content if hosted by a target outside of the document)."""
+        return self.content() if self.hosted else self.tree
 
     def has_errors(self) -> bool:
         return self.some_error
@@ -0,0 +1,152 @@
+"""Mandatory tests of CSAF v2.0 (section 6.1) on product and group references checked in a single pass.
+
+Cf. https://docs.oasis-open.org/csaf/csaf/v2.0/csaf-v2.0.html#61-mandatory-tests
+
+The definitions are collected into hash sets once per document, so every reference is checked in constant time.
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Iterator
+
+from muuntaa import ScopedMessages
+
+REQUIRED_DOCUMENT_MEMBERS = ('category', 'csaf_version', 'publisher', 'title', 'tracking')
+STATUS_GROUPS = {
+    'first_affected': 'affected',
+    'known_affected': 'affected',
+    'last_affected': 'affected',
+    'known_not_affected': 'not affected',
+    'first_fixed': 'fixed',
+    'fixed': 'fixed',
+    'under_investigation': 'under investigation',
+}
+
+ReferenceType = tuple[str, str]  # (ID, JSON path of the reference)
+
+
+def _defined_products(product_tree: dict[str, Any]) -> Iterator[ReferenceType]:
+    """Yield the product IDs of all full product names (top level, in branches, and of relationships)."""
+    for index, full_product_name in enumerate(product_tree.get('full_product_names', [])):
+        yield full_product_name.get('product_id', ''), f'/product_tree/full_product_names/{index}/product_id'
+    stack = [
+        (branch, f'/product_tree/branches/{index}') for index, branch in enumerate(product_tree.get('branches', []))
+    ]
+    while stack:
+        branch, path = stack.pop()
+        if (product := branch.get('product')) is not None:
+            yield product.get('product_id', ''), f'{path}/product/product_id'
+        stack.extend((child, f'{path}/branches/{index}') for index, child in enumerate(branch.get('branches', [])))
+    for index, relationship in enumerate(product_tree.get('relationships', [])):
+        product_id = relationship.get('full_product_name', {}).get('product_id', '')
+        yield product_id, f'/product_tree/relationships/{index}/full_product_name/product_id'
+
+
+def _product_references(csaf_dict: dict[str, Any]) -> Iterator[ReferenceType]:
+    """Yield all references to product IDs (cf. section 6.1.1)."""
+    product_tree = csaf_dict.get('product_tree') or {}
+    for index, group in enumerate(product_tree.get('product_groups', [])):
+        for pos, product_id in enumerate(group.get('product_ids', [])):
+            yield product_id, f'/product_tree/product_groups/{index}/product_ids/{pos}'
+    for index, relationship in enumerate(product_tree.get('relationships', [])):
+        for key in ('product_reference', 'relates_to_product_reference'):
+            if key in relationship:
+                yield relationship[key], f'/product_tree/relationships/{index}/{key}'
+    for v_index, vulnerability in enumerate(csaf_dict.get('vulnerabilities') or []):
+        base = f'/vulnerabilities/{v_index}'
+        for status, product_ids in (vulnerability.get('product_status') or {}).items():
+            for pos, product_id in enumerate(product_ids):
+                yield product_id, f'{base}/product_status/{status}/{pos}'
+        for member, key in (('remediations', 'product_ids'), ('threats', 'product_ids'), ('scores', 'products')):
+            for index, entry in enumerate(vulnerability.get(member) or []):
+                for pos, product_id in enumerate(entry.get(key, [])):
+                    yield product_id, f'{base}/{member}/{index}/{key}/{pos}'
+
+
+def _group_references(csaf_dict: dict[str, Any]) -> Iterator[ReferenceType]:
+    """Yield all references to group IDs (cf. section 6.1.4)."""
+    for v_index, vulnerability in enumerate(csaf_dict.get('vulnerabilities') or []):
+        for member in ('remediations', 'threats'):
+            for index, entry in enumerate(vulnerability.get(member) or []):
+                for pos, group_id in enumerate(entry.get('group_ids', [])):
+                    yield group_id, f'/vulnerabilities/{v_index}/{member}/{index}/group_ids/{pos}'
+
+
+def validate(csaf_dict: dict[str, Any]) -> ScopedMessages:
+    """Run the mandatory tests on product and group IDs (errors mean the document is not valid)."""
+    document = csaf_dict.get('document')
+    if not isinstance(document, dict):
+        return [(logging.ERROR, 'Missing /document (required per CSAF JSON schema).')]
+    scoped_messages: ScopedMessages = [
+        (logging.ERROR, f'Missing /document/{member} (required per CSAF JSON schema).')
+        for member in REQUIRED_DOCUMENT_MEMBERS
+        if member not in document
+    ]
+
+    product_tree = csaf_dict.get('product_tree') or {}
+    defined: Counter[str] = Counter()
+    for product_id, path in _defined_products(product_tree):
+        if not product_id:
+            continue
+        defined[product_id] += 1
+        if defined[product_id] == 2:
+            scoped_messages.append((logging.ERROR, f'6.1.2 Multiple definition of product ID {product_id} at {path}.'))
+    for product_id, path in _product_references(csaf_dict):
+        if product_id not in defined:
+            scoped_messages.append((logging.ERROR, f'6.1.1 Missing definition of product ID {product_id} at {path}.'))
+
+    for index, relationship in enumerate(product_tree.get('relationships', [])):
+        product_id = relationship.get('full_product_name', {}).get('product_id')
+        if product_id in (relationship.get('product_reference'), relationship.get('relates_to_product_reference')):
+            scoped_messages.append(
+                (
+                    logging.ERROR,
+                    f'6.1.3 Circular definition of product ID {product_id} at /product_tree/relationships/{index}.',
+                )
+            )
+
+    groups = Counter(group.get('group_id', '') for group in product_tree.get('product_groups', []))
+    scoped_messages.extend(
+        (logging.ERROR, f'6.1.5 Multiple definition of group ID {group_id}.')
+        for group_id, count in groups.items()
+        if count > 1
+    )
+    for group_id, path in _group_references(csaf_dict):
+        if group_id not in groups:
+            scoped_messages.append((logging.ERROR, f'6.1.4 Missing definition of group ID {group_id} at {path}.'))
+
+    for v_index, vulnerability in enumerate(csaf_dict.get('vulnerabilities') or []):
+        status_group: dict[str, str] = {}
+        for status, product_ids in (vulnerability.get('product_status') or {}).items():
+            if (group := STATUS_GROUPS.get(status)) is None:  # E.g. recommended does not contradict
+                continue
+            for product_id in product_ids:
+                if status_group.setdefault(product_id, group) != group:
+                    scoped_messages.append(
+                        (
+                            logging.ERROR,
+                            f'6.1.6 Contradicting product status of product ID {product_id}'
+                            f' ({status_group[product_id]} and {group}) at /vulnerabilities/{v_index}/product_status.',
+                        )
+                    )
+        scored: set[tuple[str, str, str]] = set()
+        for index, score in enumerate(vulnerability.get('scores') or []):
+            for key in ('cvss_v2', 'cvss_v3'):
+                if (version := (score.get(key) or {}).get('version')) is None:
+                    continue
+                for product_id in score.get('products', []):
+                    if (product_id, key, version) in scored:
+                        scoped_messages.append(
+                            (
+                                logging.ERROR,
+                                f'6.1.7 Multiple scores with same version {version} for product ID {product_id}'
+                                f' at /vulnerabilities/{v_index}/scores/{index}.',
+                            )
+                        )
+                    scored.add((product_id, key, version))
+    return scoped_messages
+
+
+def is_valid(scoped_messages: ScopedMessages) -> bool:
+    """Decide the validity per the reported scoped messages."""
+    return not any(level >= logging.ERROR for level, _ in scoped_messages)
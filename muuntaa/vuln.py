@@ -1,26 +1,72 @@
 """Vulnerabilities type."""
 
 import bisect
+import hashlib
 import logging
+import pathlib
 import re
-from typing import Union, no_type_check
+from typing import Any, Iterable, Union, no_type_check
 
 from collections import defaultdict
 from itertools import chain
 
+import lxml.etree  # nosec B410
 import lxml.objectify  # nosec B410
+import msgspec
 
 from muuntaa.ack import Acknowledgments
+from muuntaa.config import Settings
 from muuntaa.dialect import SCORE_CVSS_V2, SCORE_CVSS_V3, REMEDIATION_CATEGORY
 from muuntaa.notes import Notes
 from muuntaa.refs import References
-from muuntaa.strftime import get_utc_timestamp
-from muuntaa.subtree import Subtree
-from muuntaa import ConfigType
+from muuntaa.strftime import TimestampType, get_utc_timestamps, timestamp_of
+from muuntaa.subtree import DocumentBuilder, Subtree
+from muuntaa import ENCODING, VERSION, Pathlike, VULN_DIGESTS_FILE_SUFFIX
 
 RootType = lxml.objectify.ObjectifiedElement
 RevHistType = list[dict[str, Union[str, None, tuple[int, ...]]]]
 
+DIGEST_SIZE = 16
+NO_DIGEST = bytes(DIGEST_SIZE)  # Marks vulnerabilities that shall always be mapped again (e.g. mapping errors)
+VARIANT_KEYS = (  # Configuration keys that the mapping of a vulnerability depends on (besides the version)
+    'default_CVSS3_version',
+    'force_insert_default_reference_category',
+    'remove_CVSS_values_without_vector',
+)
+
+
+def digests_path(csaf_path: Pathlike) -> pathlib.Path:
+    """Derive the path of the vulnerability digests sidecar next to the CSAF output file."""
+    path = pathlib.Path(csaf_path)
+    return path.with_name(f'{path.name}{VULN_DIGESTS_FILE_SUFFIX}')
+
+
+def read_digests(path: Pathlike) -> list[bytes]:
+    """Read the vulnerability digests sidecar (concatenated fixed size digests in document order)."""
+    data = pathlib.Path(path).read_bytes()
+    if len(data) % DIGEST_SIZE:
+        raise ValueError(f'vulnerability digests file {path} is truncated')
+    return [data[offset : offset + DIGEST_SIZE] for offset in range(0, len(data), DIGEST_SIZE)]
+
+
+def previous_mapping(digests: list[bytes], vulnerabilities: list[dict[str, Any]]) -> dict[bytes, dict[str, Any]]:
+    """Pair the digests of the previous conversion with its mapped vulnerabilities (nothing if not aligned)."""
+    if len(digests) != len(vulnerabilities):
+        return {}
+    return {digest: vulnerability for digest, vulnerability in zip(digests, vulnerabilities) if digest != NO_DIGEST}
+
+
+class ScoreSet(msgspec.Struct, gc=False):
+    """CVSS score set of one version with the products it applies to."""
+
+    json_property: str  # cvss_v2 or cvss_v3
+    cvss: dict[str, Any]
+    products: list[str]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Provide the output form (keyed by the JSON property of the version)."""
+        return {self.json_property: self.cvss, 'products': self.products}
+
 
 class Vulnerabilities(Subtree):
     """Represents the Vulnerabilities type.
@@ -30,14 +76,73 @@ class Vulnerabilities(Subtree):
     )
     """
 
-    def __init__(self, config: ConfigType):
-        super().__init__()
-        self.config = config
-        self.remove_cvss_values_without_vector = config['remove_CVSS_values_without_vector']
-        self.default_cvss_version = config['default_CVSS3_version']
-        if self.tree.get('vulnerabilities') is None:
-            self.tree['vulnerabilities'] = []
-        self.hook = self.tree['vulnerabilities']
+    __slots__ = (
+        'default_cvss_version',
+        'digests',
+        'remove_cvss_values_without_vector',
+        'reused',
+        'settings',
+        'timestamps',
+        'variant',
+    )
+
+    path = ('vulnerabilities',)
+
+    def __init__(
+        self,
+        settings: Settings,
+        builder: Union[DocumentBuilder, None] = None,
+    ):
+        super().__init__(builder)
+        self.settings = settings
+        self.remove_cvss_values_without_vector = settings.remove_CVSS_values_without_vector
+        self.default_cvss_version = settings.default_CVSS3_version
+        self.hook = self.builder.items(self.path)
+        self.variant = '\0'.join([VERSION, *(str(getattr(settings, key)) for key in VARIANT_KEYS)]).encode(ENCODING)
+        self.digests: list[bytes] = []
+        self.reused = 0
+        self.timestamps: Union[dict[str, TimestampType], None] = None
+
+    def digest(self, root: RootType) -> bytes:
+        """Hash the canonical XML (ignoring comments) of the vulnerability element and the mapping configuration."""
+        hasher = hashlib.blake2b(self.variant, digest_size=DIGEST_SIZE)
+        hasher.update(lxml.etree.tostring(root, method='c14n', with_comments=False))
+        return hasher.digest()
+
+    def load_incremental(self, roots: Iterable[RootType], previous: dict[bytes, dict[str, Any]]) -> None:
+        """Map only the vulnerability elements without identical counterpart in the previous conversion.
+
+        The digests of all elements are recorded in document order for the sidecar of this conversion.
+        """
+        digested = [(root, self.digest(root)) for root in roots]
+        self.stamp(root for root, digest in digested if digest not in previous)
+        for root, digest in digested:
+            if (vulnerability := previous.get(digest)) is not None:
+                self.hook.append(vulnerability)
+                self.digests.append(digest)
+                self.reused += 1
+                continue
+            count, some_error = len(self.hook), self.some_error
+            self.some_error = False
+            self.load(root)
+            if len(self.hook) > count:
+                self.digests.append(NO_DIGEST if self.some_error else digest)
+            self.some_error = self.some_error or some_error
+
+    def load_all(self, roots: Iterable[RootType]) -> None:
+        """Map the vulnerability elements of one document normalizing their dates in one batch."""
+        roots = list(roots)
+        self.stamp(roots)
+        for root in roots:
+            self.load(root)
+
+    def stamp(self, roots: Iterable[RootType]) -> None:
+        """Normalize the date texts of all vulnerability elements to map in one call per document."""
+        self.timestamps = get_utc_timestamps(text for root in roots for text in self._date_texts(root))
+
+    def dump_digests(self) -> bytes:
+        """Provide the compact sidecar payload of the recorded digests."""
+        return b''.join(self.digests)
 
     def always(self, root: RootType) -> None:
         pass
@@ -68,7 +173,7 @@ class Vulnerabilities(Subtree):
         return statuses
 
     @no_type_check
-    def _handle_threats(self, root: RootType):
+    def _handle_threats(self, root: RootType, timestamps: dict[str, TimestampType]):
         threats = []
         for threat_elem in root.Threat:
             threat = {
@@ -76,21 +181,21 @@ class Vulnerabilities(Subtree):
                 'category': threat_elem.attrib['Type'].lower().replace(' ', '_'),
             }
 
-            if product_ids := threat_elem.ProductID:
+            if product_ids := getattr(threat_elem, 'ProductID', None):
                 threat['product_ids'] = [product_id.text for product_id in product_ids]
 
-            if group_ids := threat_elem.GroupID:
+            if group_ids := getattr(threat_elem, 'GroupID', None):
                 threat['group_ids'] = [group_id.text for group_id in group_ids]
 
             if 'Date' in threat_elem.attrib:
-                threat['date'] = get_utc_timestamp(threat_elem.attrib['Date'])
+                threat['date'] = timestamp_of(timestamps, threat_elem.attrib['Date'])
 
             threats.append(threat)
 
         return threats
 
     @no_type_check
-    def _handle_remediations(self, root: RootType, product_status):
+    def _handle_remediations(self, root: RootType, product_status, timestamps: dict[str, TimestampType]):
 
         remediations = []
         for remediation_elem in root.Remediation:
@@ -99,30 +204,27 @@ class Vulnerabilities(Subtree):
                 'details': remediation_elem.Description.text,
             }
 
-            if entitlements := remediation_elem.Entitlement:
+            if entitlements := getattr(remediation_elem, 'Entitlement', None):
                 remediation['entitlements'] = [entitlement.text for entitlement in entitlements]
 
-            if url := remediation_elem.URL:
+            if url := getattr(remediation_elem, 'URL', None):
                 remediation['url'] = url.text
 
-            if product_ids := remediation_elem.ProductID:
+            if product_ids := getattr(remediation_elem, 'ProductID', None):
                 remediation['product_ids'] = [product_id.text for product_id in product_ids]
 
-            if group_ids := remediation_elem.GroupID:
+            if group_ids := getattr(remediation_elem, 'GroupID', None):
                 remediation['group_ids'] = [group_id.text for group_id in group_ids]
 
             if not any(('product_ids' in remediation, 'group_ids' in remediation)):
-                if product_status:  # try to fix
-                    product_ids = Vulnerabilities._parse_affected_product_ids(product_status)
-
-            if len(product_ids):
-                remediation['product_ids'] = product_ids
-            else:
-                self.some_error = True
-                logging.error('No product_ids or group_ids entries for remediation.')
+                if product_ids := self._parse_affected_product_ids(product_status or {}):  # try to fix
+                    remediation['product_ids'] = product_ids
+                else:
+                    self.some_error = True
+                    logging.error('No product_ids or group_ids entries for remediation.')
 
             if 'Date' in remediation_elem.attrib:
-                remediation['date'] = get_utc_timestamp(remediation_elem.attrib['Date'])
+                remediation['date'] = timestamp_of(timestamps, remediation_elem.attrib['Date'])
 
             remediations.append(remediation)
 
@@ -161,7 +263,7 @@ class Vulnerabilities(Subtree):
             cvss_score['baseSeverity'] = self._base_score_to_severity(cvss_score['baseScore'])
 
         products = []
-        if product_ids := score_set_element.ProductID:
+        if product_ids := getattr(score_set_element, 'ProductID', None):
             products = [product_id.text for product_id in product_ids]
         elif product_status:  # try fix missing product ids
             products = self._parse_affected_product_ids(product_status)
@@ -202,9 +304,7 @@ class Vulnerabilities(Subtree):
 
         cvss_score['version'] = version
 
-        score = {json_property: cvss_score, 'products': products}
-
-        return score
+        return ScoreSet(json_property=json_property, cvss=cvss_score, products=products)
 
     @no_type_check
     def _remove_cvssv3_duplicates(self, scores):
@@ -219,28 +319,28 @@ class Vulnerabilities(Subtree):
         products_v3_1 = set(
             chain.from_iterable(
                 [
-                    score_set['products']
+                    score_set.products
                     for score_set in scores
-                    if 'cvss_v3' in score_set and score_set['cvss_v3']['version'] == '3.1'
+                    if score_set.json_property == 'cvss_v3' and score_set.cvss['version'] == '3.1'
                 ]
             )
         )
         products_v3_0 = set(
             chain.from_iterable(
                 [
-                    score_set['products']
+                    score_set.products
                     for score_set in scores
-                    if 'cvss_v3' in score_set and score_set['cvss_v3']['version'] == '3.0'
+                    if score_set.json_property == 'cvss_v3' and score_set.cvss['version'] == '3.0'
                 ]
             )
         )
         both_versions = products_v3_0.intersection(products_v3_1)
 
         for score_set in scores:
-            if 'cvss_v3' in score_set and score_set['cvss_v3']['version'] == '3.0':
-                score_set['products'] = [product for product in score_set['products'] if product not in both_versions]
+            if score_set.json_property == 'cvss_v3' and score_set.cvss['version'] == '3.0':
+                score_set.products = [product for product in score_set.products if product not in both_versions]
 
-        return [score_set for score_set in scores if len(score_set['products']) > 0]
+        return [score_set.as_dict() for score_set in scores if len(score_set.products) > 0]
 
     @no_type_check
     def _handle_scores(self, root: RootType, product_status):
@@ -258,69 +358,77 @@ class Vulnerabilities(Subtree):
 
         return self._remove_cvssv3_duplicates(scores)
 
+    @staticmethod
+    def _date_texts(root: RootType) -> Iterable[str]:
+        """Collect the date texts of the vulnerability element to normalize them in one batch."""
+        for path in ('{*}DiscoveryDate', '{*}ReleaseDate'):
+            yield from (element.text or '' for element in root.iterfind(path))
+        for path in ('{*}Threats/{*}Threat[@Date]', '{*}Remediations/{*}Remediation[@Date]'):
+            yield from (element.attrib['Date'] for element in root.iterfind(path))
+
     def sometimes(self, root: RootType) -> None:
         vulnerability = {}
-        if acknowledgments := root.Acknowledgments:
-            acks = Acknowledgments(lc_parent_code='vuln')
-            acks.load(acknowledgments)
-            vulnerability['acknowledgments'] = acks.dump()
-
-        if cve := root.CVE:
+        timestamps = self.timestamps
+        if timestamps is None:  # Single element loads outside a document batch
+            timestamps = get_utc_timestamps(self._date_texts(root))
+        if (acknowledgments := getattr(root, 'Acknowledgments', None)) is not None:
+            target = vulnerability['acknowledgments'] = []
+            acknowledgments_part = Acknowledgments(lc_parent_code='vuln', builder=self.builder, target=target)
+            acknowledgments_part.load(acknowledgments)
+            self.some_error = self.some_error or acknowledgments_part.has_errors()
+
+        if cve := getattr(root, 'CVE', None):
             # Note: "^CVE-[0-9]{4}-[0-9]{4,}$" differs from CVRF regex -> delegate to JSON Schema validation
-            vulnerability['cve'] = cve.text  # type: ignore
+            vulnerability['cve'] = cve.text
 
-        if cwes := root.CWE:
+        if cwes := getattr(root, 'CWE', None):
             if len(cwes) > 1:
                 logging.warning('%s CWE elements found, using only the first one.', len(cwes))
             vulnerability['cwe'] = {'id': cwes[0].attrib['ID'], 'name': cwes[0].text}
 
-        if discovery_date_in := root.DiscoveryDate:
-            discovery_date, problems = get_utc_timestamp(discovery_date_in.text or '')
-            for level, problem in problems:
-                logging.log(level, problem)
-            vulnerability['discovery_date'] = discovery_date  # type: ignore
+        if discovery_date_in := getattr(root, 'DiscoveryDate', None):
+            vulnerability['discovery_date'] = timestamp_of(timestamps, discovery_date_in.text or '')
 
-        if vuln_id := root.ID:
+        if vuln_id := getattr(root, 'ID', None):
             vulnerability['ids'] = [
-                {'system_name': vuln_id.attrib['SystemName'], 'text': vuln_id.text},  # type: ignore
+                {'system_name': vuln_id.attrib['SystemName'], 'text': vuln_id.text},
             ]
 
-        if involvements := root.Involvements:
+        if (involvements := getattr(root, 'Involvements', None)) is not None:
             vulnerability['involvements'] = self._handle_involvements(involvements)
 
-        if notes_root := root.Notes:
-            notes = Notes(lc_parent_code='vuln')
-            notes.load(notes_root)
-            vulnerability['notes'] = notes.dump()
+        if (notes_root := getattr(root, 'Notes', None)) is not None:
+            target = vulnerability['notes'] = []
+            notes_part = Notes(lc_parent_code='vuln', builder=self.builder, target=target)
+            notes_part.load(notes_root)
+            self.some_error = self.some_error or notes_part.has_errors()
 
-        if product_statuses := root.ProductStatuses:
+        if (product_statuses := getattr(root, 'ProductStatuses', None)) is not None:
             vulnerability['product_status'] = self._handle_product_statuses(product_statuses)
 
-        if references_root := root.References:
-            references = References(config=self.config, lc_parent_code='vuln')
-            references.load(references_root)
-            vulnerability['references'] = references.dump()
+        if (references_root := getattr(root, 'References', None)) is not None:
+            target = vulnerability['references'] = []
+            references_part = References(self.settings, lc_parent_code='vuln', builder=self.builder, target=target)
+            references_part.load(references_root)
+            self.some_error = self.some_error or references_part.has_errors()
 
-        if release_date_in := root.ReleaseDate:
-            release_date, problems = get_utc_timestamp(release_date_in.text or '')
-            for level, problem in problems:
-                logging.log(level, problem)
-            vulnerability['release_date'] = release_date  # type: ignore
+        if release_date_in := getattr(root, 'ReleaseDate', None):
+            vulnerability['release_date'] = timestamp_of(timestamps, release_date_in.text or '')
 
-        if remediations := root.Remediations:
+        if (remediations := getattr(root, 'Remediations', None)) is not None:
             product_status = vulnerability.get('product_status')
-            vulnerability['remediations'] = self._handle_remediations(remediations, product_status)
+            vulnerability['remediations'] = self._handle_remediations(remediations, product_status, timestamps)
 
-        if scores_root := root.CVSSScoreSets:
+        if (scores_root := getattr(root, 'CVSSScoreSets', None)) is not None:
             if len(scores := self._handle_scores(scores_root, vulnerability.get('product_status'))):
                 vulnerability['scores'] = scores
             else:
                 logging.warning('None of the ScoreSet elements parsed, removing "scores" entry from the output.')
 
-        if threats := root.Threats:
-            vulnerability['threats'] = self._handle_threats(threats)
+        if (threats := getattr(root, 'Threats', None)) is not None:
+            vulnerability['threats'] = self._handle_threats(threats, timestamps)
 
-        if title := root.Title:
-            vulnerability['title'] = title.text  # type: ignore
+        if title := getattr(root, 'Title', None):
+            vulnerability['title'] = title.text
 
         self.hook.append(vulnerability)
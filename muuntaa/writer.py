@@ -1,32 +1,312 @@
+import contextlib
+import gzip
+import hashlib
+import itertools
 import json
 import logging
+import os
 import pathlib
+import shutil
+from typing import Any, BinaryIO, Iterator, Union
 
-from muuntaa import CSAF_FILE_SUFFIX, ENCODING, Pathlike, ScopedMessages, WriterOptions
+import msgspec
 
+import muuntaa.canonical as canonical
+from muuntaa import (
+    CSAF_FILE_SUFFIX,
+    ENCODING,
+    GZIP_FILE_SUFFIX,
+    JSON_PATCH_FILE_SUFFIX,
+    MSGPACK_FILE_SUFFIX,
+    Pathlike,
+    ScopedMessages,
+    WriterOptions,
+)
 
-def write_csaf(csaf_dict: dict[str, object], file_path: Pathlike, options: WriterOptions = None) -> ScopedMessages:
-    """Write the CSAF data from python dict into a CSAF JSON file creating path as needed."""
+OptionsType = dict[str, Union[bool, int, tuple[str, str]]]  # WriterOptions when given
+DEFAULT_OPTIONS: OptionsType = {'ensure_ascii': False, 'indent': 2}
+COMPACT_OPTIONS: OptionsType = {'ensure_ascii': False, 'separators': (',', ':')}
+TEMP_FILE_SUFFIX = '.tmp'
+OUTPUT_FILE_SUFFIXES = (CSAF_FILE_SUFFIX, MSGPACK_FILE_SUFFIX, JSON_PATCH_FILE_SUFFIX)
+CHECKSUM_ALGORITHMS = ('sha256', 'sha512')  # Cf. CSAF v2.0 section 7.1.18 Requirement 18: Integrity
+
+
+class OutputSink:
+    """Write output files atomically per temporary file and rename, caching known folders and grouping fsync calls.
+
+    Every file is renamed into place (and visible to readers) as soon as it is written completely.
+    A fsync group size of 0 (the default) disables syncing, a size of n syncs every file before the rename
+    and the folders hosting the renamed files once every n files.
+    Existing outputs are detected per one listing of each folder (instead of one stat call per file).
+    """
+
+    def __init__(self, fsync_group_size: int = 0, check_existing: bool = True) -> None:
+        self.fsync_group_size = fsync_group_size
+        self.check_existing = check_existing
+        self.known_dirs: set[str] = set()
+        self.listings: dict[str, set[str]] = {}
+        self.pending: list[str] = []
+        self._sequence = itertools.count()
+
+    def __enter__(self) -> 'OutputSink':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        for level, message in self.close():
+            logging.log(level, message)
+
+    def ensure_dir(self, base_dir: Pathlike) -> bool:
+        """Ensure the folder exists and return True if it had to be created."""
+        folder = str(base_dir)
+        if folder in self.known_dirs:
+            return False
+        created = False
+        if not os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+            self.listings[folder] = set()  # Nothing to list in a new folder
+            created = True
+        self.known_dirs.add(folder)
+        return created
+
+    def exists(self, path: Pathlike) -> bool:
+        """Decide whether path exists per the listing of its folder (listed once and updated per write)."""
+        folder, name = os.path.split(str(path))
+        if (names := self.listings.get(folder)) is None:
+            try:
+                names = self.listings[folder] = set(os.listdir(folder))
+            except FileNotFoundError:
+                return False
+        return name in names
+
+    @contextlib.contextmanager
+    def atomic(self, path: Pathlike) -> Iterator[BinaryIO]:
+        """Provide a binary handle to a temporary sibling of path that replaces path after successful writing."""
+        target = str(path)
+        temp = self.temp_path(target)
+        try:
+            with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), 'wb') as handle:
+                yield handle
+                if self.fsync_group_size:  # The content shall be durable before the rename publishes it
+                    handle.flush()
+                    os.fsync(handle.fileno())
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp)
+            raise
+        self._publish(temp, target)
+
+    def link(self, source: Pathlike, path: Pathlike) -> None:
+        """Hard link (or copy if linking fails) the existing source file atomically to path."""
+        target = str(path)
+        temp = self.temp_path(target)
+        try:
+            try:
+                os.link(source, temp)
+            except OSError:
+                shutil.copyfile(source, temp)
+            if self.fsync_group_size:
+                with open(temp, 'rb') as handle:
+                    os.fsync(handle.fileno())
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp)
+            raise
+        self._publish(temp, target)
+
+    def temp_path(self, target: str) -> str:
+        """Provide a hidden sibling of target unique per process and sink call."""
+        base_dir, name = os.path.split(target)
+        return os.path.join(base_dir, f'.{name}.{os.getpid()}.{next(self._sequence)}{TEMP_FILE_SUFFIX}')
+
+    def _publish(self, temp: str, target: str) -> None:
+        """Rename the complete temporary file into place and track it for the listing and the grouped sync."""
+        os.replace(temp, target)
+        base_dir, name = os.path.split(target)
+        if (names := self.listings.get(base_dir)) is not None:
+            names.add(name)
+        if not self.fsync_group_size:
+            return
+        self.pending.append(target)
+        if len(self.pending) >= self.fsync_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sync the folders hosting the pending (already synced and renamed) files."""
+        pending, self.pending = self.pending, []
+        for folder in {os.path.dirname(target) for target in pending}:
+            fd = os.open(folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def close(self) -> ScopedMessages:
+        """Sync the folders of all pending files and report any failure."""
+        try:
+            self.flush()
+        except OSError as err:
+            return [(logging.CRITICAL, f'Syncing the output files failed. {err}')]
+        return []
+
+
+def checksum_line(hexdigest: str, path: pathlib.Path) -> str:
+    """Format the sidecar content as the sha256sum and sha512sum tools do (digest, two spaces, file name)."""
+    return f'{hexdigest}  {path.name}\n'
+
+
+msgpack_encoder = msgspec.msgpack.Encoder()
+msgpack_sorted_encoder = msgspec.msgpack.Encoder(order='sorted')
+
+
+def is_compressed(path: pathlib.Path) -> bool:
+    """Decide per the trailing suffixes (.json.gz or .msgpack.gz) whether the output shall be gzip compressed."""
+    return path.suffix == GZIP_FILE_SUFFIX and len(path.suffixes) > 1 and path.suffixes[-2] in OUTPUT_FILE_SUFFIXES
+
+
+def format_suffix(path: pathlib.Path) -> str:
+    """Provide the suffix determining the serialization format (ignoring any compression suffix)."""
+    return path.suffixes[-2] if is_compressed(path) else path.suffixes[-1]
+
+
+def encode(
+    csaf_dict: Union[dict[str, object], list[dict[str, Any]]],
+    options: WriterOptions = None,
+    suffix: str = CSAF_FILE_SUFFIX,
+    canonical_form: bool = False,
+) -> bytes:
+    """Encode the CSAF data (or a JSON Patch of it) once into JSON text (or MessagePack per suffix) bytes.
+
+    The canonical form requests the RFC 8785 (JCS) form of the JSON text (ignoring the options).
+    The sort_keys option fixes the key order independent of the mapping order (also for MessagePack).
+    """
     if options is None:
-        options = {'ensure_ascii': False, 'indent': 2}
+        options = DEFAULT_OPTIONS
+    if suffix == MSGPACK_FILE_SUFFIX:
+        return (msgpack_sorted_encoder if options.get('sort_keys', False) else msgpack_encoder).encode(csaf_dict)
+    if canonical_form:
+        return canonical.dumps(csaf_dict).encode(ENCODING)
+    return json.dumps(csaf_dict, **options).encode(ENCODING)  # type: ignore
+
+
+def pack(payload: bytes, path: pathlib.Path) -> bytes:
+    """Provide the bytes to be written to path (compressed if requested per path)."""
+    return gzip.compress(payload, mtime=0) if is_compressed(path) else payload
+
+
+def is_unchanged(path: pathlib.Path, payload: bytes) -> bool:
+    """Compare the payload with the existing file at path by size first and then by hash.
+
+    An existing .sha256 sidecar file spares reading the existing file (unless the file is newer than the sidecar).
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if stat.st_size != len(payload):
+        return False
+    digest = hashlib.sha256(payload).hexdigest()
+    sidecar = path.with_name(f'{path.name}.sha256')
+    try:
+        if os.stat(sidecar).st_mtime_ns >= stat.st_mtime_ns:
+            with open(sidecar, 'rt', encoding=ENCODING) as handle:
+                return handle.read().split(' ', 1)[0] == digest
+    except OSError:
+        pass
+    with open(path, 'rb') as handle:
+        return hashlib.sha256(handle.read()).hexdigest() == digest
+
+
+def write_sidecar(sink: OutputSink, sidecar: pathlib.Path, data: bytes, outdated_only: bool = False) -> ScopedMessages:
+    """Write the sidecar file atomically (leaving an existing sidecar with the expected content alone if requested)."""
+    if outdated_only:
+        with contextlib.suppress(OSError):
+            if sidecar.read_bytes() == data:
+                return []
+    with sink.atomic(sidecar) as handle:
+        handle.write(data)
+    return [(logging.INFO, f'Successfully wrote {sidecar}.')]
+
+
+def _write_sidecars(
+    sink: OutputSink, path: pathlib.Path, payload: bytes, outdated_only: bool = False
+) -> ScopedMessages:
+    """Write the checksum sidecar files for path hashing the payload in memory (no second read).
+
+    If only outdated sidecars shall be written, existing sidecars with the expected content are left alone.
+    """
+    scoped_messages: ScopedMessages = []
+    for algorithm in CHECKSUM_ALGORITHMS:
+        sidecar = path.with_name(f'{path.name}.{algorithm}')
+        line = checksum_line(hashlib.new(algorithm, payload).hexdigest(), path).encode(ENCODING)
+        scoped_messages.extend(write_sidecar(sink, sidecar, line, outdated_only))
+    return scoped_messages
+
+
+def write_payload(
+    payload: bytes,
+    file_path: Pathlike,
+    sink: Union[OutputSink, None] = None,
+    checksums: bool = False,
+    if_changed: bool = False,
+) -> ScopedMessages:
+    """Write the already encoded CSAF data into a file creating path as needed.
+
+    If the file path ends in .gz the payload is compressed (no intermediate file).
+    Batch callers should provide a long living sink to benefit from folder caching and grouped syncing.
+    If checksums are requested, the .sha256 and .sha512 sidecar files are derived from the bytes written.
+    If only changes shall be written, an existing file with identical content is left alone (including mtime).
+    """
+    one_shot = sink is None
+    if sink is None:
+        sink = OutputSink()
     scoped_messages: ScopedMessages = []
-    path = pathlib.Path(file_path).expanduser().resolve()
+    path = pathlib.Path(file_path).expanduser().absolute()
     base_dir = path.parent
     try:
-        if not base_dir.is_dir():
-            path.mkdir(parents=True, exist_ok=True)
+        if sink.ensure_dir(base_dir):
             scoped_messages.append((logging.INFO, f'Created output folder {base_dir}.'))
-        if path.is_file():
+        if sink.check_existing and not if_changed and sink.exists(path):
             scoped_messages.append((logging.WARNING, f'Output {path} already exists. Overwriting it.'))
-        if path.suffixes[-1] != CSAF_FILE_SUFFIX:
+        if format_suffix(path) not in OUTPUT_FILE_SUFFIXES:
             scoped_messages.append(
                 (logging.WARNING, f'Given output file {path} does not contain valid {CSAF_FILE_SUFFIX} suffix.')
             )
-        with open(path, 'wt', encoding=ENCODING) as handle:
-            json.dump(csaf_dict, handle, **options)  # type: ignore
+        data = pack(payload, path)
+        unchanged = if_changed and is_unchanged(path, data)
+        if unchanged:
+            scoped_messages.append((logging.INFO, f'Output {path} unchanged. Skipped writing.'))
+        else:
+            with sink.atomic(path) as handle:
+                handle.write(data)
             scoped_messages.append((logging.INFO, f'Successfully wrote {path}.'))
+        if checksums:
+            scoped_messages.extend(_write_sidecars(sink, path, data, outdated_only=unchanged))
+        if one_shot:
+            scoped_messages.extend(sink.close())
 
     except Exception as err:  # noqa
         scoped_messages.append((logging.CRITICAL, f'Writing output file {path} failed. {err}'))
 
     return scoped_messages
+
+
+def write_csaf(
+    csaf_dict: dict[str, object],
+    file_path: Pathlike,
+    options: WriterOptions = None,
+    sink: Union[OutputSink, None] = None,
+    checksums: bool = False,
+    if_changed: bool = False,
+    canonical_form: bool = False,
+) -> ScopedMessages:
+    """Write the CSAF data from python dict into a CSAF JSON file creating path as needed.
+
+    If the file path ends in .msgpack (or .msgpack.gz) the data is written as MessagePack instead of JSON.
+    Cf. encode and write_payload for the remaining parameters.
+    """
+    path = pathlib.Path(file_path)
+    try:
+        payload = encode(csaf_dict, options, format_suffix(path), canonical_form)
+    except Exception as err:  # noqa
+        return [(logging.CRITICAL, f'Writing output file {path.expanduser().absolute()} failed. {err}')]
+    return write_payload(payload, path, sink, checksums, if_changed)
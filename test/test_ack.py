@@ -3,6 +3,7 @@ import logging
 from lxml import objectify
 
 from muuntaa.ack import Acknowledgments
+from muuntaa.config import to_settings
 from muuntaa.document import Leafs
 
 CFG = {
@@ -99,11 +100,11 @@ def test_document_with_tl_acks(caplog):
             'title': 'Acme Security Advisory for foo on bar - March 2017 - CSAF CVRF',
         }
     }
-    dle = Leafs(CFG)
+    dle = Leafs(to_settings(CFG)[0])
     caplog.set_level(logging.INFO)
     dle.load(ROOT_HAS_TL_ACKS)
     assert dle.dump() == expected_dle
-    assert 'ingesting sometimes present element' in caplog.text
+    assert 'ingesting sometimes present element' not in caplog.text
 
     expected_ack = {
         'document': {
@@ -138,7 +139,7 @@ def test_document_with_tl_acks(caplog):
     caplog.set_level(logging.WARNING)
     acks.load(ROOT_HAS_TL_ACKS.Acknowledgments)
     assert acks.dump() == expected_ack
-    assert 'ingesting sometimes present element' in caplog.text
+    assert 'ingesting sometimes present element' not in caplog.text
 
     expected_doc = {
         'document': {
@@ -16,3 +16,32 @@ import muuntaa.advisor as advisor
 )
 def test_derive_csaf_filename(identifier, is_valid, expected):
     assert advisor.derive_csaf_filename(identifier, is_valid) == expected
+
+
+@pytest.mark.parametrize(
+    'identifier,is_valid,expected',
+    [
+        ('42', True, f'42{advisor.CSAF_FILE_SUFFIX}{advisor.GZIP_FILE_SUFFIX}'),
+        ('42', False, f'42{advisor.INVALID}{advisor.CSAF_FILE_SUFFIX}{advisor.GZIP_FILE_SUFFIX}'),
+    ],
+)
+def test_derive_csaf_filename_compressed(identifier, is_valid, expected):
+    assert advisor.derive_csaf_filename(identifier, is_valid, compress=True) == expected
+
+
+@pytest.mark.parametrize(
+    'initial_release_date,expected',
+    [
+        ('2017-03-01T16:00:00.000+00:00', '2017'),
+        ('2017', ''),
+        ('', ''),
+        (None, ''),
+    ],
+)
+def test_derive_year_folder(initial_release_date, expected):
+    assert advisor.derive_year_folder(initial_release_date) == expected
+
+
+def test_derive_csaf_filename_binary():
+    assert advisor.derive_csaf_filename('42', True, binary=True) == f'42{advisor.MSGPACK_FILE_SUFFIX}'
+    assert advisor.derive_csaf_filename('42', True, compress=True, binary=True) == '42.msgpack.gz'
@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+from lxml import objectify
+
+import muuntaa.api as api
+import muuntaa.vuln as vuln
+import muuntaa.writer as writer
+from muuntaa.memo import SubtreeMemo
+from muuntaa.product import Products
+from muuntaa.vuln import Vulnerabilities
+from test.test_vuln import HAS_VULNS_XML
+
+PAYLOAD = {'document': {'title': 'muuntaa', 'tracking': {'version': '1'}}, 'vulnerabilities': [{'cve': 'CVE-0-0'}]}
+
+
+def test_load_msgpack(tmp_path):
+    path = tmp_path / 'doc.msgpack'
+    writer.write_csaf(PAYLOAD, path)
+    assert api.load_msgpack(path) == PAYLOAD
+
+
+def test_load_msgpack_compressed(tmp_path):
+    path = tmp_path / 'doc.msgpack.gz'
+    writer.write_csaf(PAYLOAD, path)
+    assert api.load_msgpack(path) == PAYLOAD
+
+
+def test_load_csaf(tmp_path):
+    for name in ('doc.json', 'doc.json.gz', 'doc.msgpack', 'doc.msgpack.gz'):
+        writer.write_csaf(PAYLOAD, tmp_path / name)
+        assert api.load_csaf(tmp_path / name) == PAYLOAD
+
+
+PINNED = {'generator_date': '2024-01-09T00:00:00Z'}
+
+
+def test_converter_convert_bytes_path_and_tree_agree(tmp_path):
+    converter = api.Converter(PINNED)
+    from_bytes = converter.convert_bytes(HAS_VULNS_XML.encode())
+    assert from_bytes.csaf['document']['tracking']['id'] == 'vendorix-sa-20170301-abc'
+    assert from_bytes.csaf['document']['tracking']['generator']['date'] == '2024-01-09T00:00:00.000+00:00'
+    assert from_bytes.csaf['document']['references'][0]['category'] == 'self'
+    path = tmp_path / 'advisory.xml'
+    path.write_text(HAS_VULNS_XML)
+    assert converter.convert_path(path).csaf == from_bytes.csaf
+    root = objectify.fromstring(HAS_VULNS_XML.encode())
+    assert converter.convert_tree(root).csaf == from_bytes.csaf
+
+
+def test_converter_result_cache(mocker):
+    converter = api.Converter(PINNED, cache_size=1)
+    convert_tree = mocker.spy(converter, 'convert_tree')
+    first = converter.convert_bytes(HAS_VULNS_XML.encode())
+    second = converter.convert_bytes(HAS_VULNS_XML.encode())
+    assert convert_tree.call_count == 1
+    assert (converter.hits, converter.misses) == (1, 1)
+    assert writer.encode(second.csaf) == writer.encode(first.csaf)
+    second.csaf['document']['title'] = 'changed'
+    assert converter.convert_bytes(HAS_VULNS_XML.encode()).csaf['document']['title'] != 'changed'
+    converter.convert_bytes(HAS_VULNS_XML.replace('AppY', 'AppZ').encode())
+    assert len(converter.results) == 1
+    converter.convert_bytes(HAS_VULNS_XML.encode())
+    assert convert_tree.call_count == 3
+
+
+def test_converter_reports_parse_failure():
+    conversion = api.Converter().convert_bytes(b'<not-closed>')
+    assert conversion.some_error
+    assert conversion.scoped_messages[0][0] == logging.CRITICAL
+
+
+def test_converter_rejects_invalid_configuration():
+    with pytest.raises(ValueError):
+        api.Converter({'force': 'perhaps'})
+
+
+def test_converter_reuses_previous_vulnerabilities(mocker, tmp_path):
+    mocker.patch.object(Vulnerabilities, 'sometimes', lambda self, root: self.hook.append({'cve': root.CVE.text}))
+    converter = api.Converter({**PINNED, 'incremental': True})
+    first = converter.convert_bytes(HAS_VULNS_XML.encode())
+    out_path = tmp_path / 'advisory.json'
+    writer.write_csaf(first.csaf, out_path)
+    vuln.digests_path(out_path).write_bytes(first.digests)
+    assert api.load_previous(tmp_path / 'missing.json') == {}
+
+    load = mocker.spy(Vulnerabilities, 'load')
+    second = converter.convert_bytes(HAS_VULNS_XML.encode(), previous=api.load_previous(out_path))
+    assert not load.call_count
+    assert second.csaf['vulnerabilities'] == [{'cve': 'CVE-2017-3826'}]
+    assert second.scoped_messages == [(logging.INFO, 'Reused 1 unchanged vulnerabilities.')]
+
+
+def test_converter_exposes_product_index(mocker):
+    def sometimes(self, root):
+        self.hook['full_product_names'] = [{'product_id': 'CVRFPID-1', 'name': 'AppY'}]
+        self.index.add(self.hook['full_product_names'][0], [])
+
+    mocker.patch.object(Products, 'sometimes', sometimes)
+    converter = api.Converter(PINNED, cache_size=1)
+    conversion = converter.convert_bytes(HAS_VULNS_XML.encode())
+    assert conversion.products.names == {'CVRFPID-1': {'product_id': 'CVRFPID-1', 'name': 'AppY'}}
+    cached = converter.convert_bytes(HAS_VULNS_XML.encode())
+    assert converter.hits == 1
+    assert cached.products == conversion.products
+
+    memoized = api.Converter(PINNED, memo=SubtreeMemo())
+    memoized.convert_bytes(HAS_VULNS_XML.encode())
+    assert memoized.convert_bytes(HAS_VULNS_XML.encode()).products == conversion.products  # Rebuilt on memo hits
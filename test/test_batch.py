@@ -0,0 +1,137 @@
+import json
+import logging
+
+import pytest
+
+import muuntaa.batch as batch
+import muuntaa.cli as cli
+
+TRACKING_XML = """\
+<?xml version="1.0"?>
+<cvrfdoc xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/cvrf">
+  <DocumentTracking>
+    <Identification>
+      <ID>{identifier}</ID>
+    </Identification>
+    <Status>Final</Status>
+    <Version>{version}</Version>
+  </DocumentTracking>
+  <Vulnerability xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/vuln">
+    <ID SystemName="Bug">VDX-1</ID>
+"""  # Truncated on purpose - the tracking is read without parsing the rest
+
+
+def advisory(folder, name, identifier, version):
+    path = folder / name
+    path.write_text(TRACKING_XML.format(identifier=identifier, version=version))
+    return path
+
+
+def test_peek_tracking_stops_early(tmp_path):
+    path = advisory(tmp_path, 'a.xml', ' vendorix-sa-1 ', '1.2')
+    assert batch.peek_tracking(path) == ('vendorix-sa-1', '1.2')
+
+
+@pytest.mark.parametrize(
+    'older,newer',
+    [
+        ('1', '2'),
+        ('1.9', '1.10'),
+        ('2.0.0-rc.1', '2.0.0'),
+        ('1.0.0', '1.0.1'),
+        (None, '0'),
+        (None, 'garbage'),
+        ('garbage', '0'),
+        ('1.x', '1'),
+        ('1.0.0-rc1', '1.0.0-rc2'),
+        ('1.0.0-alpha', '1.0.0-alpha.1'),
+        ('1.0.0-alpha.1', '1.0.0-alpha.beta'),
+        ('1.0.0-beta.2', '1.0.0-beta.11'),
+        ('1.0.0-rc.1', '1.0.0'),
+    ],
+)
+def test_version_key(older, newer):
+    assert batch.version_key(older) < batch.version_key(newer)
+
+
+def test_newest_revisions(tmp_path):
+    paths = [
+        advisory(tmp_path, 'a-2.xml', 'vendorix-sa-1', '2'),
+        advisory(tmp_path, 'a-10.xml', 'vendorix-sa-1', '10'),
+        advisory(tmp_path, 'b.xml', 'Vendorix SA 1', '1'),
+        advisory(tmp_path, 'c.xml', 'vendorix_sa_1', '1.0.0'),
+    ]
+    broken = tmp_path / 'broken.xml'
+    broken.write_text('no xml')
+    selected, scoped_messages = batch.newest_revisions(paths + [broken])
+    assert selected == paths[1:] + [broken]
+    levels = [level for level, _ in scoped_messages]
+    assert levels.count(logging.INFO) == 1
+    assert 'Skipping' in scoped_messages[1][1] and 'a-2.xml' in scoped_messages[1][1]
+    assert 'Reading the tracking' in scoped_messages[0][1]
+    collision = scoped_messages[-1]
+    assert collision == (
+        logging.WARNING,
+        'Tracking IDs Vendorix SA 1, vendorix_sa_1 collide in filename vendorix_sa_1.json.',
+    )
+
+
+def test_app_batch_converts_newest_revisions_only(caplog, mocker, tmp_path):
+    caplog.set_level(logging.INFO)
+    advisory(tmp_path, 'a-1.xml', 'vendorix-sa-1', '1')
+    newest = advisory(tmp_path, 'a-2.xml', 'vendorix-sa-1', '2')
+    process = mocker.patch.object(cli, 'process', return_value=0)
+    assert cli.app(['--input-dir', str(tmp_path), '--output-dir', str(tmp_path / 'out')]) == 0
+    assert process.call_count == 1
+    assert process.call_args.args[0]['input_file'] == str(newest)
+    assert 'Skipping' in caplog.text
+
+
+def test_app_batch_memoizes_subtrees_across_documents(caplog, tmp_path):
+    from test.test_vuln import HAS_VULNS_XML
+
+    caplog.set_level(logging.INFO)
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    for identifier in ('vendorix-sa-20170301-abc', 'vendorix-sa-20170301-def'):
+        (in_dir / f'{identifier}.xml').write_text(
+            HAS_VULNS_XML.replace('vendorix-sa-20170301-abc', identifier), encoding='utf-8'
+        )
+    out_dir = tmp_path / 'out'
+    assert cli.app(['--input-dir', str(in_dir), '--output-dir', str(out_dir)]) == 0
+    assert 'Reused 2 memoized subtrees.' in caplog.text  # The notes and the product tree of the second document
+    first, second = (out_dir / f'vendorix-sa-20170301-{suffix}.json' for suffix in ('abc', 'def'))
+    assert json.loads(first.read_bytes())['product_tree'] == json.loads(second.read_bytes())['product_tree']
+
+
+def test_app_batch_shares_sink_index_and_converter(mocker, tmp_path):
+    from test.test_vuln import HAS_VULNS_XML
+
+    import muuntaa.api as api
+    import muuntaa.provider as provider
+    import muuntaa.writer as writer
+
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    for identifier in ('vendorix-sa-20170301-abc', 'vendorix-sa-20170301-def'):
+        (in_dir / f'{identifier}.xml').write_text(
+            HAS_VULNS_XML.replace('vendorix-sa-20170301-abc', identifier), encoding='utf-8'
+        )
+    converters = mocker.spy(api, 'Converter')
+    close = mocker.spy(writer.OutputSink, 'close')
+    load = mocker.spy(provider.ProviderIndex, 'load')
+    save = mocker.spy(provider.ProviderIndex, 'save')
+    out_dir = tmp_path / 'out'
+    assert cli.app(['--input-dir', str(in_dir), '--output-dir', str(out_dir), '--provider-index']) == 0
+    assert (converters.call_count, close.call_count, load.call_count, save.call_count) == (1, 1, 1, 1)
+    assert (out_dir / 'index.txt').read_text(encoding='utf-8').splitlines() == [
+        'vendorix-sa-20170301-abc.json',
+        'vendorix-sa-20170301-def.json',
+    ]
+    rebuild = mocker.spy(provider, 'rebuild_index')
+    assert cli.app(['--input-dir', str(in_dir), '--output-dir', str(out_dir), '--rebuild-provider-index']) == 0
+    assert rebuild.call_count == 1
+    assert (out_dir / 'index.txt').read_text(encoding='utf-8').splitlines() == [
+        'vendorix-sa-20170301-abc.json',
+        'vendorix-sa-20170301-def.json',
+    ]
@@ -0,0 +1,79 @@
+import logging
+import os
+
+import muuntaa.cache as cache
+import muuntaa.writer as writer
+
+CFG = {'csaf_version': '2.0', 'force': False, 'input_file': 'a.xml', 'output_dir': 'here'}
+
+
+def test_key_ignores_neutral_keys():
+    key = cache.ConversionCache.key(b'<cvrfdoc/>', CFG)
+    assert key == cache.ConversionCache.key(b'<cvrfdoc/>', {**CFG, 'input_file': 'b.xml', 'output_dir': 'there'})
+    assert key != cache.ConversionCache.key(b'<cvrfdoc/>', {**CFG, 'force': True})
+    assert key != cache.ConversionCache.key(b'<cvrfdoc />', CFG)
+
+
+def test_store_lookup_restore(tmp_path):
+    conversion_cache = cache.ConversionCache(tmp_path / 'cache')
+    key = conversion_cache.key(b'data', CFG)
+    assert conversion_cache.lookup(key, ['json']) is None
+    meta = {'initial_release_date': None, 'current_release_date': None}
+    assert not conversion_cache.store(key, {'json': b'{}'}, meta)
+    assert conversion_cache.lookup(key, ['json', 'msgpack']) is None
+    payloads, cached_meta = conversion_cache.lookup(key, ['json'])
+    assert cached_meta == meta
+    target = tmp_path / 'out.json'
+    cache.ConversionCache.restore(payloads['json'], target)
+    assert target.read_bytes() == b'{}'
+    assert os.stat(target).st_ino == os.stat(payloads['json']).st_ino
+
+
+def test_store_and_restore_write_per_the_output_sink(mocker, tmp_path):
+    sink = writer.OutputSink(fsync_group_size=1)
+    conversion_cache = cache.ConversionCache(tmp_path / 'cache', sink=sink)
+    atomic = mocker.spy(sink, 'atomic')
+    fsync = mocker.spy(writer.os, 'fsync')
+    key = conversion_cache.key(b'data', CFG)
+    assert not conversion_cache.store(key, {'json': b'{}'}, {})
+    assert [call.args[0].name for call in atomic.call_args_list] == ['json', cache.META_NAME, cache.SIZE_NAME]
+    assert fsync.call_count == 6  # Each file before its rename and its folder after it
+    payloads, _ = conversion_cache.lookup(key, ['json'])
+    target = tmp_path / 'out.json'
+    sink.ensure_dir(tmp_path)
+    cache.ConversionCache.restore(payloads['json'], target, sink)
+    assert sink.exists(target)
+    assert not [path for path in tmp_path.rglob('*') if path.name.endswith(writer.TEMP_FILE_SUFFIX)]
+
+
+def test_evict_least_recently_used(tmp_path):
+    conversion_cache = cache.ConversionCache(tmp_path, max_bytes=1000)
+    meta = {'initial_release_date': None, 'current_release_date': None}
+    keys = [conversion_cache.key(f'{n}'.encode(), CFG) for n in range(3)]
+    for n, key in enumerate(keys):
+        conversion_cache.store(key, {'json': b'x' * 100}, meta)
+        os.utime(conversion_cache.entry(key) / cache.META_NAME, ns=(n * 10**9, n * 10**9))
+    os.utime(conversion_cache.entry(keys[0]) / cache.META_NAME, ns=(10**10, 10**10))  # recently used
+    conversion_cache.max_bytes = 400  # three entries of 160 bytes each
+    assert conversion_cache.evict() == [(logging.INFO, 'Evicted 1 conversion cache entries.')]
+    assert conversion_cache.lookup(keys[0], ['json']) is not None
+    assert conversion_cache.lookup(keys[1], ['json']) is None
+    assert conversion_cache.lookup(keys[2], ['json']) is not None
+
+
+def test_store_keeps_the_running_size_without_rescanning(mocker, tmp_path):
+    meta = {'initial_release_date': None, 'current_release_date': None}
+    first = cache.ConversionCache(tmp_path, max_bytes=1000)
+    assert not first.store(first.key(b'0', CFG), {'json': b'x' * 100}, meta)  # No size file yet - scanned once
+    assert (tmp_path / cache.SIZE_NAME).read_bytes() == str(first.total).encode()
+    second = cache.ConversionCache(tmp_path, max_bytes=1000)
+    evict = mocker.spy(second, 'evict')
+    assert not second.store(second.key(b'1', CFG), {'json': b'x' * 100}, meta)
+    assert not evict.call_count
+    assert second.total == 2 * first.total
+    assert second.read_total() == second.total
+    second.max_bytes = 400  # three entries of 160 bytes each
+    assert second.store(second.key(b'2', CFG), {'json': b'x' * 100}, meta) == [
+        (logging.INFO, 'Evicted 1 conversion cache entries.')
+    ]
+    assert evict.call_count == 1
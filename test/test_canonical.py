@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+import muuntaa.canonical as canonical
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    [
+        (0.0, '0'),
+        (-0.0, '0'),
+        (1.0, '1'),
+        (-1.5, '-1.5'),
+        (100.0, '100'),
+        (0.00123, '0.00123'),
+        (0.000001, '0.000001'),
+        (1e-7, '1e-7'),
+        (1.5e-7, '1.5e-7'),
+        (1e21, '1e+21'),
+        (1e20, '100000000000000000000'),
+        (123456789.125, '123456789.125'),
+        (333333333.3333333, '333333333.3333333'),
+        (4.50, '4.5'),
+        (2e-3, '0.002'),
+        (9007199254740992.0, '9007199254740992'),
+        (5e-324, '5e-324'),
+        (1.7976931348623157e308, '1.7976931348623157e+308'),
+    ],
+)
+def test_number(value, expected):
+    assert canonical.number(value) == expected
+
+
+def test_number_not_finite():
+    with pytest.raises(ValueError):
+        canonical.number(math.inf)
+
+
+def test_dumps_rfc8785_sample():
+    # Cf. RFC 8785 section 3.2.2 (sorting example with non-ASCII and surrogate pair keys)
+    value = {
+        '€': 'Euro Sign',
+        '\r': 'Carriage Return',
+        'דּ': 'Hebrew Letter Dalet With Dagesh',
+        '1': 'One',
+        '\U0001f600': 'Emoji: Grinning Face',
+        '\u0080': 'Control',
+        'ö': 'Latin Small Letter O With Diaeresis',
+    }
+    expected = (
+        '{"\\r":"Carriage Return","1":"One","\u0080":"Control","ö":"Latin Small Letter O With Diaeresis",'
+        '"€":"Euro Sign","\U0001f600":"Emoji: Grinning Face","דּ":"Hebrew Letter Dalet With Dagesh"}'
+    )
+    assert canonical.dumps(value) == expected
+
+
+def test_dumps_nested():
+    value = {'b': [True, None, 1, 2.5, {'d': 'x', 'c': '\u000f"'}], 'a': False}
+    assert canonical.dumps(value) == '{"a":false,"b":[true,null,1,2.5,{"c":"\\u000f\\"","d":"x"}]}'
+
+
+def test_dumps_unserializable():
+    with pytest.raises(TypeError):
+        canonical.dumps({'a': object()})
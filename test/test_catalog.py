@@ -0,0 +1,130 @@
+import logging
+
+import muuntaa.catalog as catalog
+import muuntaa.cli as cli
+from muuntaa.product import ProductIndex
+from test.test_vuln import HAS_VULNS_XML
+
+ADVISORY = {
+    'document': {
+        'tracking': {
+            'id': 'vendorix-sa-20170301-abc',
+            'version': '1',
+            'initial_release_date': '2017-03-01T16:00:00.000+00:00',
+            'current_release_date': '2017-03-01T14:58:48.000+00:00',
+        },
+    },
+    'product_tree': {
+        'branches': [
+            {
+                'category': 'vendor',
+                'name': 'Vendorix',
+                'branches': [
+                    {
+                        'category': 'product_version',
+                        'name': '1.0',
+                        'product': {'product_id': 'CVRFPID-223152', 'name': 'AppY 1.0.0'},
+                    },
+                ],
+            },
+        ],
+        'full_product_names': [{'product_id': 'CVRFPID-1', 'name': 'AppZ_2'}],
+        'relationships': [{'full_product_name': {'product_id': 'CVRFPID-2', 'name': 'AppY on AppZ'}}],
+    },
+    'vulnerabilities': [{'cve': 'CVE-2017-3826'}, {'title': 'no cve'}, {'cve': 'CVE-2017-3826'}],
+}
+
+
+def test_products_and_cves_of():
+    assert catalog.products_of(ADVISORY) == {
+        'CVRFPID-1': 'AppZ_2',
+        'CVRFPID-223152': 'AppY 1.0.0',
+        'CVRFPID-2': 'AppY on AppZ',
+    }
+    assert catalog.cves_of(ADVISORY) == ['CVE-2017-3826']
+
+
+def test_products_of_reuses_the_index_of_the_conversion(mocker):
+    index = ProductIndex()
+    index.add({'product_id': 'CVRFPID-9', 'name': 'AppX'}, [])
+    build = mocker.spy(ProductIndex, 'of')
+    assert catalog.products_of(ADVISORY, index) == {'CVRFPID-9': 'AppX'}
+    assert not build.call_count
+
+
+def test_catalog_upsert_and_query(tmp_path):
+    db_path = tmp_path / 'catalog.sqlite'
+    out_path = tmp_path / 'vendorix-sa-20170301-abc.json'
+    with catalog.Catalog(db_path, batch_size=2) as advisories:
+        assert not advisories.upsert(ADVISORY, out_path)
+        assert advisories.pending == 1
+        assert advisories.query(cve='CVE-2017-3826')[0][:3] == (str(out_path), 'vendorix-sa-20170301-abc', '1')
+        assert advisories.query(product='CVRFPID-223152')
+        assert advisories.query(product='AppY')
+        assert advisories.query(product='appy 1.0')
+        assert not advisories.query(product='Y 1.0')
+        assert not advisories.query(product='AppZ%')
+        assert advisories.query(product='AppZ_')
+        assert advisories.query(tracking_id='vendorix-sa-20170301-abc', cve='CVE-2017-3826')
+        assert not advisories.query(tracking_id='other', cve='CVE-2017-3826')
+
+        revised = {**ADVISORY, 'vulnerabilities': [{'cve': 'CVE-2024-0001'}]}
+        advisories.upsert(revised, out_path)
+        assert advisories.pending == 0
+        assert not advisories.query(cve='CVE-2017-3826')
+        assert len(advisories.query(cve='CVE-2024-0001')) == 1
+        assert len(advisories.query()) == 1
+
+        scoped_messages = advisories.upsert({'document': {}}, tmp_path / 'other.json')
+        assert scoped_messages[0][0] == logging.WARNING
+
+
+def test_upsert_follows_the_advisory_to_its_new_path(tmp_path):
+    invalid_path = tmp_path / 'vendorix-sa-20170301-abc_invalid.json'
+    valid_path = tmp_path / '2017' / 'vendorix-sa-20170301-abc.json'
+    with catalog.Catalog(tmp_path / 'catalog.sqlite') as advisories:
+        assert not advisories.upsert(ADVISORY, invalid_path)
+        assert advisories.upsert(ADVISORY, valid_path) == [
+            (logging.INFO, f'Advisory vendorix-sa-20170301-abc moved to {valid_path}. Replaced its old entry.')
+        ]
+        assert [row[0] for row in advisories.query()] == [str(valid_path)]
+        assert [row[0] for row in advisories.query(cve='CVE-2017-3826')] == [str(valid_path)]
+        assert advisories.connection.execute(
+            'SELECT COUNT(*) FROM products WHERE path = ?', (str(invalid_path),)
+        ).fetchone() == (0,)
+
+
+def test_product_query_searches_the_indexes(tmp_path):
+    with catalog.Catalog(tmp_path / 'catalog.sqlite') as advisories:
+        statements = []
+        advisories.connection.set_trace_callback(statements.append)
+        advisories.query(product='AppY')
+        advisories.connection.set_trace_callback(None)
+        plan = ' '.join(row[-1] for row in advisories.connection.execute(f'EXPLAIN QUERY PLAN {statements[-1]}'))
+    assert 'SEARCH p USING INDEX products_product_id' in plan
+    assert 'SEARCH p USING INDEX products_name_nocase' in plan
+
+
+def test_app_query(capsys, tmp_path):
+    db_path = tmp_path / 'catalog.sqlite'
+    with catalog.Catalog(db_path) as advisories:
+        advisories.upsert(ADVISORY, tmp_path / 'advisory.json')
+    assert cli.app(['query', '--catalog', str(db_path), '--cve', 'CVE-2017-3826']) == 0
+    out, _ = capsys.readouterr()
+    assert out.split('\t')[:3] == [str(tmp_path / 'advisory.json'), 'vendorix-sa-20170301-abc', '1']
+    assert cli.app(['query', '--catalog', str(tmp_path / 'missing.sqlite')]) == 1
+
+
+def test_app_catalog_option(caplog, mocker, tmp_path):
+    caplog.set_level(logging.INFO)
+    db_path = tmp_path / 'catalog.sqlite'
+    source = tmp_path / 'advisory.xml'
+    source.write_text(HAS_VULNS_XML, encoding='utf-8')
+    build = mocker.spy(ProductIndex, 'of')
+    code = cli.app(['--input-file', str(source), '--output-dir', str(tmp_path), '--catalog', str(db_path)])
+    assert code == 0
+    assert not build.call_count  # The catalog reuses the index of the conversion
+    with catalog.Catalog(db_path) as cataloged:
+        assert [row[1] for row in cataloged.query(tracking_id='vendorix-sa-20170301-abc')] == [
+            'vendorix-sa-20170301-abc'
+        ]
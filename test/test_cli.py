@@ -1,7 +1,24 @@
+import gzip
+import json
 import logging
+import shutil
+import subprocess
+import sys
 
+import pytest
+
+import muuntaa.api as api
+import muuntaa.cache as cache
 import muuntaa.cli as cli
+import muuntaa.validator as validator
+import muuntaa.vuln as vuln
+import muuntaa.writer as writer
 from muuntaa import APP_NAME, VERSION
+from muuntaa.vuln import Vulnerabilities
+from test.test_vuln import HAS_VULNS_XML
+
+ADVISORY_JSON = 'vendorix-sa-20170301-abc.json'
+ADVISORY_MSGPACK = 'vendorix-sa-20170301-abc.msgpack'
 
 
 def test_app_version(capsys):
@@ -23,17 +40,17 @@ def test_app_help(capsys):
 def test_app_invalid_input_file_content(caplog, capsys):
     caplog.set_level(logging.INFO)
     code = cli.app(['--input-file', 'README.md'])
-    assert code == 0  # TODO(sthagen): for now OK, real implementation SHALL return 1
+    assert code == 1
     out, err = capsys.readouterr()
     assert not err
     assert not out
-    assert 'out_invalid.json.' in caplog.text
+    assert 'Parsing failed.' in caplog.text
 
 
 def test_app_input_file_path_missing(caplog, capsys):
     caplog.set_level(logging.INFO)
     code = cli.app(['--input-file', 'not-present.xml'])
-    assert code == 0  # TODO(sthagen): for now OK, real implementation SHALL return 1
+    assert code == 1
     out, err = capsys.readouterr()
     assert not err
     assert not out
@@ -43,8 +60,214 @@ def test_app_input_file_path_missing(caplog, capsys):
 def test_app_invalid_input_file_content_override_force(caplog, capsys):
     caplog.set_level(logging.INFO)
     code = cli.app(['--input-file', 'README.md', '--force'])
-    assert code == 0  # TODO(sthagen): for now OK, real implementation SHALL return 1
+    assert code == 1  # Nothing to force as parsing failed
     out, err = capsys.readouterr()
     assert not err
     assert not out
-    assert 'out_invalid.json.' in caplog.text
+    assert 'Parsing failed.' in caplog.text
+
+
+@pytest.fixture
+def advisory(tmp_path):
+    path = tmp_path / 'advisory.xml'
+    path.write_text(HAS_VULNS_XML, encoding='utf-8')
+    return str(path)
+
+
+def test_app_converts_the_document(advisory, tmp_path):
+    code = cli.app(['--input-file', advisory, '--output-dir', str(tmp_path / 'out')])
+    assert code == 0
+    csaf = json.loads((tmp_path / 'out' / ADVISORY_JSON).read_text(encoding='utf-8'))
+    assert csaf['document']['tracking']['id'] == 'vendorix-sa-20170301-abc'
+    assert csaf['document']['references'][0]['category'] == 'self'
+
+
+def test_app_invalid_conversion_requires_force(advisory, caplog, mocker, tmp_path):
+    mocker.patch.object(validator, 'validate', return_value=[(logging.ERROR, 'Broken.')])
+    out_dir = tmp_path / 'out'
+    assert cli.app(['--input-file', advisory, '--output-dir', str(out_dir)]) == 1
+    assert 'Conversion result is invalid. Nothing written (use --force to write it anyway).' in caplog.text
+    assert not out_dir.exists()
+    assert cli.app(['--input-file', advisory, '--output-dir', str(out_dir), '--force']) == 0
+    assert [path.name for path in out_dir.iterdir()] == ['vendorix-sa-20170301-abc_invalid.json']
+
+
+def test_app_current_version_missing_in_revision_history_requires_force(caplog, tmp_path):
+    advisory = tmp_path / 'advisory.xml'
+    advisory.write_text(HAS_VULNS_XML.replace('<Version>1.0</Version>', '<Version>2.0</Version>'), encoding='utf-8')
+    out_dir = tmp_path / 'out'
+    assert cli.app(['--input-file', str(advisory), '--output-dir', str(out_dir)]) == 1
+    assert 'Current version is missing in revision history.' in caplog.text
+    assert not out_dir.exists()
+    assert cli.app(['--input-file', str(advisory), '--output-dir', str(out_dir), '--force']) == 0
+    assert (out_dir / 'vendorix-sa-20170301-abc_invalid.json').is_file()
+    assert not (out_dir / ADVISORY_JSON).exists()
+
+
+def test_app_year_folders_and_provider_index(caplog, advisory, tmp_path):
+    caplog.set_level(logging.INFO)
+    code = cli.app(['--input-file', advisory, '--output-dir', str(tmp_path), '--year-folders', '--provider-index'])
+    assert code == 0
+    assert (tmp_path / '2017' / ADVISORY_JSON).is_file()
+    assert (tmp_path / 'index.txt').read_text(encoding='utf-8') == f'2017/{ADVISORY_JSON}\n'
+
+
+def test_app_provider_index_skips_invalid_and_compressed_outputs(advisory, mocker, tmp_path):
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path), '--provider-index']
+    assert cli.app(argv + ['--compress']) == 0
+    mocker.patch.object(validator, 'validate', return_value=[(logging.ERROR, 'Broken.')])
+    assert cli.app(argv + ['--force']) == 0
+    assert (tmp_path / 'vendorix-sa-20170301-abc_invalid.json').is_file()
+    assert (tmp_path / 'index.txt').read_text(encoding='utf-8') == ''
+    mocker.stopall()
+    assert cli.app(argv[:-1] + ['--rebuild-provider-index']) == 0
+    assert (tmp_path / 'index.txt').read_text(encoding='utf-8') == f'{ADVISORY_JSON}\n'
+
+
+def test_app_json_and_msgpack_output(advisory, tmp_path):
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path / 'out'), '--output-format', 'json']
+    code = cli.app(argv + ['--output-format', 'msgpack'])
+    assert code == 0
+    assert sorted(path.name for path in (tmp_path / 'out').iterdir()) == [ADVISORY_JSON, ADVISORY_MSGPACK]
+
+
+def test_app_fsync_group_size(advisory, mocker, tmp_path):
+    sink = mocker.spy(writer, 'OutputSink')
+    assert cli.app(['--input-file', advisory, '--output-dir', str(tmp_path), '--fsync-group-size', '8']) == 0
+    assert sink.call_args.kwargs == {'fsync_group_size': 8}
+
+
+def test_app_print_shares_the_encoded_bytes(advisory, capsys, mocker, tmp_path):
+    encode = mocker.spy(writer, 'encode')
+    code = cli.app(['--input-file', advisory, '--output-dir', str(tmp_path), '--print', '--compress'])
+    assert code == 0
+    out, err = capsys.readouterr()
+    assert encode.call_count == 1
+    assert out.rstrip('\n') == gzip.decompress((tmp_path / f'{ADVISORY_JSON}.gz').read_bytes()).decode('utf-8')
+    assert json.loads(out)['document']['csaf_version'] == '2.0'
+
+
+def test_app_previous_file_delta(advisory, tmp_path):
+    previous = tmp_path / 'previous.json'
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path), '--generator-date', '2024-01-09T00:00:00Z']
+    assert cli.app(argv) == 0
+    csaf = json.loads((tmp_path / ADVISORY_JSON).read_text(encoding='utf-8'))
+    csaf['document']['title'] = 'old'
+    previous.write_text(json.dumps(csaf), encoding='utf-8')
+    assert cli.app(argv + ['--previous-file', str(previous)]) == 0
+    patch = json.loads((tmp_path / 'vendorix-sa-20170301-abc.json-patch').read_text(encoding='utf-8'))
+    assert patch == [{'op': 'replace', 'path': '/document/title', 'value': 'AppY Stream Control Transmission Protocol'}]
+
+
+def test_app_writes_vuln_digests_only_if_incremental(advisory, mocker, tmp_path):
+    digest = mocker.spy(Vulnerabilities, 'digest')
+    assert cli.app(['--input-file', advisory, '--output-dir', str(tmp_path)]) == 0
+    assert not digest.call_count
+    assert not vuln.digests_path(tmp_path / ADVISORY_JSON).exists()
+    assert cli.app(['--input-file', advisory, '--output-dir', str(tmp_path), '--incremental']) == 0
+    assert digest.call_count == 1
+    assert vuln.digests_path(tmp_path / ADVISORY_JSON).is_file()
+
+
+def test_app_writes_vuln_digests_and_reuses_previous(advisory, caplog, mocker, tmp_path):
+    caplog.set_level(logging.INFO)
+    mocker.patch.object(Vulnerabilities, 'sometimes', lambda self, root: self.hook.append({'cve': root.CVE.text}))
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path / 'out'), '--incremental']
+    assert cli.app(argv) == 0
+    out_path = tmp_path / 'out' / ADVISORY_JSON
+    assert len(vuln.digests_path(out_path).read_bytes()) == vuln.DIGEST_SIZE
+    load = mocker.spy(Vulnerabilities, 'load')
+    assert cli.app(argv + ['--previous-file', str(out_path)]) == 0
+    assert not load.call_count
+    assert 'Reused 1 unchanged vulnerabilities.' in caplog.text
+    cached = ['--input-file', advisory, '--incremental', '--cache-dir', str(tmp_path / 'c'), '--output-dir']
+    assert cli.app(cached + [str(tmp_path / 'first')]) == 0
+    assert cli.app(cached + [str(tmp_path / 'second')]) == 0
+    assert 'Conversion cache hit' in caplog.text
+    assert (
+        vuln.digests_path(tmp_path / 'second' / ADVISORY_JSON).read_bytes() == vuln.digests_path(out_path).read_bytes()
+    )
+
+
+def test_app_conversion_cache(advisory, caplog, mocker, tmp_path):
+    caplog.set_level(logging.INFO)
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path / 'out'), '--cache-dir', str(tmp_path / 'c')]
+    assert cli.app(argv) == 0
+    encode = mocker.spy(writer, 'encode')
+    assert cli.app(argv) == 0
+    assert not encode.call_count
+    assert f'Conversion cache hit for {advisory}.' in caplog.text
+    assert (tmp_path / 'out' / ADVISORY_JSON).read_bytes().startswith(b'{')
+    assert cli.app(argv + ['--no-cache']) == 0
+    assert encode.call_count == 1
+
+
+def test_app_conversion_cache_entry_vanished(advisory, caplog, mocker, tmp_path):
+    caplog.set_level(logging.INFO)
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path / 'out'), '--cache-dir', str(tmp_path / 'c')]
+    assert cli.app(argv) == 0
+    lookup = mocker.patch.object(cache.ConversionCache, 'lookup', autospec=True)
+    meta = {'id': 'evicted', 'valid': True}
+    lookup.side_effect = lambda self, key, formats: ({'json': self.entry(key) / 'json'}, meta)
+    shutil.rmtree(tmp_path / 'c')  # Evicted concurrently after the lookup
+    assert cli.app(argv) == 0
+    assert f'Conversion cache entry for {advisory} vanished. Converting.' in caplog.text
+    assert 'CRITICAL' not in caplog.text
+    assert json.loads((tmp_path / 'out' / ADVISORY_JSON).read_text(encoding='utf-8'))['document']
+
+
+def test_app_deterministic_source_date_epoch(advisory, monkeypatch, tmp_path):
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '1700000000')
+    argv = ['--input-file', advisory, '--output-dir', str(tmp_path), '--deterministic', '--output-format', 'msgpack']
+    assert cli.app(argv) == 0
+    first = (tmp_path / ADVISORY_MSGPACK).read_bytes()
+    assert cli.app(argv) == 0
+    assert (tmp_path / ADVISORY_MSGPACK).read_bytes() == first
+    assert first.startswith(b'\x83\xa8document')  # keys sorted
+    assert api.load_msgpack(tmp_path / ADVISORY_MSGPACK)['document']['tracking']['generator']['date'] == (
+        '2023-11-14T22:13:20.000+00:00'
+    )
+
+
+def test_app_invalid_source_date_epoch(advisory, caplog, monkeypatch, tmp_path):
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', 'never')
+    cli.app(['--input-file', advisory, '--output-dir', str(tmp_path / 'out')])
+    errors = [record.getMessage() for record in caplog.records if record.levelno == logging.CRITICAL]
+    assert len(errors) == 1
+    assert errors[0].startswith('invalid SOURCE_DATE_EPOCH provided never: ')
+    assert not (tmp_path / 'out').exists()
+
+
+def test_app_invalid_generator_date(advisory, caplog, tmp_path):
+    code = cli.app(['--input-file', advisory, '--output-dir', str(tmp_path / 'out'), '--generator-date', 'garbage'])
+    assert code == 1
+    errors = [record.getMessage() for record in caplog.records if record.levelno == logging.CRITICAL]
+    assert len(errors) == 1
+    assert errors[0].startswith('invalid time stamp provided garbage: ')
+    assert not (tmp_path / 'out').exists()
+
+
+HEAVY_MODULES = ('argparse', 'lxml', 'msgspec', 'yaml')
+
+
+def _imported_modules(statement):
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True
+    )
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip())
+    return modules, completed.stdout
+
+
+def test_startup_imports_stay_light():
+    modules, _ = _imported_modules('import muuntaa.cli')
+    assert 'muuntaa.cli' in modules
+    assert not [name for name in modules if name.split('.')[0] in HEAVY_MODULES]
+
+
+def test_version_imports_stay_light():
+    modules, out = _imported_modules('import muuntaa.cli; muuntaa.cli.app(["--version"])')
+    assert VERSION in out
+    assert not [name for name in modules if name.split('.')[0] in HEAVY_MODULES]
@@ -1,6 +1,8 @@
 import logging
 import pathlib
 
+import msgspec
+import pytest
 import yaml
 
 import muuntaa.config as cfg
@@ -84,3 +86,38 @@ def test_boolify_explicit_boolean_keys():
     assert configuration[key] == immutable
     assert configuration[other_key] is True
     assert not scoped_messages
+
+
+def test_to_settings():
+    configuration = cfg.load()
+    configuration['force'] = 'yes'
+    settings, scoped_messages = cfg.to_settings(configuration)
+    assert not scoped_messages
+    assert configuration['force'] == 'yes'
+    assert settings.force is True
+    assert settings.force_insert_default_reference_category is True
+    assert settings.default_CVSS3_version == '3.0'
+    with pytest.raises(AttributeError):
+        settings.force = False  # type: ignore
+
+
+def test_to_settings_invalid():
+    settings, scoped_messages = cfg.to_settings({'force': 'perhaps'})
+    assert settings is None
+    assert scoped_messages[0][0] == logging.CRITICAL
+    settings, scoped_messages = cfg.to_settings({'default_CVSS3_version': 3.1})
+    assert settings is None
+    assert 'default_CVSS3_version' in scoped_messages[-1][1]
+
+
+def test_defaults_match_resource():
+    assert cfg.load() == yaml.safe_load(cfg.eject())
+    assert cfg.load() is not cfg.DEFAULTS
+
+
+def test_defaults_match_settings():
+    settings = msgspec.structs.asdict(cfg.Settings())
+    shared = [key for key in cfg.DEFAULTS if key in settings]
+    assert 'force_insert_default_reference_category' in shared
+    assert all(cfg.DEFAULTS[key] == settings[key] for key in shared)
+    assert cfg.to_settings({})[0] == cfg.to_settings(cfg.load())[0]
@@ -0,0 +1,76 @@
+import copy
+
+import muuntaa.delta as delta
+
+OLD = {
+    'document': {
+        'title': 'AppY',
+        'tracking': {'version': '1', 'revision_history': [{'number': '1', 'summary': 'Initial'}]},
+    },
+    'product_tree': {
+        'full_product_names': [
+            {'product_id': 'CSAFPID-1', 'name': 'AppY 1'},
+            {'product_id': 'CSAFPID-2', 'name': 'AppY 2'},
+            {'product_id': 'CSAFPID-3', 'name': 'AppY 3'},
+        ],
+    },
+    'vulnerabilities': [
+        {'cve': 'CVE-2017-0001', 'title': 'one'},
+        {'cve': 'CVE-2017-0002', 'title': 'two'},
+        {'ids': [{'system_name': 'Bug', 'text': 'B3'}], 'title': 'three'},
+    ],
+}
+
+
+def revised():
+    new = copy.deepcopy(OLD)
+    new['document']['tracking']['version'] = '2'
+    new['document']['tracking']['revision_history'].append({'number': '2', 'summary': 'Fix'})
+    new['product_tree']['full_product_names'].pop(1)
+    new['product_tree']['full_product_names'].append({'product_id': 'CSAFPID-4', 'name': 'AppY/4'})
+    new['vulnerabilities'][2]['title'] = 'three (revised)'
+    new['vulnerabilities'].insert(0, {'cve': 'CVE-2017-0000', 'title': 'zero'})
+    return new
+
+
+def test_diff_keyed_and_positional():
+    new = revised()
+    patch = delta.diff(OLD, new)
+    assert patch == [
+        {'op': 'replace', 'path': '/document/tracking/version', 'value': '2'},
+        {'op': 'add', 'path': '/document/tracking/revision_history/-', 'value': {'number': '2', 'summary': 'Fix'}},
+        {'op': 'remove', 'path': '/product_tree/full_product_names/1'},
+        {
+            'op': 'add',
+            'path': '/product_tree/full_product_names/2',
+            'value': {'product_id': 'CSAFPID-4', 'name': 'AppY/4'},
+        },
+        {'op': 'add', 'path': '/vulnerabilities/0', 'value': {'cve': 'CVE-2017-0000', 'title': 'zero'}},
+        {'op': 'replace', 'path': '/vulnerabilities/3/title', 'value': 'three (revised)'},
+    ]
+    assert delta.apply(copy.deepcopy(OLD), patch) == new
+
+
+def test_diff_identical():
+    assert delta.diff(OLD, copy.deepcopy(OLD)) == []
+
+
+def test_diff_reordered_falls_back_to_replace():
+    new = copy.deepcopy(OLD)
+    new['vulnerabilities'].reverse()
+    patch = delta.diff(OLD, new)
+    assert patch == [{'op': 'replace', 'path': '/vulnerabilities', 'value': new['vulnerabilities']}]
+    assert delta.apply(copy.deepcopy(OLD), patch) == new
+
+
+def test_diff_unkeyed_removal_and_escaping():
+    old = {'a/b': [1, 2, 3], 'gone': True, 'x~': {'n': 1}}
+    new = {'a/b': [1], 'x~': {'n': 1.0}}
+    patch = delta.diff(old, new)
+    assert patch == [
+        {'op': 'remove', 'path': '/gone'},
+        {'op': 'remove', 'path': '/a~1b/2'},
+        {'op': 'remove', 'path': '/a~1b/1'},
+        {'op': 'replace', 'path': '/x~0/n', 'value': 1.0},
+    ]
+    assert delta.apply(copy.deepcopy(old), patch) == new
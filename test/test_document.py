@@ -2,7 +2,8 @@ import logging
 
 from lxml import objectify
 
-from muuntaa.document import Publisher, Tracking
+from muuntaa.config import to_settings
+from muuntaa.document import Publisher, Revision, Tracking
 from muuntaa import APP_ALIAS, VERSION
 
 CFG = {
@@ -100,7 +101,7 @@ def test_tl_publisher(caplog):
         },
     }
 
-    part = Publisher(config=CFG_TOO)
+    part = Publisher(settings=to_settings(CFG_TOO)[0])
     caplog.set_level(logging.INFO)
     part.load(ROOT_HAS_TL_PUBLISHER.DocumentPublisher)
     assert not part.has_errors()
@@ -124,10 +125,7 @@ def test_tl_tracking(caplog):
                 'initial_release_date': '2017-03-01T16:00:00.000+00:00',
                 'revision_history': [
                     {
-                        'date': (
-                            '2017-03-01T14:58:48.000+00:00',
-                            [],
-                        ),
+                        'date': '2017-03-01T14:58:48.000+00:00',
                         'legacy_version': '1.0',
                         'number': '1',
                         'summary': 'Initial public release.',
@@ -139,11 +137,39 @@ def test_tl_tracking(caplog):
         },
     }
 
-    part = Tracking(config=CFG)
+    part = Tracking(settings=to_settings(CFG)[0])
     caplog.set_level(logging.ERROR)
     part.load(ROOT_HAS_TL_TRACKING.DocumentTracking)
     assert not part.has_errors()
     part_dump = part.dump()
     expected['document']['tracking']['generator']['date'] = part_dump['document']['tracking']['generator']['date']
     assert part_dump == expected
-    assert 'Alias' in caplog.text
+    assert 'Alias' not in caplog.text  # Optional
+
+
+def test_tl_tracking_pinned_generator_date():
+    part = Tracking(settings=to_settings({**CFG, 'generator_date': '2024-01-02T03:04:05Z'})[0])
+    assert part.dump()['document']['tracking']['generator']['date'] == '2024-01-02T03:04:05.000+00:00'
+
+
+def test_tl_tracking_deterministic_generator_date():
+    part = Tracking(settings=to_settings({**CFG, 'deterministic': True})[0])
+    part.load(ROOT_HAS_TL_TRACKING.DocumentTracking)
+    tracking = part.dump()['document']['tracking']
+    assert tracking['generator']['date'] == tracking['current_release_date'] == '2017-03-01T14:58:48.000+00:00'
+
+
+def test_tracking_reindexes_revision_records():
+    revisions = [
+        Revision(date='d2', number='2', summary='Fix', number_cvrf='2', version_as_int_tuple=(2,)),
+        Revision(date='d1', number='1', summary='Initial', number_cvrf='1', version_as_int_tuple=(1,)),
+    ]
+    assert not Tracking.only_version_t(revisions)
+    root = objectify.fromstring('<DocumentTracking><Version>2</Version></DocumentTracking>')
+    reindexed, version = Tracking._reindex_versions_to_integers(root, revisions)
+    assert version == '2'
+    assert [revision.as_dict() for revision in reindexed] == [
+        {'date': 'd1', 'number': '1', 'summary': 'Initial', 'legacy_version': '1'},
+        {'date': 'd2', 'number': '2', 'summary': 'Fix', 'legacy_version': '2'},
+    ]
+    assert not hasattr(Tracking(settings=to_settings(CFG)[0]), '__dict__')
@@ -0,0 +1,55 @@
+from lxml import objectify
+
+import muuntaa.memo as memo
+from muuntaa.notes import Notes
+
+NOTES_XML = """\
+<cvrfdoc xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/cvrf">
+  <DocumentNotes>
+    <!-- {comment} -->
+    <Note Title="Legal Disclaimer" Type="Legal Disclaimer" Ordinal="1">{text}</Note>
+  </DocumentNotes>
+</cvrfdoc>
+"""
+
+
+def notes_root(text='THE INFORMATION IS PROVIDED AS IS.', comment='first'):
+    return objectify.fromstring(NOTES_XML.format(text=text, comment=comment)).DocumentNotes
+
+
+def test_load_memoized_hit_ignores_comments_and_returns_copies(mocker):
+    subtree_memo = memo.SubtreeMemo()
+    first = Notes(lc_parent_code='cvrf')
+    memo.load_memoized(first, notes_root(), subtree_memo)
+    assert (subtree_memo.hits, subtree_memo.misses) == (0, 1)
+
+    load = mocker.spy(Notes, 'load')
+    second = Notes(lc_parent_code='cvrf')
+    memo.load_memoized(second, notes_root(comment='second'), subtree_memo)
+    assert not load.call_count
+    assert (subtree_memo.hits, subtree_memo.misses) == (1, 1)
+    assert second.dump() == first.dump()
+    assert second.dump() is not first.dump()
+    assert second.dump()['document']['notes'][0]['category'] == 'legal_disclaimer'
+
+    third = Notes(lc_parent_code='cvrf')
+    memo.load_memoized(third, notes_root(), subtree_memo, variant='other-config')
+    assert load.call_count == 1
+
+
+def test_load_memoized_without_memo():
+    part = Notes(lc_parent_code='cvrf')
+    memo.load_memoized(part, notes_root(), None)
+    assert part.dump()['document']['notes'][0]['title'] == 'Legal Disclaimer'
+
+
+def test_memo_bounded_by_size():
+    subtree_memo = memo.SubtreeMemo(max_bytes=100)
+    subtree_memo.put('a', {'text': 'x' * 40}, False)
+    subtree_memo.put('b', {'text': 'y' * 40}, False)
+    subtree_memo.put('c', {'text': 'z' * 40}, True)
+    assert list(subtree_memo.entries) == ['b', 'c']
+    assert subtree_memo.size <= subtree_memo.max_bytes
+    assert subtree_memo.get('c') == ({'text': 'z' * 40}, True)
+    subtree_memo.put('huge', {'text': 'h' * 200}, False)
+    assert subtree_memo.get('huge') is None
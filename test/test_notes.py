@@ -1,8 +1,10 @@
 import logging
 
+import pytest
 from lxml import objectify
 
 from muuntaa.notes import Notes
+from muuntaa.subtree import DocumentBuilder
 
 HAS_TL_NOTES_XML = """\
 <?xml version='1.0'?>
@@ -60,3 +62,18 @@ def test_tl_notes(caplog):
     assert not part.has_errors()
     assert part.dump() == expected
     assert not caplog.text
+
+
+def test_vuln_notes_append_to_target():
+    builder = DocumentBuilder()
+    vulnerability = {'notes': []}
+    part = Notes(lc_parent_code='vuln', builder=builder, target=vulnerability['notes'])
+    part.load(ROOT_HAS_TL_NOTES.DocumentNotes)
+    assert [note['category'] for note in vulnerability['notes']] == ['summary']
+    assert not builder.document
+    assert part.dump() is vulnerability['notes']
+
+
+def test_vuln_notes_require_target():
+    with pytest.raises(KeyError, match='require a target list'):
+        Notes(lc_parent_code='vuln')
@@ -2,7 +2,7 @@ import logging
 
 from lxml import objectify
 
-from muuntaa.product import Products
+from muuntaa.product import ProductIndex, Products
 
 HAS_PRODUCTS_XML = """\
 <?xml version="1.0"?>
@@ -134,4 +134,160 @@ def test_products(caplog):
     caplog.set_level(logging.INFO)
     pro.load(ROOT_HAS_PRODUCTS)
     assert pro.dump() == expected
-    assert 'ingesting sometimes present element' in caplog.text
+    assert 'ingesting sometimes present element' not in caplog.text
+
+
+PRODUCT_TREE = {
+    'branches': [
+        {
+            'category': 'vendor',
+            'name': 'Vendorix',
+            'branches': [
+                {
+                    'category': 'product_name',
+                    'name': 'AppY',
+                    'branches': [
+                        {
+                            'category': 'product_version',
+                            'name': '1.0',
+                            'product': {
+                                'product_id': 'CVRFPID-223152',
+                                'name': 'AppY 1.0',
+                                'product_identification_helper': {'cpe': 'cpe:/a:vendorix:appy:1.0'},
+                            },
+                        },
+                    ],
+                },
+            ],
+        },
+    ],
+    'full_product_names': [{'product_id': 'CVRFPID-1', 'name': 'OS'}],
+    'relationships': [
+        {
+            'category': 'installed_on',
+            'product_reference': 'CVRFPID-223152',
+            'relates_to_product_reference': 'CVRFPID-1',
+            'full_product_name': {'product_id': 'CVRFPID-2', 'name': 'AppY 1.0 on OS'},
+        },
+    ],
+    'product_groups': [{'group_id': 'CVRFGID-1', 'product_ids': ['CVRFPID-223152', 'CVRFPID-2']}],
+}
+
+
+def test_product_index():
+    index = ProductIndex.of(PRODUCT_TREE)
+    assert index.names['CVRFPID-223152']['name'] == 'AppY 1.0'
+    assert index.paths['CVRFPID-223152'] == ['Vendorix', 'AppY', '1.0']
+    assert index.paths['CVRFPID-1'] == []
+    assert index.cpes == {'CVRFPID-223152': 'cpe:/a:vendorix:appy:1.0'}
+    assert index.relationships['CVRFPID-2'] == [('installed_on', 'CVRFPID-223152', 'CVRFPID-1')]
+    assert index.expand(['CVRFPID-1'], ['CVRFGID-1', 'CVRFGID-unknown']) == ['CVRFPID-1', 'CVRFPID-223152', 'CVRFPID-2']
+
+
+def test_products_product_index():
+    pro = Products()
+    assert pro.product_index() == ProductIndex()
+    pro._handle_branches(objectify.fromstring(PRODUCT_TREE_XML))
+    assert pro.product_index().paths == {
+        'CVRFPID-223152': ['Vendorix', 'AppY', '1.0'],
+        'CVRFPID-223153': ['Vendorix', 'AppY', '2.0'],
+    }
+    assert pro.product_index().cpes == {'CVRFPID-223152': 'cpe:/a:vendorix:appy:1.0'}
+    memoized = Products()
+    memoized.attach(PRODUCT_TREE)
+    assert memoized.product_index() == ProductIndex.of(PRODUCT_TREE)
+
+
+PRODUCT_TREE_XML = """\
+<ProductTree xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/prod">
+  <Branch Type="Vendor" Name="Vendorix">
+    <Branch Type="Product Name" Name="AppY">
+      <Branch Type="Product Version" Name="1.0">
+        <FullProductName ProductID="CVRFPID-223152" CPE="cpe:/a:vendorix:appy:1.0">AppY 1.0</FullProductName>
+      </Branch>
+      <Branch Type="Product Version" Name="2.0">
+        <FullProductName ProductID="CVRFPID-223153">AppY 2.0</FullProductName>
+      </Branch>
+    </Branch>
+    <Branch Type="Product Name" Name="AppZ"/>
+  </Branch>
+</ProductTree>
+"""
+
+PRODUCT_TREE_BRANCHES = [
+    {
+        'name': 'Vendorix',
+        'category': 'vendor',
+        'branches': [
+            {
+                'name': 'AppY',
+                'category': 'product_name',
+                'branches': [
+                    {
+                        'name': '1.0',
+                        'category': 'product_version',
+                        'product': {
+                            'product_id': 'CVRFPID-223152',
+                            'name': 'AppY 1.0',
+                            'product_identification_helper': {'cpe': 'cpe:/a:vendorix:appy:1.0'},
+                        },
+                    },
+                    {
+                        'name': '2.0',
+                        'category': 'product_version',
+                        'product': {'product_id': 'CVRFPID-223153', 'name': 'AppY 2.0'},
+                    },
+                ],
+            },
+            {'name': 'AppZ', 'category': 'product_name', 'branches': None},
+        ],
+    },
+]
+
+
+def nested_branches_xml(depth: int, width: int = 1) -> str:
+    leaves = ''.join(
+        f'<Branch Type="Product Version" Name="{i}"><FullProductName ProductID="P-{i}">{i}</FullProductName></Branch>'
+        for i in range(width)
+    )
+    opening = ''.join(f'<Branch Type="Vendor" Name="level-{level}">' for level in range(depth - 1))
+    return (
+        '<ProductTree xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/prod">'
+        f'{opening}{leaves}{"</Branch>" * (depth - 1)}</ProductTree>'
+    )
+
+
+def test_products_handle_branches(caplog):
+    pro = Products()
+    caplog.set_level(logging.INFO)
+    assert pro._handle_branches(objectify.fromstring(PRODUCT_TREE_XML)) == PRODUCT_TREE_BRANCHES
+    assert pro.branch_depth == 3
+    assert 'Product tree branches reach a maximum depth of 3.' in caplog.text
+
+
+def test_products_handle_branches_none():
+    pro = Products()
+    root = objectify.fromstring('<ProductTree xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/prod"/>')
+    assert pro._handle_branches(root) is None
+    assert pro.branch_depth == 0
+
+
+def test_products_handle_branches_beyond_recursion_limit():
+    depth = 2000  # Beyond the default recursion limit (libxml2 caps the depth at 2048 even for huge trees)
+    pro = Products()
+    branches = pro._handle_branches(
+        objectify.fromstring(nested_branches_xml(depth), objectify.makeparser(huge_tree=True))
+    )
+    assert pro.branch_depth == depth
+    for _ in range(depth - 1):
+        (branch,) = branches
+        branches = branch['branches']
+    assert branches == [{'name': '0', 'category': 'product_version', 'product': {'product_id': 'P-0', 'name': '0'}}]
+
+
+def test_products_handle_branches_wide():
+    width = 10_000
+    pro = Products()
+    (vendor,) = pro._handle_branches(objectify.fromstring(nested_branches_xml(2, width)))
+    assert pro.branch_depth == 2
+    assert [branch['product']['product_id'] for branch in vendor['branches']] == [f'P-{i}' for i in range(width)]
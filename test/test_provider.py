@@ -0,0 +1,57 @@
+import gzip
+import json
+import logging
+
+import muuntaa.provider as provider
+import muuntaa.writer as writer
+
+
+def advisory(release_date):
+    return {'document': {'tracking': {'current_release_date': release_date}, 'title': 'x' * 42}}
+
+
+def test_indexable():
+    assert provider.indexable('2023/vendorix-sa-1.json')
+    assert not provider.indexable('2023/vendorix-sa-1_invalid.json')
+    assert not provider.indexable('2023/vendorix-sa-1.json.gz')
+    assert not provider.indexable('2023/vendorix-sa-1.msgpack')
+
+
+def test_incremental_index(tmp_path):
+    index = provider.ProviderIndex(tmp_path)
+    assert index.load() == [(logging.INFO, f'No provider changes file at {tmp_path / provider.CHANGES_CSV} yet.')]
+    assert not index.add(tmp_path / '2023' / 'b.json', '2023-02-01T00:00:00.000+00:00')
+    assert not index.add(tmp_path / 'a.json', '2023-01-01T00:00:00.000+00:00')
+    index.save()
+
+    index = provider.ProviderIndex(tmp_path)
+    assert not index.load()
+    assert not index.add(tmp_path / 'a.json', '2023-03-01T00:00:00.000+00:00')  # revised advisory
+    assert not index.add(tmp_path / 'c.json', '2022-12-01T00:00:00.000+00:00')
+    assert index.add(tmp_path / 'd.json', None)[0][0] == logging.WARNING
+    assert index.add(tmp_path / 'e_invalid.json', '2023-03-01T00:00:00.000+00:00') == [
+        (logging.INFO, f'Output {tmp_path / "e_invalid.json"} is no valid uncompressed CSAF JSON file. Not indexed.')
+    ]
+    index.save()
+
+    assert (tmp_path / provider.INDEX_TXT).read_text(encoding='utf-8') == '2023/b.json\na.json\nc.json\n'
+    assert (tmp_path / provider.CHANGES_CSV).read_text(encoding='utf-8') == (
+        '"a.json","2023-03-01T00:00:00.000+00:00"\n'
+        '"2023/b.json","2023-02-01T00:00:00.000+00:00"\n'
+        '"c.json","2022-12-01T00:00:00.000+00:00"\n'
+    )
+
+
+def test_rebuild_index(tmp_path):
+    writer.write_csaf(advisory('2021-01-01T00:00:00.000+00:00'), tmp_path / 'old.json')
+    writer.write_csaf(advisory('2024-01-01T00:00:00.000+00:00'), tmp_path / '2024' / 'new.json')
+    writer.write_csaf(advisory('2024-01-01T00:00:00.000+00:00'), tmp_path / '2024' / 'new.json.gz')
+    writer.write_csaf(advisory('2024-02-01T00:00:00.000+00:00'), tmp_path / '2024' / 'newer_invalid.json')
+    (tmp_path / 'broken.json').write_text('{"document": {}}', encoding='utf-8')
+    with gzip.open(tmp_path / '2024' / 'new.json.gz', 'rt', encoding='utf-8') as handle:
+        assert json.load(handle)['document']['title']
+
+    scoped_messages = provider.rebuild_index(tmp_path)
+    assert scoped_messages[0][0] == logging.WARNING
+    assert scoped_messages[-1] == (logging.INFO, f'Updated provider index of 2 advisories in {tmp_path}.')
+    assert (tmp_path / provider.INDEX_TXT).read_text(encoding='utf-8') == '2024/new.json\nold.json\n'
@@ -2,6 +2,7 @@ import logging
 
 from lxml import objectify
 
+from muuntaa.config import to_settings
 from muuntaa.refs import References
 
 CFG = {
@@ -53,9 +54,18 @@ def test_tl_references(caplog):
         },
     }
 
-    part = References(config=CFG, lc_parent_code='cvrf')
+    part = References(settings=to_settings(CFG)[0], lc_parent_code='cvrf')
     caplog.set_level(logging.INFO)
     part.load(ROOT_HAS_TL_REFERENCES.DocumentReferences)
     assert not part.has_errors()
     assert part.dump() == expected
     assert not caplog.text
+
+
+def test_vuln_references_dump_only_their_content():
+    target = []
+    part = References(settings=to_settings(CFG)[0], lc_parent_code='vuln', target=target)
+    part.load(ROOT_HAS_TL_REFERENCES.DocumentReferences)
+    assert part.dump() is target
+    assert [reference['category'] for reference in target] == ['self']
+    assert not part.tree
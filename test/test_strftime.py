@@ -35,3 +35,36 @@ def test_get_utc_now():
     later = dti.datetime.now(dti.timezone.utc).isoformat(timespec='milliseconds')
     assert not error
     assert earlier <= ts_text <= later
+
+
+def test_source_date_epoch(monkeypatch):
+    monkeypatch.delenv(strftime.SOURCE_DATE_EPOCH_ENV, raising=False)
+    assert strftime.source_date_epoch() == (None, [])
+    monkeypatch.setenv(strftime.SOURCE_DATE_EPOCH_ENV, '1700000000')
+    assert strftime.source_date_epoch() == ('2023-11-14T22:13:20.000+00:00', [])
+    monkeypatch.setenv(strftime.SOURCE_DATE_EPOCH_ENV, 'yesterday')
+    ts_text, scoped_messages = strftime.source_date_epoch()
+    assert ts_text is None
+    assert scoped_messages[0][0] == logging.CRITICAL
+
+
+def test_get_utc_timestamp_memoizes_fixed_inputs_only():
+    strftime.cache_clear()
+    for _ in range(3):
+        assert strftime.get_utc_timestamp('2017-03-01T14:58:48') == ('2017-03-01T14:58:48.000+00:00', [])
+    strftime.get_utc_timestamp()
+    info = strftime.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+    problems = strftime.get_utc_timestamp('no-timestamp')[1]
+    problems.clear()
+    assert strftime.get_utc_timestamp('no-timestamp')[1]
+
+
+def test_get_utc_timestamps_batch():
+    strftime.cache_clear()
+    texts = ['2017-03-01T14:58:48', '2017-03-01T16:00:00Z', '2017-03-01T14:58:48', 'now']
+    timestamps = strftime.get_utc_timestamps(texts)
+    assert timestamps['2017-03-01T16:00:00Z'] == ('2017-03-01T16:00:00.000+00:00', [])
+    assert strftime.cache_info().misses == 2
+    assert timestamps['now'][0] is not None
+    assert 'now' not in strftime.get_utc_timestamps(texts[:1])
@@ -0,0 +1,82 @@
+import copy
+import logging
+
+import muuntaa.validator as validator
+
+DOCUMENT = {
+    'category': 'csaf_security_advisory',
+    'csaf_version': '2.0',
+    'publisher': {'category': 'vendor', 'name': 'Vendorix', 'namespace': 'https://example.com'},
+    'title': 'AppY',
+    'tracking': {'id': 'vendorix-sa-1'},
+}
+ADVISORY = {
+    'document': DOCUMENT,
+    'product_tree': {
+        'branches': [
+            {
+                'category': 'vendor',
+                'name': 'Vendorix',
+                'branches': [{'category': 'product_version', 'name': '1.0', 'product': {'product_id': 'P-1'}}],
+            },
+        ],
+        'full_product_names': [{'product_id': 'P-2', 'name': 'OS'}],
+        'relationships': [
+            {
+                'category': 'installed_on',
+                'product_reference': 'P-1',
+                'relates_to_product_reference': 'P-2',
+                'full_product_name': {'product_id': 'P-3', 'name': 'AppY on OS'},
+            },
+        ],
+        'product_groups': [{'group_id': 'G-1', 'product_ids': ['P-1', 'P-3']}],
+    },
+    'vulnerabilities': [
+        {
+            'product_status': {'known_affected': ['P-1'], 'fixed': ['P-3'], 'recommended': ['P-3']},
+            'remediations': [{'category': 'vendor_fix', 'group_ids': ['G-1']}],
+            'scores': [{'cvss_v3': {'version': '3.1'}, 'products': ['P-1']}],
+            'threats': [{'category': 'impact', 'product_ids': ['P-2']}],
+        },
+    ],
+}
+
+
+def test_validate_valid():
+    scoped_messages = validator.validate(ADVISORY)
+    assert not scoped_messages
+    assert validator.is_valid(scoped_messages)
+
+
+def test_validate_missing_document():
+    assert not validator.is_valid(validator.validate({'csaf_version': '2.0'}))
+    scoped_messages = validator.validate({'document': {'title': 'AppY'}})
+    assert len(scoped_messages) == len(validator.REQUIRED_DOCUMENT_MEMBERS) - 1
+
+
+def test_validate_reports_each_mandatory_test():
+    advisory = copy.deepcopy(ADVISORY)
+    product_tree = advisory['product_tree']
+    product_tree['full_product_names'].append({'product_id': 'P-1', 'name': 'twice'})
+    product_tree['product_groups'].append({'group_id': 'G-1', 'product_ids': ['P-4']})
+    product_tree['relationships'][0]['product_reference'] = 'P-3'
+    vulnerability = advisory['vulnerabilities'][0]
+    vulnerability['product_status']['known_not_affected'] = ['P-1']
+    vulnerability['threats'][0]['group_ids'] = ['G-2']
+    vulnerability['scores'].append({'cvss_v3': {'version': '3.1'}, 'products': ['P-1']})
+    scoped_messages = validator.validate(advisory)
+    assert {level for level, _ in scoped_messages} == {logging.ERROR}
+    tests = sorted(message.split(' ', 1)[0] for _, message in scoped_messages)
+    assert tests == ['6.1.1', '6.1.2', '6.1.3', '6.1.4', '6.1.5', '6.1.6', '6.1.7']
+    assert '/product_tree/product_groups/1/product_ids/0' in ' '.join(message for _, message in scoped_messages)
+
+
+def test_validate_stays_linear_on_many_references():
+    advisory = copy.deepcopy(ADVISORY)
+    many = [f'X-{n}' for n in range(100_000)]
+    advisory['product_tree']['full_product_names'] += [{'product_id': product_id} for product_id in many]
+    advisory['vulnerabilities'][0]['product_status'] = {'known_affected': many + ['P-missing']}
+    scoped_messages = validator.validate(advisory)
+    assert [message for _, message in scoped_messages] == [
+        '6.1.1 Missing definition of product ID P-missing at /vulnerabilities/0/product_status/known_affected/100000.'
+    ]
@@ -1,7 +1,10 @@
 import logging
 
+import pytest
 from lxml import objectify
 
+import muuntaa.vuln as vuln
+from muuntaa.config import to_settings
 from muuntaa.vuln import Vulnerabilities
 
 CFG = {
@@ -136,9 +139,139 @@ ROOT_HAS_VULNS = objectify.fromstring(HAS_VULNS_XML)
 
 
 def test_products(caplog):
-    expected = {'vulnerabilities': []}  # TODO: Find the bug or a sample that results in vulnerabilities
-    vln = Vulnerabilities(config=CFG)
+    vln = Vulnerabilities(settings=to_settings(CFG)[0])
     caplog.set_level(logging.INFO)
-    vln.load(ROOT_HAS_VULNS)
-    assert vln.dump() == expected
+    vln.load(ROOT_HAS_VULNS.find('{*}Vulnerability'))
+    assert not vln.has_errors()
+    assert 'ingesting' not in caplog.text
+    (vulnerability,) = vln.dump()['vulnerabilities']
+    affected = ['CVRFPID-223152', 'CVRFPID-223153', 'CVRFPID-223155', 'CVRFPID-223156']
+    assert vulnerability['cve'] == 'CVE-2017-3826'
+    assert vulnerability['product_status'] == {'known_affected': affected}
+    assert vulnerability['remediations'][0]['product_ids'] == affected  # Fixed from the affected products
+    assert vulnerability['scores'][0]['products'] == affected
+
+
+def _map_title(self, root):
+    self.hook.append({'title': root.Title.text})
+
+
+def _revised(title):
+    xml = HAS_VULNS_XML.replace('<!-- No more elements to follow -->', HAS_VULNS_XML_SECOND.format(title=title))
+    return objectify.fromstring(xml.encode()).findall('{*}Vulnerability')
+
+
+HAS_VULNS_XML_SECOND = """\
+  <Vulnerability Ordinal="2" xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/vuln">
+    <Title>{title}</Title>
+  </Vulnerability>
+"""
+
+
+def test_load_incremental_maps_only_changed_vulnerabilities(mocker, tmp_path):
+    mocker.patch.object(Vulnerabilities, 'sometimes', _map_title)
+    first = Vulnerabilities(settings=to_settings(CFG)[0])
+    first.load_incremental(_revised('Initial'), {})
+    assert first.reused == 0
+    assert first.dump()['vulnerabilities'][1] == {'title': 'Initial'}
+    sidecar = vuln.digests_path(tmp_path / 'advisory.json')
+    assert sidecar.name == 'advisory.json.vuln-digests'
+    sidecar.write_bytes(first.dump_digests())
+    assert len(sidecar.read_bytes()) == 2 * vuln.DIGEST_SIZE
+
+    previous = vuln.previous_mapping(vuln.read_digests(sidecar), first.dump()['vulnerabilities'])
+    spy = mocker.spy(Vulnerabilities, 'load')
+    second = Vulnerabilities(settings=to_settings(CFG)[0])
+    second.load_incremental(_revised('Revised'), previous)
+    assert second.reused == 1
+    assert spy.call_count == 1
+    assert second.dump()['vulnerabilities'] == [first.dump()['vulnerabilities'][0], {'title': 'Revised'}]
+    assert second.digests[0] == first.digests[0]
+    assert second.digests[1] != first.digests[1]
+
+    other = Vulnerabilities(settings=to_settings({**CFG, 'default_CVSS3_version': '3.1'})[0])
+    other.load_incremental(_revised('Initial'), previous)
+    assert other.reused == 0
+
+    mocker.patch.object(vuln, 'VERSION', 'upgraded')
+    upgraded = Vulnerabilities(settings=to_settings(CFG)[0])
+    upgraded.load_incremental(_revised('Initial'), previous)
+    assert upgraded.reused == 0
+
+
+def test_previous_mapping_requires_alignment(tmp_path):
+    digests = [bytes([1]) * vuln.DIGEST_SIZE, vuln.NO_DIGEST]
+    assert vuln.previous_mapping(digests, [{'title': 'a'}]) == {}
+    assert vuln.previous_mapping(digests, [{'title': 'a'}, {'title': 'b'}]) == {digests[0]: {'title': 'a'}}
+    truncated = tmp_path / 'truncated.vuln-digests'
+    truncated.write_bytes(b'\0' * (vuln.DIGEST_SIZE + 1))
+    with pytest.raises(ValueError):
+        vuln.read_digests(truncated)
+
+
+def test_remove_cvssv3_duplicates():
+    vln = Vulnerabilities(settings=to_settings(CFG)[0])
+    scores = [
+        vuln.ScoreSet(json_property='cvss_v3', cvss={'version': '3.0'}, products=['A', 'B']),
+        vuln.ScoreSet(json_property='cvss_v3', cvss={'version': '3.1'}, products=['A']),
+        vuln.ScoreSet(json_property='cvss_v3', cvss={'version': '3.0'}, products=['A']),
+        vuln.ScoreSet(json_property='cvss_v2', cvss={'version': '2.0'}, products=['A']),
+    ]
+    assert vln._remove_cvssv3_duplicates(scores) == [
+        {'cvss_v3': {'version': '3.0'}, 'products': ['B']},
+        {'cvss_v3': {'version': '3.1'}, 'products': ['A']},
+        {'cvss_v2': {'version': '2.0'}, 'products': ['A']},
+    ]
+
+
+DATED_VULN_XML = """\
+<Vulnerability Ordinal="1" xmlns="http://docs.oasis-open.org/csaf/ns/csaf-cvrf/v1.2/vuln">
+  <DiscoveryDate>2017-02-01T00:00:00</DiscoveryDate>
+  <Threats>
+    <Threat Type="Impact" Date="2017-03-01T14:58:48">
+      <Description>Crash</Description>
+      <ProductID>CVRFPID-1</ProductID>
+      <GroupID>CVRFGID-1</GroupID>
+    </Threat>
+  </Threats>
+  <Remediations>
+    <Remediation Type="Vendor Fix" Date="2017-03-01T14:58:48">
+      <Description>Upgrade</Description>
+      <Entitlement>All</Entitlement>
+      <URL>https://example.com/fix</URL>
+      <ProductID>CVRFPID-1</ProductID>
+      <GroupID>CVRFGID-1</GroupID>
+    </Remediation>
+  </Remediations>
+</Vulnerability>
+"""
+
+
+def test_dates_are_normalized_in_one_batch(mocker):
+    vln = Vulnerabilities(settings=to_settings(CFG)[0])
+    root = objectify.fromstring(DATED_VULN_XML)
+    batch = mocker.spy(vuln, 'get_utc_timestamps')
+    assert sorted(vln._date_texts(root)) == ['2017-02-01T00:00:00', '2017-03-01T14:58:48', '2017-03-01T14:58:48']
+    timestamps = vuln.get_utc_timestamps(vln._date_texts(root))
+    assert batch.call_count == 1
+    threats = vln._handle_threats(root.Threats, timestamps)
+    remediations = vln._handle_remediations(root.Remediations, None, timestamps)
+    assert threats[0]['date'] == remediations[0]['date'] == '2017-03-01T14:58:48.000+00:00'
+
+
+def test_dates_are_normalized_once_per_document(mocker):
+    vln = Vulnerabilities(settings=to_settings(CFG)[0])
+    roots = [objectify.fromstring(DATED_VULN_XML), objectify.fromstring(DATED_VULN_XML.replace('2017-02', '2017-01'))]
+    batch = mocker.spy(vuln, 'get_utc_timestamps')
+    vln.load_all(roots)
+    assert batch.call_count == 1
+    assert [vulnerability['discovery_date'][:10] for vulnerability in vln.hook] == ['2017-02-01', '2017-01-01']
+    assert not vln.has_errors()
+
+
+def test_failing_part_sets_some_error(caplog):
+    vln = Vulnerabilities(settings=to_settings(CFG)[0])
+    caplog.set_level(logging.INFO)
+    vln.load(objectify.fromstring(DATED_VULN_XML.replace('Type="Vendor Fix"', 'Type="Unknown"').encode()))
+    assert vln.has_errors()
     assert 'ingesting sometimes present element' in caplog.text
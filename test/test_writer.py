@@ -1,61 +1,45 @@
+import gzip
+import hashlib
+import json
 import logging
+import os
 import pathlib
-from unittest.mock import call
 
 import muuntaa.writer as writer
 
 
-def test_write_csaf_default(mocker):
-    file_path = 'not-here.json'
-    path = pathlib.Path(file_path).expanduser().resolve()
-    options = {'ensure_ascii': False, 'indent': 2}
-    mock_file = mocker.mock_open()
-    mocker.patch('builtins.open', mock_file)
+def test_write_csaf_default(tmp_path):
+    path = tmp_path / 'not-here.json'
     payload = {'csaf': 42}
     expected_message = (logging.INFO, f'Successfully wrote {path}.')
-    scoped_messages = writer.write_csaf(payload, file_path)
+    scoped_messages = writer.write_csaf(payload, str(path))
 
-    mock_file.assert_called_once_with(path, 'wt', encoding=writer.ENCODING)
-    mock_file().write.assert_has_calls(
-        [call('{'), call(f'\n{" " * options["indent"]}'), call('"csaf"'), call(': '), call('42'), call('\n'), call('}')]
-    )
+    assert path.read_text(encoding=writer.ENCODING) == '{\n  "csaf": 42\n}'
     assert scoped_messages == [expected_message]
 
 
-def test_write_csaf_compact(mocker):
-    file_path = 'not-here.json'
-    path = pathlib.Path(file_path).expanduser().resolve()
+def test_write_csaf_compact(tmp_path):
+    path = tmp_path / 'not-here.json'
     options = {'ensure_ascii': False, 'indent': 0}
-    mock_file = mocker.mock_open()
-    mocker.patch('builtins.open', mock_file)
     payload = {'csaf': 42}
     expected_message = (logging.INFO, f'Successfully wrote {path}.')
-    scoped_messages = writer.write_csaf(payload, file_path, options)
+    scoped_messages = writer.write_csaf(payload, str(path), options)
 
-    mock_file.assert_called_once_with(path, 'wt', encoding=writer.ENCODING)
-    mock_file().write.assert_has_calls(
-        [call('{'), call('\n'), call('"csaf"'), call(': '), call('42'), call('\n'), call('}')]
-    )
+    assert path.read_text(encoding=writer.ENCODING) == '{\n"csaf": 42\n}'
     assert scoped_messages == [expected_message]
 
 
-def test_write_csaf_bad_suffix(mocker):
-    file_path = 'bad-suffix.nosj'
-    path = pathlib.Path(file_path).expanduser().resolve()
+def test_write_csaf_bad_suffix(tmp_path):
+    path = tmp_path / 'bad-suffix.nosj'
     options = {'ensure_ascii': False, 'indent': 0}
-    mock_file = mocker.mock_open()
-    mocker.patch('builtins.open', mock_file)
     payload = {'csaf': 42}
     expected_messages = [
         (logging.WARNING, f'Given output file {path} does not contain valid {writer.CSAF_FILE_SUFFIX} suffix.'),
         (logging.INFO, f'Successfully wrote {path}.'),
     ]
-    scoped_messages = writer.write_csaf(payload, file_path, options)
+    scoped_messages = writer.write_csaf(payload, str(path), options)
 
-    mock_file.assert_called_once_with(path, 'wt', encoding=writer.ENCODING)
-    mock_file().write.assert_has_calls(
-        [call('{'), call('\n'), call('"csaf"'), call(': '), call('42'), call('\n'), call('}')]
-    )
+    assert path.read_text(encoding=writer.ENCODING) == '{\n"csaf": 42\n}'
     assert scoped_messages == expected_messages
 
 
@@ -98,3 +82,153 @@ def test_write_csaf_overwrite_file(tmp_path):
     ]
     scoped_messages = writer.write_csaf(payload, file_path)
     assert scoped_messages == expected_messages
+
+
+def test_write_csaf_compact_options(tmp_path):
+    path = tmp_path / 'compact.json'
+    payload = {'csaf': [42, {'a': 'b'}]}
+    scoped_messages = writer.write_csaf(payload, str(path), writer.COMPACT_OPTIONS)
+    assert scoped_messages == [(logging.INFO, f'Successfully wrote {path}.')]
+    assert path.read_text(encoding=writer.ENCODING) == '{"csaf":[42,{"a":"b"}]}'
+
+
+def test_write_csaf_compressed(tmp_path):
+    path = tmp_path / 'packed.json.gz'
+    payload = {'csaf': 42}
+    scoped_messages = writer.write_csaf(payload, str(path))
+    assert scoped_messages == [(logging.INFO, f'Successfully wrote {path}.')]
+    with gzip.open(path, 'rt', encoding=writer.ENCODING) as handle:
+        assert json.load(handle) == payload
+
+
+def test_output_sink_grouped_sync(tmp_path):
+    payload = {'csaf': 42}
+    with writer.OutputSink(fsync_group_size=3, check_existing=False) as sink:
+        paths = [tmp_path / 'deep' / f'{n}.json' for n in range(4)]
+        messages = [writer.write_csaf(payload, str(path), sink=sink) for path in paths]
+        assert (logging.INFO, f'Created output folder {tmp_path / "deep"}.') in messages[0]
+        assert all(len(scoped_messages) == 1 for scoped_messages in messages[1:])
+        assert all(path.is_file() for path in paths)  # Visible before the sync
+        assert sink.pending == [str(paths[3])]  # Only the folder sync for the last file is still pending
+    assert not sink.pending
+    assert sorted(p.name for p in (tmp_path / 'deep').iterdir()) == [path.name for path in paths]
+
+
+def test_output_sink_syncs_files_before_rename_and_folders_in_groups(mocker, tmp_path):
+    calls = []
+    replace = os.replace
+    mocker.patch.object(writer.os, 'fsync', side_effect=lambda fd: calls.append('fsync'))
+    mocker.patch.object(writer.os, 'replace', side_effect=lambda *args: calls.append('replace') or replace(*args))
+    with writer.OutputSink(fsync_group_size=2) as sink:
+        for name in ('a.json', 'b.json', 'c.json'):
+            writer.write_csaf({'csaf': 42}, tmp_path / name, sink=sink)
+    assert calls == ['fsync', 'replace', 'fsync', 'replace', 'fsync', 'fsync', 'replace', 'fsync']
+
+
+def test_output_sink_lists_each_folder_once(mocker, tmp_path):
+    (tmp_path / 'a.json').write_text('{}', encoding=writer.ENCODING)
+    listdir = mocker.spy(writer.os, 'listdir')
+    with writer.OutputSink() as sink:
+        messages = [writer.write_csaf({'csaf': 42}, tmp_path / name, sink=sink) for name in ('a.json', 'b.json')]
+        assert (logging.WARNING, f'Output {tmp_path / "a.json"} already exists. Overwriting it.') in messages[0]
+        assert not any(level == logging.WARNING for level, _ in messages[1])
+        assert any(level == logging.WARNING for level, _ in writer.write_csaf({}, tmp_path / 'b.json', sink=sink))
+    assert listdir.call_count == 1
+
+
+def test_output_sink_logs_sync_failures_on_exit(caplog, mocker, tmp_path):
+    with writer.OutputSink(fsync_group_size=2) as sink:
+        writer.write_csaf({'csaf': 42}, tmp_path / 'a.json', sink=sink)
+        mocker.patch.object(writer.os, 'fsync', side_effect=OSError('disk gone'))
+    assert 'Syncing the output files failed. disk gone' in caplog.text
+
+
+def test_output_sink_no_sync_failure_leaves_no_partial_output(tmp_path):
+    path = tmp_path / 'broken.json'
+    sink = writer.OutputSink(fsync_group_size=0)
+    scoped_messages = writer.write_csaf({'csaf': object()}, str(path), sink=sink)
+    assert scoped_messages[-1][0] == logging.CRITICAL
+    assert not list(tmp_path.iterdir())
+
+
+def test_write_csaf_checksums(tmp_path):
+    path = tmp_path / 'hashed.json.gz'
+    scoped_messages = writer.write_csaf({'csaf': 42}, str(path), checksums=True)
+    assert scoped_messages[-1] == (logging.INFO, f'Successfully wrote {path}.sha512.')
+    written = path.read_bytes()
+    for algorithm in writer.CHECKSUM_ALGORITHMS:
+        sidecar = tmp_path / f'hashed.json.gz.{algorithm}'
+        expected = f'{hashlib.new(algorithm, written).hexdigest()}  hashed.json.gz\n'
+        assert sidecar.read_text(encoding=writer.ENCODING) == expected
+
+
+def test_write_csaf_if_changed(tmp_path):
+    path = tmp_path / 'stable.json'
+    payload = {'csaf': 42}
+    assert writer.write_csaf(payload, path, if_changed=True) == [(logging.INFO, f'Successfully wrote {path}.')]
+    mtime_ns = path.stat().st_mtime_ns
+    assert writer.write_csaf(payload, path, if_changed=True) == [
+        (logging.INFO, f'Output {path} unchanged. Skipped writing.')
+    ]
+    assert path.stat().st_mtime_ns == mtime_ns
+    payload['csaf'] = 24  # same size, different hash
+    assert writer.write_csaf(payload, path, if_changed=True) == [(logging.INFO, f'Successfully wrote {path}.')]
+    assert json.loads(path.read_text(encoding=writer.ENCODING)) == payload
+
+
+def test_write_csaf_if_changed_uses_sidecar(tmp_path):
+    path = tmp_path / 'stable.json'
+    payload = {'csaf': 42}
+    writer.write_csaf(payload, path, checksums=True)
+    (tmp_path / 'stable.json.sha256').write_text('0' * 64 + '  stable.json\n', encoding=writer.ENCODING)
+    scoped_messages = writer.write_csaf(payload, path, checksums=True, if_changed=True)
+    assert (logging.INFO, f'Successfully wrote {path}.') in scoped_messages  # stale sidecar forces the write
+    assert writer.write_csaf(payload, path, checksums=True, if_changed=True) == [
+        (logging.INFO, f'Output {path} unchanged. Skipped writing.')
+    ]
+
+
+def test_write_csaf_canonical(tmp_path):
+    path = tmp_path / 'canonical.json'
+    payload = {'vulnerabilities': [{'scores': [{'cvss_v3': {'baseScore': 7.0}}]}], 'document': {'title': 'ä'}}
+    writer.write_csaf(payload, path, writer.COMPACT_OPTIONS, canonical_form=True)
+    expected = '{"document":{"title":"ä"},"vulnerabilities":[{"scores":[{"cvss_v3":{"baseScore":7}}]}]}'
+    assert path.read_text(encoding=writer.ENCODING) == expected
+
+
+def test_encode_sorted_keys():
+    options = {**writer.DEFAULT_OPTIONS, 'sort_keys': True}
+    assert writer.encode({'b': 1, 'a': 2}, options) == b'{\n  "a": 2,\n  "b": 1\n}'
+    assert writer.encode({'b': 1, 'a': 2}, options, writer.MSGPACK_FILE_SUFFIX) == b'\x82\xa1a\x02\xa1b\x01'
+
+
+def test_output_sink_reports_sync_failures(tmp_path, mocker):
+    sink = writer.OutputSink(fsync_group_size=2)
+    writer.write_csaf({'csaf': 42}, tmp_path / 'a.json', sink=sink)
+    mocker.patch.object(writer.os, 'fsync', side_effect=OSError('disk gone'))
+    assert sink.close() == [(logging.CRITICAL, 'Syncing the output files failed. disk gone')]
+    assert (tmp_path / 'a.json').is_file()
+
+
+def test_write_csaf_if_changed_adds_missing_sidecars(tmp_path):
+    path = tmp_path / 'stable.json'
+    payload = {'csaf': 42}
+    writer.write_csaf(payload, path)
+    assert writer.write_csaf(payload, path, checksums=True, if_changed=True) == [
+        (logging.INFO, f'Output {path} unchanged. Skipped writing.'),
+        (logging.INFO, f'Successfully wrote {path}.sha256.'),
+        (logging.INFO, f'Successfully wrote {path}.sha512.'),
+    ]
+    assert writer.write_csaf(payload, path, checksums=True, if_changed=True) == [
+        (logging.INFO, f'Output {path} unchanged. Skipped writing.')
+    ]
+
+
+def test_is_unchanged_ignores_sidecar_older_than_file(tmp_path):
+    path = tmp_path / 'edited.json'
+    writer.write_csaf({'csaf': 42}, path, checksums=True)
+    payload = path.read_bytes()
+    path.write_bytes(payload.replace(b'42', b'24'))  # edited after the sidecar was written
+    sidecar = tmp_path / 'edited.json.sha256'
+    os.utime(sidecar, ns=(path.stat().st_mtime_ns - 10**9,) * 2)
+    assert not writer.is_unchanged(path, payload)